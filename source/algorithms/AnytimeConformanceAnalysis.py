@@ -0,0 +1,98 @@
+import heapq
+import time
+
+from MasterThesisProject.source.algorithms.BruteForceHeuristic import do_brute_force_heuristic_for_token_analysis
+from MasterThesisProject.source.algorithms.ConformanceMeasureAlgorithm import calculate_run_conformance_results
+from MasterThesisProject.source.algorithms.PreflowPushAlgorithm4RunInWorkflownet import find_optimal_tokenflow_for_place, FlowNetworkSkeleton4Run
+from MasterThesisProject.source.algorithms.PreflowPushAlgorithmCsrArrays import find_optimal_tokenflow_for_place_csr
+from MasterThesisProject.source.structures.HeuristicTokenFlow4Place import HeuristicTokenFlow4Place
+from MasterThesisProject.source.structures.PartiallyOrderedEventLog import PartiallyOrderedEventLog
+from MasterThesisProject.source.structures.PartiallyOrderedLogConformanceResult import PartiallyOrderedLogConformanceResult, \
+    TokenResultsWeightedSum, PlaceStatistics
+from MasterThesisProject.source.structures.Run import Run
+from MasterThesisProject.source.structures.RunConformanceResult import RunConformanceResult
+from MasterThesisProject.source.structures.SinglePlaceTokenResult import SinglePlaceTokenResult
+from MasterThesisProject.source.structures.TokenResultCache import TokenResultCache
+from MasterThesisProject.source.structures.WorkflowNet import WorkflowNet, PlaceWorkflowNet
+
+
+def calculate_bound_width(weighted_sums: TokenResultsWeightedSum) -> float:
+    """
+    Difference of the upper and the lower bound of the conformance (see fill_from_calculation_result).
+    """
+    return ((weighted_sums.missing_token_max - weighted_sums.missing_token_min) / weighted_sums.consumed_token
+            + (weighted_sums.remaining_token_max - weighted_sums.remaining_token_min) / weighted_sums.produced_token) / 2
+
+
+def calculate_token_replay_conformance_anytime(event_log: PartiallyOrderedEventLog,
+                                               model: WorkflowNet,
+                                               epsilon: float,
+                                               time_budget: float = None,
+                                               include_initial_and_final_place=True,
+                                               use_csr_flow_network=False,
+                                               use_multi_place_heuristic=False,
+                                               token_result_cache: TokenResultCache = None) \
+        -> PartiallyOrderedLogConformanceResult:
+    """
+    Anytime version of calculate_token_replay_conformance_norm_for_partial_order. First, we only use the heuristics,
+    which give bounds for all runs. Then we use the flow network for the places the heuristics could only estimate,
+    beginning with the ones with the largest gap between the estimated missing tokens times the frequency of the run,
+    until the width of the bounds of the log is at most epsilon or the time budget is used up. With epsilon 0 and no
+    time budget the result is the same as the precise one.
+    :param event_log:
+    :param model:
+    :param epsilon: maximal width of the bounds of the conformance of the log
+    :param time_budget: in seconds, including the heuristics; None means no limit
+    :param include_initial_and_final_place: see calculate_token_replay_conformance_norm_for_partial_order
+    :param use_csr_flow_network: see calculate_token_replay_conformance_norm_for_partial_order
+    :param use_multi_place_heuristic: see calculate_token_replay_conformance_norm_for_partial_order
+    :param token_result_cache: only used for the heuristics
+    :return: the result with the bounds at the end; the places that are still estimated are counted in
+             number_places_only_estimated
+    """
+    start_time: float = time.perf_counter()
+    runs: list[Run] = list(event_log.run_to_frequency.keys())
+    estimated_place_results: list = []
+    run_to_conformance_result: dict[Run, RunConformanceResult]
+    place_to_decision_statistic: dict[str, PlaceStatistics]
+    run_to_conformance_result, place_to_decision_statistic = calculate_run_conformance_results(
+        runs, model, False, False, False, include_initial_and_final_place, use_csr_flow_network, use_multi_place_heuristic, False,
+        token_result_cache=token_result_cache, estimated_place_results=estimated_place_results)
+    weighted_tokens_sums: TokenResultsWeightedSum = TokenResultsWeightedSum()
+    for run in runs:
+        weighted_tokens_sums.add_result_for_run(event_log.run_to_frequency[run], run_to_conformance_result[run])
+    # the gap of the missing tokens is the same as the gap of the remaining tokens, so the weighted missing token gap
+    # tells us how much a place contributes to the width; the position in the list breaks ties deterministically
+    priority_queue: list = [(-event_log.run_to_frequency[run] * (result.missing_token_max - result.missing_token_min), position,
+                             run, place_index, result)
+                            for position, (run, place_index, result) in enumerate(estimated_place_results)]
+    heapq.heapify(priority_queue)
+    find_optimal_tokenflow = find_optimal_tokenflow_for_place_csr if use_csr_flow_network else find_optimal_tokenflow_for_place
+    places: list[PlaceWorkflowNet] = model.get_incidence_index().places
+    flow_network_skeleton: FlowNetworkSkeleton4Run = None
+    while priority_queue and calculate_bound_width(weighted_tokens_sums) > epsilon:
+        if time_budget is not None and time.perf_counter() - start_time >= time_budget:
+            break
+        _, _, run, place_index, estimated_result = heapq.heappop(priority_queue)
+        place: PlaceWorkflowNet = places[place_index]
+        token_flow: HeuristicTokenFlow4Place = HeuristicTokenFlow4Place()
+        do_brute_force_heuristic_for_token_analysis(run, model, place, False, token_flow)
+        if flow_network_skeleton is None or flow_network_skeleton.partial_order is not run.partial_order:
+            flow_network_skeleton = FlowNetworkSkeleton4Run(run)
+        precise_result: SinglePlaceTokenResult = find_optimal_tokenflow(place, run, estimated_result, token_flow, None, flow_network_skeleton)
+        # replace the estimated result by the precise one everywhere
+        frequency: int = event_log.run_to_frequency[run]
+        result_run: RunConformanceResult = run_to_conformance_result[run]
+        statistic: PlaceStatistics = place_to_decision_statistic[place.name]
+        for token_sums, factor in [(result_run, 1), (statistic, 1), (weighted_tokens_sums, frequency)]:
+            token_sums.missing_token_min += factor * (precise_result.missing_token_min - estimated_result.missing_token_min)
+            token_sums.missing_token_max += factor * (precise_result.missing_token_max - estimated_result.missing_token_max)
+            token_sums.remaining_token_min += factor * (precise_result.remaining_token_min - estimated_result.remaining_token_min)
+            token_sums.remaining_token_max += factor * (precise_result.remaining_token_max - estimated_result.remaining_token_max)
+        result_run.number_places_only_estimated -= 1
+        result_run.number_places_decided_flow_network += 1
+        result_run.calculate_and_set_conformance_level()
+    total_result: PartiallyOrderedLogConformanceResult = PartiallyOrderedLogConformanceResult(
+        place_to_decision_statistic=place_to_decision_statistic)
+    total_result.fill_from_calculation_result(weighted_tokens_sums, run_to_conformance_result)
+    return total_result
@@ -0,0 +1,254 @@
+import numpy as np
+
+from MasterThesisProject.source.structures.Run import Run
+from MasterThesisProject.source.structures.TotalOrderForRun import TotalOrder4Run
+from MasterThesisProject.source.structures.WorkflowNet import WorkflowNet, IncidenceIndex4WorkflowNet, TransitionWorkflowNet
+
+
+class RunBatchEncoding:
+    """
+    Encoding of a batch of runs as padded integer matrices (one row per run, one column per position in the total order).
+    ...
+    Attributes:
+    ----------
+        transition_matrix : np.ndarray
+            index of the label of the event at every position; padding positions get the index of a dummy transition
+            without any places in preset and postset
+        successor_matrix : np.ndarray
+            position of the successor event in the total order; events without successor point to the extra column L,
+            which collects the remaining tokens
+        predecessor_matrix : np.ndarray
+            same for the predecessor event
+        is_chain : bool
+            true if every run is a sequence, i.e., every successor is the next position; then cumulative sums suffice
+    """
+
+    def __init__(self, transition_matrix: np.ndarray, successor_matrix: np.ndarray, predecessor_matrix: np.ndarray, is_chain: bool):
+        self.transition_matrix = transition_matrix
+        self.successor_matrix = successor_matrix
+        self.predecessor_matrix = predecessor_matrix
+        self.is_chain = is_chain
+
+
+class BatchHeuristicResult:
+    """
+    Results of the forward and backward heuristic for all runs and all places; every array has the shape
+    (number runs, number places), where the places are numbered as in the incidence index of the net.
+    """
+
+    def __init__(self, produced_token: np.ndarray, consumed_token: np.ndarray, forward_missing_token_max: np.ndarray,
+                 forward_remaining_token_max: np.ndarray, backward_missing_token_max: np.ndarray,
+                 backward_remaining_token_max: np.ndarray):
+        self.produced_token = produced_token
+        self.consumed_token = consumed_token
+        self.forward_missing_token_max = forward_missing_token_max
+        self.forward_remaining_token_max = forward_remaining_token_max
+        self.backward_missing_token_max = backward_missing_token_max
+        self.backward_remaining_token_max = backward_remaining_token_max
+
+
+def make_incidence_matrices(incidence_index: IncidenceIndex4WorkflowNet, transitions: list[TransitionWorkflowNet]) \
+        -> (np.ndarray, np.ndarray):
+    """
+    Dense pre and post incidence matrices with one row per transition and one column per place. We add one final
+    row of zeros for the dummy transition used for padding.
+    """
+    number_places: int = len(incidence_index.places)
+    pre_matrix: np.ndarray = np.zeros((len(transitions) + 1, number_places), dtype=np.int32)
+    post_matrix: np.ndarray = np.zeros((len(transitions) + 1, number_places), dtype=np.int32)
+    for transition_index, transition in enumerate(transitions):
+        pre_matrix[transition_index, incidence_index.get_preset_indices(transition)] = 1
+        post_matrix[transition_index, incidence_index.get_postset_indices(transition)] = 1
+    return pre_matrix, post_matrix
+
+
+def encode_runs_for_batch(runs: list[Run], transition_to_index: dict[TransitionWorkflowNet, int]) -> RunBatchEncoding:
+    """
+    :param runs: the total orders of the runs have to be set
+    :param transition_to_index: the dummy transition for padding gets the index len(transition_to_index)
+    :return:
+    """
+    maximal_length: int = max((len(run.total_order.order) for run in runs), default=0)
+    padding_transition: int = len(transition_to_index)
+    transition_matrix: np.ndarray = np.full((len(runs), maximal_length), padding_transition, dtype=np.int64)
+    successor_matrix: np.ndarray = np.full((len(runs), maximal_length), maximal_length, dtype=np.int64)
+    predecessor_matrix: np.ndarray = np.full((len(runs), maximal_length), maximal_length, dtype=np.int64)
+    is_chain: bool = True
+    for run_index, run in enumerate(runs):
+        order: TotalOrder4Run = run.total_order
+        events: list = order.order
+        if not events:
+            continue
+        event_to_position: dict = {event: position for position, event in enumerate(events)}
+        # events without successor/predecessor are mapped to the extra position
+        event_to_position[None] = maximal_length
+        labels: dict = run.labels
+        successor_positions: list[int] = [event_to_position[order.event_to_successor_event[event]] for event in events]
+        transition_matrix[run_index, :len(events)] = [transition_to_index[labels[event]] for event in events]
+        successor_matrix[run_index, :len(events)] = successor_positions
+        predecessor_matrix[run_index, :len(events)] = [event_to_position[order.event_to_predecessor_event[event]] for event in events]
+        if is_chain:
+            is_chain = successor_positions[-1] == maximal_length and successor_positions[:-1] == list(range(1, len(events)))
+    return RunBatchEncoding(transition_matrix, successor_matrix, predecessor_matrix, is_chain)
+
+
+def calculate_missing_tokens_along_chains(consumed_per_position: np.ndarray, produced_per_position: np.ndarray) -> np.ndarray:
+    """
+    For sequences the heuristic is classic token replay: with s_k the cumulative sum of produced minus consumed tokens
+    up to position k, the number of missing tokens is the deepest dip max(0, -min_k (s_{k-1} - consumed_k)).
+    Arrays have the shape (runs, positions, places).
+    """
+    if consumed_per_position.shape[1] == 0:
+        return np.zeros((consumed_per_position.shape[0], consumed_per_position.shape[2]), dtype=np.int64)
+    balance: np.ndarray = np.cumsum(produced_per_position - consumed_per_position, axis=1)
+    balance_before_consumption: np.ndarray = balance - produced_per_position
+    return np.maximum(0, -balance_before_consumption.min(axis=1)).astype(np.int64)
+
+
+def calculate_missing_tokens_along_successors(consumed_per_position: np.ndarray, produced_per_position: np.ndarray,
+                                              successor_matrix: np.ndarray, is_backward: bool) -> (np.ndarray, np.ndarray):
+    """
+    General case: tokens of an event are passed to its successor, which is not necessarily the next position. We sweep
+    over the positions and handle all runs and places of the batch at once in every step.
+    :return: missing and remaining tokens
+    """
+    number_runs, number_positions, number_places = consumed_per_position.shape
+    # the extra position collects the tokens of events without successor
+    marking: np.ndarray = np.zeros((number_runs, number_positions + 1, number_places), dtype=np.int64)
+    missing: np.ndarray = np.zeros((number_runs, number_places), dtype=np.int64)
+    rows: np.ndarray = np.arange(number_runs)
+    positions = range(number_positions - 1, -1, -1) if is_backward else range(number_positions)
+    for position in positions:
+        current_marking: np.ndarray = marking[:, position, :]
+        consumed: np.ndarray = consumed_per_position[:, position, :]
+        consumed_with_token: np.ndarray = np.minimum(consumed, current_marking)
+        missing += consumed - consumed_with_token
+        current_marking -= consumed_with_token
+        current_marking += produced_per_position[:, position, :]
+        marking[rows, successor_matrix[:, position], :] += current_marking
+    return missing, marking[:, number_positions, :]
+
+
+def make_batches_by_number_cells(run_lengths: list[int], number_places: int, maximal_number_cells: int) -> list[tuple[int, int]]:
+    """
+    Splits the runs into batches whose (runs, positions + 1, places) arrays have at most the given number of cells; the
+    positions of a batch are padded to its longest run. A single run longer than the limit is a batch of its own.
+    :param run_lengths: the lengths of the total orders in increasing order
+    :return: start and end (exclusive) of every batch
+    """
+    batches: list[tuple[int, int]] = []
+    batch_start: int = 0
+    while batch_start < len(run_lengths):
+        batch_end: int = batch_start + 1
+        while batch_end < len(run_lengths) and \
+                (batch_end + 1 - batch_start) * (run_lengths[batch_end] + 1) * max(number_places, 1) <= maximal_number_cells:
+            batch_end += 1
+        batches.append((batch_start, batch_end))
+        batch_start = batch_end
+    return batches
+
+
+def do_batch_heuristic_for_token_analysis(runs: list[Run], model: WorkflowNet, maximal_number_cells: int = 1 << 22) -> BatchHeuristicResult:
+    """
+    Performs the forward and backward brute force heuristic for all runs and all places with vectorized operations.
+    Runs are handled in batches, since the memory is dominated by the dense arrays of a batch: the int32 arrays
+    consumed_per_position and produced_per_position with (runs, positions, places) cells and the int64 marking (or the
+    cumulative sums for sequences) with one more position. So we bound the cells of a batch instead of the number of
+    runs, as a few long runs in a net with many places need as much memory as thousands of short ones; with the default
+    a batch needs at most about 150 MB including the temporary arrays.
+    :param runs: the total orders of the runs have to be set
+    :param model:
+    :param maximal_number_cells: bound for runs × (maximal length + 1) × places of a batch (see make_batches_by_number_cells)
+    :return:
+    """
+    incidence_index: IncidenceIndex4WorkflowNet = model.get_incidence_index()
+    transitions: list[TransitionWorkflowNet] = list(model.transitions)
+    transition_to_index: dict[TransitionWorkflowNet, int] = {transition: index for index, transition in enumerate(transitions)}
+    # runs may use transitions that are not part of the net (e.g. in hand made runs)
+    for run in runs:
+        for transition in run.labels.values():
+            if transition not in transition_to_index:
+                transition_to_index[transition] = len(transitions)
+                transitions.append(transition)
+    pre_matrix, post_matrix = make_incidence_matrices(incidence_index, transitions)
+    number_places: int = len(incidence_index.places)
+    result_arrays: list[np.ndarray] = [np.zeros((len(runs), number_places), dtype=np.int64) for _ in range(6)]
+    # runs of similar length are put in the same batch to keep the padding small
+    run_indices_by_length: list[int] = sorted(range(len(runs)), key=lambda run_index: len(runs[run_index].total_order.order))
+    run_lengths: list[int] = [len(runs[run_index].total_order.order) for run_index in run_indices_by_length]
+    for batch_start, batch_end in make_batches_by_number_cells(run_lengths, number_places, maximal_number_cells):
+        batch_run_indices: list[int] = run_indices_by_length[batch_start: batch_end]
+        batch: list[Run] = [runs[run_index] for run_index in batch_run_indices]
+        encoding: RunBatchEncoding = encode_runs_for_batch(batch, transition_to_index)
+        consumed_per_position: np.ndarray = pre_matrix[encoding.transition_matrix]
+        produced_per_position: np.ndarray = post_matrix[encoding.transition_matrix]
+        produced: np.ndarray = produced_per_position.sum(axis=1, dtype=np.int64)
+        consumed: np.ndarray = consumed_per_position.sum(axis=1, dtype=np.int64)
+        if encoding.is_chain:
+            forward_missing = calculate_missing_tokens_along_chains(consumed_per_position, produced_per_position)
+            # backward: walk the reversed sequence with switched roles of consumption and production
+            backward_missing_raw = calculate_missing_tokens_along_chains(produced_per_position[:, ::-1, :],
+                                                                         consumed_per_position[:, ::-1, :])
+            forward_remaining = produced - consumed + forward_missing
+            backward_remaining_raw = consumed - produced + backward_missing_raw
+        else:
+            forward_missing, forward_remaining = calculate_missing_tokens_along_successors(
+                consumed_per_position, produced_per_position, encoding.successor_matrix, False)
+            _, backward_remaining_raw = calculate_missing_tokens_along_successors(
+                produced_per_position, consumed_per_position, encoding.predecessor_matrix, True)
+        # for the backward heuristic we switch roles and correct remaining tokens (as in the single place version)
+        backward_missing = backward_remaining_raw
+        backward_remaining = produced - consumed + backward_remaining_raw
+        for result_array, batch_values in zip(result_arrays, [produced, consumed, forward_missing, forward_remaining,
+                                                              backward_missing, backward_remaining]):
+            result_array[batch_run_indices] = batch_values
+    return BatchHeuristicResult(*result_arrays)
+
+
+class BatchPlaceDecision:
+    """
+    Token results for all runs and the selected places, where the heuristics decided the place (marked precise) or,
+    for undecided places, the estimate of the better heuristic together with the theoretic optimum as minimal value.
+    All arrays have the shape (number runs, number selected places).
+    """
+
+    def __init__(self, produced_token: np.ndarray, consumed_token: np.ndarray, missing_token_min: np.ndarray,
+                 missing_token_max: np.ndarray, remaining_token_min: np.ndarray, remaining_token_max: np.ndarray,
+                 decided_by_forward_heuristic: np.ndarray, decided_by_backward_heuristic: np.ndarray, undecided: np.ndarray):
+        self.produced_token = produced_token
+        self.consumed_token = consumed_token
+        self.missing_token_min = missing_token_min
+        self.missing_token_max = missing_token_max
+        self.remaining_token_min = remaining_token_min
+        self.remaining_token_max = remaining_token_max
+        self.decided_by_forward_heuristic = decided_by_forward_heuristic
+        self.decided_by_backward_heuristic = decided_by_backward_heuristic
+        self.undecided = undecided
+
+
+def decide_places_from_batch_heuristic(heuristic: BatchHeuristicResult, place_indices: list[int], is_total_order: bool) \
+        -> BatchPlaceDecision:
+    """
+    Vectorized version of the decision logic of the conformance algorithm: a heuristic decides a place if it reaches the
+    theoretic optimum of missing tokens (for total orders the forward heuristic is always precise). Otherwise, the
+    better heuristic gives the maximal values and the theoretic optimum the minimal values.
+    """
+    produced: np.ndarray = heuristic.produced_token[:, place_indices]
+    consumed: np.ndarray = heuristic.consumed_token[:, place_indices]
+    forward_missing: np.ndarray = heuristic.forward_missing_token_max[:, place_indices]
+    forward_remaining: np.ndarray = heuristic.forward_remaining_token_max[:, place_indices]
+    backward_missing: np.ndarray = heuristic.backward_missing_token_max[:, place_indices]
+    backward_remaining: np.ndarray = heuristic.backward_remaining_token_max[:, place_indices]
+    missing_theoretic_optimum: np.ndarray = np.maximum(0, consumed - produced)
+    decided_by_forward: np.ndarray = forward_missing == missing_theoretic_optimum
+    if is_total_order:
+        decided_by_forward[:] = True
+    decided_by_backward: np.ndarray = ~decided_by_forward & (backward_missing == missing_theoretic_optimum)
+    undecided: np.ndarray = ~decided_by_forward & ~decided_by_backward
+    use_forward: np.ndarray = decided_by_forward | (undecided & (forward_missing <= backward_missing))
+    missing_max: np.ndarray = np.where(use_forward, forward_missing, backward_missing)
+    remaining_max: np.ndarray = np.where(use_forward, forward_remaining, backward_remaining)
+    missing_min: np.ndarray = np.where(undecided, missing_theoretic_optimum, missing_max)
+    remaining_min: np.ndarray = np.where(undecided, produced - consumed + missing_theoretic_optimum, remaining_max)
+    return BatchPlaceDecision(produced, consumed, missing_min, missing_max, remaining_min, remaining_max, decided_by_forward,
+                              decided_by_backward, undecided)
@@ -1,11 +1,12 @@
+from MasterThesisProject.source.structures.HeuristicTokenFlow4Place import HeuristicTokenFlow4Place
 from MasterThesisProject.source.structures.Run import Run
 from MasterThesisProject.source.structures.SinglePlaceTokenResult import SinglePlaceTokenResult
 from MasterThesisProject.source.structures.TotalOrderForRun import TotalOrder4Run
 from MasterThesisProject.source.structures.WorkflowNet import WorkflowNet
 
 
-def do_brute_force_heuristic_for_token_analysis(run: Run, model: WorkflowNet, place, do_backward_heuristic: bool) \
-        -> SinglePlaceTokenResult:
+def do_brute_force_heuristic_for_token_analysis(run: Run, model: WorkflowNet, place, do_backward_heuristic: bool,
+                                                token_flow: HeuristicTokenFlow4Place = None) -> SinglePlaceTokenResult:
     """
     This functions performs the brute force heuristic for estimating the number of missing tokens of the optimal compact
     tokenflow by always pushing all tokens to the next following event (when doing a forward heuristic) or to the
@@ -14,14 +15,20 @@ def do_brute_force_heuristic_for_token_analysis(run: Run, model: WorkflowNet, pl
     :param model:
     :param place:
     :param do_backward_heuristic:
+    :param token_flow: if given, the forward heuristic records the token flow it realized there (see
+                       HeuristicTokenFlow4Place); not possible for the backward heuristic
     :return: The result does not fill the fields for minimal missing and remaining tokens as the pure heuristic can not
              tell this. One has to fill this information manually afterward. Therefore, the result always assume itself
              to be not precise.
     """
+    if do_backward_heuristic and token_flow is not None:
+        raise Exception("Only the token flow of the forward heuristic can be recorded.")
     order_iteration: TotalOrder4Run = run.total_order
     if do_backward_heuristic:
         order_iteration = run.total_order.reverse_copy()
     event_to_marking: dict = {event: 0 for event in order_iteration.order}
+    # only needed to record the token flow
+    event_to_pushed_token: dict = dict()
     flow_relation = model.graph
     result: SinglePlaceTokenResult = SinglePlaceTokenResult()
     result.is_precise = False
@@ -37,20 +44,29 @@ def do_brute_force_heuristic_for_token_analysis(run: Run, model: WorkflowNet, pl
                 result.missing_token_max += 1
             else:
                 event_to_marking[event] -= 1
+                if token_flow is not None:
+                    token_flow.event_to_consumed_token[event] = 1
         # check for production
         has_event_production: bool = flow_relation.has_edge(place, transition) if do_backward_heuristic\
             else flow_relation.has_edge(transition, place)
         if has_event_production:
             result.produced_token += 1
             event_to_marking[event] += 1
+            if token_flow is not None:
+                token_flow.event_to_produced_token[event] = 1
         # push token to next event
         next_event = order_iteration.event_to_successor_event[event]
         if next_event is None:
             result.remaining_token_max += event_to_marking[event]
         else:
             event_to_marking[next_event] += event_to_marking[event]
+            if token_flow is not None:
+                event_to_pushed_token[event] = event_to_marking[event]
         event_to_marking[event] = 0
 
+    if token_flow is not None:
+        restrict_token_flow_to_consumed_tokens(run, token_flow, event_to_pushed_token)
+
     # for backward heuristic we have to switch roles and correct remaining tokens
     if do_backward_heuristic:
         result.produced_token, result.consumed_token = result.consumed_token, result.produced_token
@@ -58,3 +74,45 @@ def do_brute_force_heuristic_for_token_analysis(run: Run, model: WorkflowNet, pl
         result.missing_token_max, result.remaining_token_max = result.remaining_token_max, corrected_value_remaining_token
 
     return result
+
+
+def restrict_token_flow_to_consumed_tokens(run: Run, token_flow: HeuristicTokenFlow4Place, event_to_pushed_token: dict):
+    """
+    The forward heuristic pushes all tokens of an event to its successor (event_to_pushed_token) and records all
+    produced tokens (event_to_produced_token), also the ones that remain in the end. These may exceed the capacities of the flow
+    network, so we only keep the tokens that are consumed. We go backward through the total order: every event needs
+    the tokens it consumes and the tokens it pushes to its successor; the latter can first be covered by its own produced
+    token (tokens are consumed before producing) and the rest has to come from the events pushing to it.
+    :param run:
+    :param token_flow: filled by the forward heuristic, is changed in place
+    :param event_to_pushed_token: all tokens the forward heuristic pushed from an event to its successor
+    """
+    order: TotalOrder4Run = run.total_order
+    event_to_pushing_events: dict = dict()
+    for event in order.order:
+        next_event = order.event_to_successor_event[event]
+        if next_event is not None:
+            event_to_pushing_events.setdefault(next_event, []).append(event)
+    used_pushed_token: dict = dict()
+    used_produced_token: dict = dict()
+    event_to_passed_token: dict = dict()
+    for event in reversed(order.order):
+        pushed_token: int = used_pushed_token.get(event, 0)
+        produced_token: int = min(token_flow.event_to_produced_token.get(event, 0), pushed_token)
+        if produced_token > 0:
+            used_produced_token[event] = produced_token
+        if pushed_token - produced_token > 0:
+            event_to_passed_token[event] = pushed_token - produced_token
+        needed_token: int = token_flow.event_to_consumed_token.get(event, 0) + pushed_token - produced_token
+        for pushing_event in event_to_pushing_events.get(event, []):
+            if needed_token == 0:
+                break
+            token_from_event: int = min(needed_token, event_to_pushed_token.get(pushing_event, 0))
+            if token_from_event > 0:
+                used_pushed_token[pushing_event] = token_from_event
+                needed_token -= token_from_event
+        if needed_token != 0:
+            raise Exception("The recorded token flow of the heuristic is not feasible.")
+    token_flow.edge_to_pushed_token = {(event, order.event_to_successor_event[event]): token for event, token in used_pushed_token.items()}
+    token_flow.event_to_produced_token = used_produced_token
+    token_flow.event_to_passed_token = event_to_passed_token
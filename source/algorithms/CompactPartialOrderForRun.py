@@ -0,0 +1,54 @@
+import networkx as nx
+from networkx import DiGraph
+
+from MasterThesisProject.source.structures.PartiallyOrderedEventLog import PartiallyOrderedEventLog
+from MasterThesisProject.source.structures.Run import Run, Event4Run
+
+
+def does_event_touch_place(event: Event4Run) -> bool:
+    return len(event.label.preset) > 0 or len(event.label.postset) > 0
+
+
+def contract_events_without_places(partial_order: DiGraph) -> DiGraph:
+    """
+    Events whose label touches no place (e.g. the invalid transition) only pass tokens on, so we remove them and connect
+    their predecessors directly to their successors. To not blow up the number of edges, we only do this for events in
+    chains, i.e., with at most one predecessor or at most one successor.
+    :param partial_order: is not changed
+    :return: the contracted partial order
+    """
+    contracted_order: DiGraph = partial_order.copy()
+    for event in list(partial_order):
+        if does_event_touch_place(event):
+            continue
+        predecessors: list[Event4Run] = list(contracted_order.predecessors(event))
+        successors: list[Event4Run] = list(contracted_order.successors(event))
+        if len(predecessors) > 1 and len(successors) > 1:
+            continue
+        contracted_order.remove_node(event)
+        contracted_order.add_edges_from((predecessor, successor) for predecessor in predecessors for successor in successors)
+    return contracted_order
+
+
+def compact_partial_order_of_run(run: Run) -> Run:
+    """
+    Makes a run with the same results of the precise conformance analysis but a smaller partial order: events that touch
+    no place are contracted (see contract_events_without_places) and then the transitive reduction is taken. Both keep
+    the maximal flows, since the arcs between the events in the flow network have the number of consumed tokens as
+    capacity. The results of the heuristics may change, since they depend on the total order. The contracted events only
+    touch no place in the net of the labels, so the new run cannot be analyzed for other nets (see make_run_view_for_net).
+    :param run:
+    :return: a new run without total order
+    """
+    contracted_order: DiGraph = contract_events_without_places(run.partial_order)
+    compact_run: Run = Run(nx.transitive_reduction(contracted_order))
+    compact_run.name_foreign_source = run.name_foreign_source
+    compact_run.has_contracted_events = run.has_contracted_events or len(contracted_order) < len(run.partial_order)
+    return compact_run
+
+
+def compact_partial_orders_of_event_log(event_log: PartiallyOrderedEventLog) -> PartiallyOrderedEventLog:
+    """
+    :return: a new log with compact_partial_order_of_run applied to every run
+    """
+    return PartiallyOrderedEventLog({compact_partial_order_of_run(run): frequency for run, frequency in event_log.run_to_frequency.items()})
@@ -20,6 +20,15 @@ def calculate_token_analysis_for_initial_and_final_place(run: Run, net: Workflow
             consumed_initial_tokens += 1
         if graph.has_edge(transition, final_place):
             produced_final_tokens += 1
+    return make_token_results_for_initial_and_final_place(consumed_initial_tokens, produced_final_tokens)
+
+
+def make_token_results_for_initial_and_final_place(consumed_initial_tokens: int, produced_final_tokens: int) \
+        -> Tuple[SinglePlaceTokenResult, SinglePlaceTokenResult]:
+    """
+    The initial place always has one produced token and the final place always one consumed token; thus the results only
+    depend on how often the run consumes from the initial place and produces on the final place.
+    """
     result_initial_place: SinglePlaceTokenResult
     result_final_place: SinglePlaceTokenResult
     if consumed_initial_tokens >= 1:
@@ -1,14 +1,40 @@
-from MasterThesisProject.source.algorithms.PreflowPushAlgorithm4RunInWorkflownet import find_optimal_tokenflow_for_place
+import atexit
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Tuple
+
+import numpy as np
+
+from MasterThesisProject.source.algorithms.BatchHeuristicKernel import do_batch_heuristic_for_token_analysis, decide_places_from_batch_heuristic, \
+    BatchPlaceDecision, BatchHeuristicResult
+from MasterThesisProject.source.algorithms.PreflowPushAlgorithm4RunInWorkflownet import find_optimal_tokenflow_for_place, \
+    FlowNetworkSkeleton4Run
+from MasterThesisProject.source.algorithms.PreflowPushAlgorithmCsrArrays import find_optimal_tokenflow_for_place_csr
 from MasterThesisProject.source.structures.PartiallyOrderedLogConformanceResult import PartiallyOrderedLogConformanceResult, TokenResultsWeightedSum, \
-    PlaceStatistics
+    PlaceStatistics, PlaceStatisticsArrays
+from MasterThesisProject.source.structures.ConformanceInstrumentation import ConformanceInstrumentation, PHASE_INITIAL_AND_FINAL_PLACE, \
+    PHASE_TOTAL_ORDER, PHASE_FORWARD_HEURISTIC, PHASE_BACKWARD_HEURISTIC, PHASE_MULTI_PLACE_HEURISTIC
+from MasterThesisProject.source.structures.CompactRepresentations import CompactWorkflowNet
+from MasterThesisProject.source.structures.FlatEventLog import FlatEventLog, SharedFlatEventLog, SharedFlatEventLogDescriptor
+from MasterThesisProject.source.structures.HeuristicTokenFlow4Place import HeuristicTokenFlow4Place
 from MasterThesisProject.source.structures.PartiallyOrderedEventLog import PartiallyOrderedEventLog
+from MasterThesisProject.source.structures.Run import Run
+from MasterThesisProject.source.structures.TokenResultCache import TokenResultCache
 from MasterThesisProject.source.structures.TotalOrderForRun import TotalOrder4Run
-from MasterThesisProject.source.structures.WorkflowNet import WorkflowNet
+from MasterThesisProject.source.structures.WorkflowNet import WorkflowNet, PlaceWorkflowNet, IncidenceIndex4WorkflowNet, TransitionWorkflowNet
 from MasterThesisProject.source.structures.SinglePlaceTokenResult import SinglePlaceTokenResult
-from MasterThesisProject.source.algorithms.ConformanceAnalysisInitialAndFinalPlace import calculate_token_analysis_for_initial_and_final_place
+from MasterThesisProject.source.algorithms.ConformanceAnalysisInitialAndFinalPlace import calculate_token_analysis_for_initial_and_final_place, \
+    make_token_results_for_initial_and_final_place
 from MasterThesisProject.source.algorithms.FindTotalOrderForPartialOrder import find_total_order_for_run
 from MasterThesisProject.source.structures.RunConformanceResult import RunConformanceResult
 from MasterThesisProject.source.algorithms.BruteForceHeuristic import do_brute_force_heuristic_for_token_analysis
+from MasterThesisProject.source.algorithms.MultiPlaceHeuristic import do_multi_place_heuristic_for_token_analysis, MultiPlaceHeuristicResult
+
+# How the result of a place in a run was found
+DECIDED_BY_FORWARD_HEURISTIC: str = "forward heuristic"
+DECIDED_BY_BACKWARD_HEURISTIC: str = "backward heuristic"
+DECIDED_BY_FLOW_NETWORK: str = "flow network"
+ONLY_ESTIMATED: str = "estimated"
 
 
 def calculate_token_replay_conformance_norm_for_partial_order(event_log: PartiallyOrderedEventLog,
@@ -16,7 +42,13 @@ def calculate_token_replay_conformance_norm_for_partial_order(event_log: Partial
                                                               do_calculate_precise_result: bool,
                                                               never_use_heuristics=False,
                                                               is_total_order=False,
-                                                              include_initial_and_final_place=True) \
+                                                              include_initial_and_final_place=True,
+                                                              use_csr_flow_network=False,
+                                                              use_multi_place_heuristic=False,
+                                                              use_batch_heuristic_kernel=False,
+                                                              workers: int = 1,
+                                                              token_result_cache: TokenResultCache = None,
+                                                              instrumentation: ConformanceInstrumentation = None) \
         -> PartiallyOrderedLogConformanceResult:
     """
 
@@ -27,71 +59,428 @@ def calculate_token_replay_conformance_norm_for_partial_order(event_log: Partial
     :param never_use_heuristics: only for experiments: when this is set true the algorithm only uses the flow network
     :param include_initial_and_final_place: if the log is created by enforcing the correct start and final event,
                                             it makes sense to not take thes corresponding places into account
+    :param use_csr_flow_network: if true the maximal flow problems are solved on integer indexed CSR arrays instead of
+                                 networkx graphs; the results are identical
+    :param use_multi_place_heuristic: if true the forward and backward heuristics are done for all places in a single
+                                      walk over the total order of a run; the results are identical
+    :param use_batch_heuristic_kernel: if true the heuristics and the decisions for all runs and places are done with
+                                       vectorized numpy operations; the results are identical
+    :param workers: if larger than one the runs are split into shards, which are analyzed by a pool of this many
+                    processes; the results are identical
+    :param token_result_cache: if given, the results of the places are looked up in (and added to) the cache; the same
+                               cache can be used for several logs and nets; not supported by the batch kernel and the
+                               worker processes
+    :param instrumentation: if given, the times and calls of the phases, the operation counters of the preflow push
+                            algorithm and the slowest places are recorded there; not supported by the batch kernel and
+                            the worker processes
     :return:
     """
     if not do_calculate_precise_result and never_use_heuristics:
         raise Exception("The input flags contradict each other: you have to use the heuristics for the quick result!")
+    if instrumentation is not None and workers > 1:
+        raise Exception("The worker processes do not support the instrumentation.")
+    if token_result_cache is not None and workers > 1:
+        raise Exception("The worker processes do not support the token result cache.")
+    runs: list[Run] = list(event_log.run_to_frequency.keys())
+    calculation_flags: tuple = (do_calculate_precise_result, never_use_heuristics, is_total_order, include_initial_and_final_place,
+                                use_csr_flow_network, use_multi_place_heuristic, use_batch_heuristic_kernel)
+    run_to_conformance_result: dict[Run, RunConformanceResult]
+    place_to_decision_statistic: dict[str, PlaceStatistics]
+    if workers > 1 and len(runs) > 1:
+        run_to_conformance_result, place_to_decision_statistic = calculate_run_conformance_results_in_parallel(runs, model, workers,
+                                                                                                               calculation_flags)
+    else:
+        run_to_conformance_result, place_to_decision_statistic = calculate_run_conformance_results(runs, model, *calculation_flags,
+                                                                                                   token_result_cache=token_result_cache,
+                                                                                                   instrumentation=instrumentation)
+    # the weighted sums are always taken in the order of the log, so the floating point results do not depend on the workers
     weighted_tokens_sums: TokenResultsWeightedSum = TokenResultsWeightedSum()
-    total_result: PartiallyOrderedLogConformanceResult = PartiallyOrderedLogConformanceResult()
-    place_to_decision_statistic: dict[str, PlaceStatistics] = dict()
-    # Only inner places are interesting as initial and start places are always clear to analyze
-    for place in model.inner_places:
-        place_to_decision_statistic[place.name] = PlaceStatistics()
-    total_result.place_to_decision_statistic = place_to_decision_statistic
-    run_to_conformance_result: dict = dict()
-    for run in event_log.run_to_frequency.keys():
+    for run in runs:
+        weighted_tokens_sums.add_result_for_run(event_log.run_to_frequency[run], run_to_conformance_result[run])
+    total_result: PartiallyOrderedLogConformanceResult = PartiallyOrderedLogConformanceResult(
+        place_to_decision_statistic=place_to_decision_statistic)
+    total_result.fill_from_calculation_result(weighted_tokens_sums, run_to_conformance_result)
+    return total_result
+
+
+def calculate_run_conformance_results(runs: list[Run],
+                                      model: WorkflowNet,
+                                      do_calculate_precise_result: bool,
+                                      never_use_heuristics: bool,
+                                      is_total_order: bool,
+                                      include_initial_and_final_place: bool,
+                                      use_csr_flow_network: bool,
+                                      use_multi_place_heuristic: bool,
+                                      use_batch_heuristic_kernel: bool,
+                                      token_result_cache: TokenResultCache = None,
+                                      estimated_place_results: list = None,
+                                      instrumentation: ConformanceInstrumentation = None,
+                                      flow_network_skeleton: FlowNetworkSkeleton4Run = None) \
+        -> Tuple[dict[Run, RunConformanceResult], dict[str, PlaceStatistics]]:
+    """
+    Does the analysis of calculate_token_replay_conformance_norm_for_partial_order for every single run, but without
+    combining the results of the runs to the result of the log. The parameters are the same.
+    :param estimated_place_results: if given, a tuple (run, place index, result) is appended for every place that was
+                                    only estimated; not supported by the batch kernel
+    :param flow_network_skeleton: used for the runs with its partial order, e.g. the views of a run for several nets;
+                                  for every other run, a new skeleton is shared by the flow networks of its places
+    :return: the result for every run and the statistics for every inner place (by name)
+    """
+    run_to_conformance_result: dict[Run, RunConformanceResult] = dict()
+    find_optimal_tokenflow = find_optimal_tokenflow_for_place_csr if use_csr_flow_network else find_optimal_tokenflow_for_place
+    incidence_index: IncidenceIndex4WorkflowNet = model.get_incidence_index()
+    if use_batch_heuristic_kernel and not never_use_heuristics:
+        if estimated_place_results is not None:
+            raise Exception("The batch kernel does not report the estimated places.")
+        if instrumentation is not None:
+            raise Exception("The batch kernel does not support the instrumentation.")
+        if token_result_cache is not None:
+            raise Exception("The batch kernel does not support the token result cache.")
+        return calculate_run_conformance_results_with_batch_heuristic_kernel(runs, model, do_calculate_precise_result, is_total_order,
+                                                                             include_initial_and_final_place, find_optimal_tokenflow)
+    # Places not touched by a run (no event produces or consumes on them) have no tokens at all, so we do not look at them.
+    # They would be trivially decided by the forward heuristic (or by the flow network if no heuristics are allowed),
+    # which we count for the runs and, in the end, for the places.
+    untouched_place_method: str = DECIDED_BY_FLOW_NETWORK if never_use_heuristics else DECIDED_BY_FORWARD_HEURISTIC
+    place_index_to_number_touching_runs: dict[int, int] = {place_index: 0 for place_index in incidence_index.inner_place_indices}
+    # we accumulate into preallocated lists instead of place statistics objects
+    place_statistics: PlaceStatisticsArrays = PlaceStatisticsArrays(len(incidence_index.places))
+    # without cache, the places decided by the forward heuristic of the multi place heuristic need no result objects
+    use_forward_heuristic_shortcut: bool = use_multi_place_heuristic and not never_use_heuristics and token_result_cache is None
+    for run in runs:
         result_run: RunConformanceResult = RunConformanceResult()
         # take care of initial and final place in workflow net
         initial_place_result: SinglePlaceTokenResult
         final_place_result: SinglePlaceTokenResult
+        start_time: float = time.perf_counter() if instrumentation is not None else 0.0
         initial_place_result, final_place_result = calculate_token_analysis_for_initial_and_final_place(run, model)
+        if instrumentation is not None:
+            instrumentation.add_phase_time(PHASE_INITIAL_AND_FINAL_PLACE, time.perf_counter() - start_time)
         if include_initial_and_final_place:
             result_run.add_single_place_result(initial_place_result)
             result_run.add_single_place_result(final_place_result)
         if run.total_order is None:
+            start_time = time.perf_counter() if instrumentation is not None else 0.0
             total_order: TotalOrder4Run = find_total_order_for_run(run)
             run.total_order = total_order
-        for place in model.inner_places:
-            forward_heuristic: SinglePlaceTokenResult = None
-            backward_heuristic: SinglePlaceTokenResult = None
-            missing_token_theoretic_optimum: int = -1
-            if not never_use_heuristics:
-                # Try forward heuristic and see if it already fits
-                forward_heuristic = do_brute_force_heuristic_for_token_analysis(run, model, place, False)
-                missing_token_theoretic_optimum = max(0, forward_heuristic.consumed_token - forward_heuristic.produced_token)
-                if missing_token_theoretic_optimum == forward_heuristic.missing_token_max or is_total_order:
-                    forward_heuristic.mark_self_as_precise()
-                    result_run.add_single_place_result(forward_heuristic)
+            if instrumentation is not None:
+                instrumentation.add_phase_time(PHASE_TOTAL_ORDER, time.perf_counter() - start_time)
+        multi_place_heuristic: MultiPlaceHeuristicResult = None
+        run_flow_network_skeleton: FlowNetworkSkeleton4Run = flow_network_skeleton
+        if run_flow_network_skeleton is None or run_flow_network_skeleton.partial_order is not run.partial_order:
+            run_flow_network_skeleton = FlowNetworkSkeleton4Run(run)
+        variant_id: int = -1
+        place_index_to_producer_positions: dict[int, tuple] = dict()
+        place_index_to_consumer_positions: dict[int, tuple] = dict()
+        if token_result_cache is not None:
+            variant_id = token_result_cache.run_variant_registry.get_variant_id(run)
+            place_index_to_producer_positions, place_index_to_consumer_positions = get_event_positions_per_place(run, model)
+        touched_place_indices: list[int] = incidence_index.get_touched_inner_place_indices(run.labels.values())
+        number_untouched_places: int = len(incidence_index.inner_place_indices) - len(touched_place_indices)
+        if untouched_place_method == DECIDED_BY_FLOW_NETWORK:
+            result_run.number_places_decided_flow_network += number_untouched_places
+        else:
+            result_run.number_places_decided_forward_heuristic += number_untouched_places
+        for place_index in touched_place_indices:
+            place: PlaceWorkflowNet = incidence_index.places[place_index]
+            place_index_to_number_touching_runs[place_index] += 1
+            if use_forward_heuristic_shortcut:
+                if multi_place_heuristic is None:
+                    multi_place_heuristic = do_multi_place_heuristic_with_instrumentation(run, model, instrumentation)
+                if multi_place_heuristic.is_forward_heuristic_precise(place_index, is_total_order):
+                    produced_token: int = multi_place_heuristic.produced_token[place_index]
+                    consumed_token: int = multi_place_heuristic.consumed_token[place_index]
+                    missing_token: int = multi_place_heuristic.forward_missing_token_max[place_index]
+                    remaining_token: int = multi_place_heuristic.forward_remaining_token_max[place_index]
                     result_run.number_places_decided_forward_heuristic += 1
-                    place_to_decision_statistic[place.name].forward_heuristic += 1
-                    place_to_decision_statistic[place.name].add_single_place_result(forward_heuristic)
+                    place_statistics.forward_heuristic[place_index] += 1
+                    result_run.add_token_counts(produced_token, consumed_token, missing_token, missing_token, remaining_token, remaining_token)
+                    place_statistics.add_token_counts(place_index, produced_token, consumed_token, missing_token, missing_token,
+                                                      remaining_token, remaining_token)
                     continue
-                # Forward heuristic failed, now try backward heuristic.
-                backward_heuristic: SinglePlaceTokenResult = do_brute_force_heuristic_for_token_analysis(run, model, place, True)
-                if missing_token_theoretic_optimum == backward_heuristic.missing_token_max:
-                    backward_heuristic.mark_self_as_precise()
-                    result_run.add_single_place_result(backward_heuristic)
-                    result_run.number_places_decided_backward_heuristic += 1
-                    place_to_decision_statistic[place.name].backward_heuristic += 1
-                    place_to_decision_statistic[place.name].add_single_place_result(backward_heuristic)
-                    continue
-            # Both heuristics failed or were now allowed; now depending on input flag we either do the precise calculation or only estimate
-            place_to_decision_statistic[place.name].maximal_flow += 1
-            result_to_use: SinglePlaceTokenResult
-            if do_calculate_precise_result:
-                result_to_use = find_optimal_tokenflow_for_place(place, run, forward_heuristic)
-                result_run.number_places_decided_flow_network += 1
+            cache_key: tuple = None
+            decision: Tuple[str, SinglePlaceTokenResult] = None
+            if token_result_cache is not None:
+                cache_key = (variant_id, place_index_to_producer_positions.get(place_index, ()), place_index_to_consumer_positions.get(place_index, ()),
+                             do_calculate_precise_result, never_use_heuristics, is_total_order)
+                decision = token_result_cache.get(cache_key)
+            if decision is None:
+                if use_multi_place_heuristic and not never_use_heuristics and multi_place_heuristic is None:
+                    multi_place_heuristic = do_multi_place_heuristic_with_instrumentation(run, model, instrumentation)
+                start_time = time.perf_counter() if instrumentation is not None else 0.0
+                decision = decide_token_result_for_place(run, model, place, multi_place_heuristic, do_calculate_precise_result,
+                                                         never_use_heuristics, is_total_order, find_optimal_tokenflow, instrumentation,
+                                                         run_flow_network_skeleton)
+                if instrumentation is not None:
+                    instrumentation.add_place_time(run, place.name, time.perf_counter() - start_time)
+                if token_result_cache is not None:
+                    token_result_cache.put(cache_key, decision)
+            method, result_to_use = decision
+            if method == DECIDED_BY_FORWARD_HEURISTIC:
+                result_run.number_places_decided_forward_heuristic += 1
+                place_statistics.forward_heuristic[place_index] += 1
+            elif method == DECIDED_BY_BACKWARD_HEURISTIC:
+                result_run.number_places_decided_backward_heuristic += 1
+                place_statistics.backward_heuristic[place_index] += 1
             else:
-                better_heuristic = forward_heuristic if forward_heuristic.missing_token_max <= backward_heuristic.missing_token_max else backward_heuristic
-                better_heuristic.missing_token_min = missing_token_theoretic_optimum
-                better_heuristic.remaining_token_min = (better_heuristic.produced_token - better_heuristic.consumed_token
-                                                        + better_heuristic.missing_token_min)
-                result_to_use = better_heuristic
-                result_run.number_places_only_estimated += 1
+                place_statistics.maximal_flow[place_index] += 1
+                if method == DECIDED_BY_FLOW_NETWORK:
+                    result_run.number_places_decided_flow_network += 1
+                else:
+                    result_run.number_places_only_estimated += 1
+                    if estimated_place_results is not None:
+                        estimated_place_results.append((run, place_index, result_to_use))
             result_run.add_single_place_result(result_to_use)
-            place_to_decision_statistic[place.name].add_single_place_result(result_to_use)
+            place_statistics.add_single_place_result(place_index, result_to_use)
         result_run.calculate_and_set_conformance_level()
         run_to_conformance_result[run] = result_run
-        weighted_tokens_sums.add_result_for_run(event_log.run_to_frequency[run], result_run)
-    total_result.fill_from_calculation_result(weighted_tokens_sums, run_to_conformance_result)
-    return total_result
+    for place_index, number_touching_runs in place_index_to_number_touching_runs.items():
+        if untouched_place_method == DECIDED_BY_FLOW_NETWORK:
+            place_statistics.maximal_flow[place_index] += len(runs) - number_touching_runs
+        else:
+            place_statistics.forward_heuristic[place_index] += len(runs) - number_touching_runs
+    # Only inner places are interesting as initial and start places are always clear to analyze
+    place_to_decision_statistic: dict[str, PlaceStatistics] = {place.name: place_statistics.make_place_statistics(incidence_index.place_to_index[place])
+                                                               for place in model.inner_places}
+    return run_to_conformance_result, place_to_decision_statistic
+
+
+def do_multi_place_heuristic_with_instrumentation(run: Run, model: WorkflowNet, instrumentation: ConformanceInstrumentation) \
+        -> MultiPlaceHeuristicResult:
+    start_time: float = time.perf_counter() if instrumentation is not None else 0.0
+    multi_place_heuristic: MultiPlaceHeuristicResult = do_multi_place_heuristic_for_token_analysis(run, model)
+    if instrumentation is not None:
+        instrumentation.add_phase_time(PHASE_MULTI_PLACE_HEURISTIC, time.perf_counter() - start_time)
+    return multi_place_heuristic
+
+
+def decide_token_result_for_place(run: Run,
+                                  model: WorkflowNet,
+                                  place: PlaceWorkflowNet,
+                                  multi_place_heuristic: MultiPlaceHeuristicResult,
+                                  do_calculate_precise_result: bool,
+                                  never_use_heuristics: bool,
+                                  is_total_order: bool,
+                                  find_optimal_tokenflow,
+                                  instrumentation: ConformanceInstrumentation = None,
+                                  flow_network_skeleton: FlowNetworkSkeleton4Run = None) -> Tuple[str, SinglePlaceTokenResult]:
+    """
+    Tries the forward heuristic, then the backward heuristic and if both fail, we either use the flow network or only
+    estimate the result by the better heuristic. The flow network starts from the token flow of the forward heuristic.
+    :param multi_place_heuristic: if not None, the heuristics are taken from here
+    :param instrumentation: if given, the times of the heuristics and of the flow network are recorded there
+    :param flow_network_skeleton: skeleton of the run for the flow network (see FlowNetworkSkeleton4Run)
+    :return: how the place was decided (one of the DECIDED_BY constants or ONLY_ESTIMATED) and the result for the place
+    """
+    place_index: int = model.get_incidence_index().place_to_index.get(place)
+    forward_heuristic: SinglePlaceTokenResult = None
+    backward_heuristic: SinglePlaceTokenResult = None
+    missing_token_theoretic_optimum: int = -1
+    forward_token_flow: HeuristicTokenFlow4Place = None
+    if not never_use_heuristics:
+        # Try forward heuristic and see if it already fits
+        if multi_place_heuristic is None:
+            forward_token_flow = HeuristicTokenFlow4Place() if do_calculate_precise_result else None
+            start_time: float = time.perf_counter() if instrumentation is not None else 0.0
+            forward_heuristic = do_brute_force_heuristic_for_token_analysis(run, model, place, False, forward_token_flow)
+            if instrumentation is not None:
+                instrumentation.add_phase_time(PHASE_FORWARD_HEURISTIC, time.perf_counter() - start_time)
+        else:
+            forward_heuristic = multi_place_heuristic.get_single_place_result(place_index, False)
+        missing_token_theoretic_optimum = max(0, forward_heuristic.consumed_token - forward_heuristic.produced_token)
+        if missing_token_theoretic_optimum == forward_heuristic.missing_token_max or is_total_order:
+            forward_heuristic.mark_self_as_precise()
+            return DECIDED_BY_FORWARD_HEURISTIC, forward_heuristic
+        # Forward heuristic failed, now try backward heuristic.
+        if multi_place_heuristic is None:
+            start_time: float = time.perf_counter() if instrumentation is not None else 0.0
+            backward_heuristic = do_brute_force_heuristic_for_token_analysis(run, model, place, True)
+            if instrumentation is not None:
+                instrumentation.add_phase_time(PHASE_BACKWARD_HEURISTIC, time.perf_counter() - start_time)
+        else:
+            backward_heuristic = multi_place_heuristic.get_single_place_result(place_index, True)
+        if missing_token_theoretic_optimum == backward_heuristic.missing_token_max:
+            backward_heuristic.mark_self_as_precise()
+            return DECIDED_BY_BACKWARD_HEURISTIC, backward_heuristic
+    # Both heuristics failed or were now allowed; now depending on input flag we either do the precise calculation or only estimate
+    if do_calculate_precise_result:
+        if forward_heuristic is not None and forward_token_flow is None:
+            # the multi place heuristic does not record token flows
+            forward_token_flow = HeuristicTokenFlow4Place()
+            start_time: float = time.perf_counter() if instrumentation is not None else 0.0
+            do_brute_force_heuristic_for_token_analysis(run, model, place, False, forward_token_flow)
+            if instrumentation is not None:
+                instrumentation.add_phase_time(PHASE_FORWARD_HEURISTIC, time.perf_counter() - start_time)
+        return DECIDED_BY_FLOW_NETWORK, find_optimal_tokenflow(place, run, forward_heuristic, forward_token_flow, instrumentation,
+                                                               flow_network_skeleton)
+    better_heuristic = forward_heuristic if forward_heuristic.missing_token_max <= backward_heuristic.missing_token_max else backward_heuristic
+    better_heuristic.missing_token_min = missing_token_theoretic_optimum
+    better_heuristic.remaining_token_min = (better_heuristic.produced_token - better_heuristic.consumed_token
+                                            + better_heuristic.missing_token_min)
+    return ONLY_ESTIMATED, better_heuristic
+
+
+def get_event_positions_per_place(run: Run, model: WorkflowNet) -> Tuple[dict[int, tuple], dict[int, tuple]]:
+    """
+    :param run: the total order has to be set
+    :return: for every place index the positions in the total order of the events producing on the place and the ones
+             of the events consuming from the place, both ascending; places without such events are missing
+    """
+    incidence_index: IncidenceIndex4WorkflowNet = model.get_incidence_index()
+    place_index_to_producer_positions: dict[int, list[int]] = dict()
+    place_index_to_consumer_positions: dict[int, list[int]] = dict()
+    for position, event in enumerate(run.total_order.order):
+        transition: TransitionWorkflowNet = run.labels[event]
+        for place_index in incidence_index.get_postset_indices(transition):
+            place_index_to_producer_positions.setdefault(place_index, []).append(position)
+        for place_index in incidence_index.get_preset_indices(transition):
+            place_index_to_consumer_positions.setdefault(place_index, []).append(position)
+    return ({place_index: tuple(positions) for place_index, positions in place_index_to_producer_positions.items()},
+            {place_index: tuple(positions) for place_index, positions in place_index_to_consumer_positions.items()})
+
+
+def calculate_run_conformance_results_with_batch_heuristic_kernel(runs: list[Run],
+                                                                  model: WorkflowNet,
+                                                                  do_calculate_precise_result: bool,
+                                                                  is_total_order: bool,
+                                                                  include_initial_and_final_place: bool,
+                                                                  find_optimal_tokenflow) \
+        -> Tuple[dict[Run, RunConformanceResult], dict[str, PlaceStatistics]]:
+    """
+    Same as calculate_run_conformance_results with heuristics, but the heuristics and the decisions are calculated for
+    all runs and places at once; only the undecided places of the precise calculation are handled one by one in the
+    flow network.
+    :param find_optimal_tokenflow: the flow network engine to use
+    :return:
+    """
+    for run in runs:
+        if run.total_order is None:
+            run.total_order = find_total_order_for_run(run)
+    inner_places: list = list(model.inner_places)
+    place_to_index: dict = model.get_incidence_index().place_to_index
+    heuristic: BatchHeuristicResult = do_batch_heuristic_for_token_analysis(runs, model)
+    decision: BatchPlaceDecision = decide_places_from_batch_heuristic(heuristic, [place_to_index[place] for place in inner_places],
+                                                                      is_total_order)
+    # the initial and final place only depend on the number of consumed/produced tokens, which the kernel already knows
+    consumed_initial_tokens: list[int] = heuristic.consumed_token[:, place_to_index[model.start_place]].tolist()
+    produced_final_tokens: list[int] = heuristic.produced_token[:, place_to_index[model.end_place]].tolist()
+    token_arrays: list[np.ndarray] = [decision.produced_token, decision.consumed_token, decision.missing_token_min,
+                                      decision.missing_token_max, decision.remaining_token_min, decision.remaining_token_max]
+    if do_calculate_precise_result:
+        # the undecided places come run by run, so the places of a run share the skeleton of its flow networks
+        flow_network_skeleton: FlowNetworkSkeleton4Run = None
+        for run_index, place_column in zip(*np.nonzero(decision.undecided)):
+            if flow_network_skeleton is None or flow_network_skeleton.partial_order is not runs[run_index].partial_order:
+                flow_network_skeleton = FlowNetworkSkeleton4Run(runs[run_index])
+            flow_result: SinglePlaceTokenResult = find_optimal_tokenflow(
+                inner_places[place_column], runs[run_index],
+                SinglePlaceTokenResult(int(decision.produced_token[run_index, place_column]), int(decision.consumed_token[run_index, place_column])),
+                None, None, flow_network_skeleton)
+            for token_array, value in zip(token_arrays, [flow_result.produced_token, flow_result.consumed_token, flow_result.missing_token_min,
+                                                         flow_result.missing_token_max, flow_result.remaining_token_min,
+                                                         flow_result.remaining_token_max]):
+                token_array[run_index, place_column] = value
+    run_sums: list[list[int]] = [token_array.sum(axis=1).tolist() for token_array in token_arrays]
+    place_sums: list[list[int]] = [token_array.sum(axis=0).tolist() for token_array in token_arrays]
+    forward_counts_runs: list[int] = decision.decided_by_forward_heuristic.sum(axis=1).tolist()
+    backward_counts_runs: list[int] = decision.decided_by_backward_heuristic.sum(axis=1).tolist()
+    undecided_counts_runs: list[int] = decision.undecided.sum(axis=1).tolist()
+    forward_counts_places: list[int] = decision.decided_by_forward_heuristic.sum(axis=0).tolist()
+    backward_counts_places: list[int] = decision.decided_by_backward_heuristic.sum(axis=0).tolist()
+    undecided_counts_places: list[int] = decision.undecided.sum(axis=0).tolist()
+
+    place_to_decision_statistic: dict[str, PlaceStatistics] = dict()
+    for place_column, place in enumerate(inner_places):
+        place_to_decision_statistic[place.name] = PlaceStatistics(
+            forward_counts_places[place_column], backward_counts_places[place_column], undecided_counts_places[place_column],
+            produced_token=place_sums[0][place_column], consumed_token=place_sums[1][place_column],
+            missing_token_min=place_sums[2][place_column], missing_token_max=place_sums[3][place_column],
+            remaining_token_min=place_sums[4][place_column], remaining_token_max=place_sums[5][place_column])
+    run_to_conformance_result: dict[Run, RunConformanceResult] = dict()
+    for run_index, run in enumerate(runs):
+        result_run: RunConformanceResult = RunConformanceResult()
+        if include_initial_and_final_place:
+            initial_place_result, final_place_result = make_token_results_for_initial_and_final_place(consumed_initial_tokens[run_index],
+                                                                                                      produced_final_tokens[run_index])
+            result_run.add_single_place_result(initial_place_result)
+            result_run.add_single_place_result(final_place_result)
+        result_run.add_single_place_result(SinglePlaceTokenResult(*[run_sum[run_index] for run_sum in run_sums]))
+        result_run.number_places_decided_forward_heuristic = forward_counts_runs[run_index]
+        result_run.number_places_decided_backward_heuristic = backward_counts_runs[run_index]
+        if do_calculate_precise_result:
+            result_run.number_places_decided_flow_network = undecided_counts_runs[run_index]
+        else:
+            result_run.number_places_only_estimated = undecided_counts_runs[run_index]
+        result_run.calculate_and_set_conformance_level()
+        run_to_conformance_result[run] = result_run
+    return run_to_conformance_result, place_to_decision_statistic
+
+
+# Number of shards each worker gets; more shards balance the work better, fewer shards reduce the pickling overhead
+SHARDS_PER_WORKER: int = 4
+
+# The net, the runs and the flags of a worker process, set once by initialize_conformance_worker
+worker_net: WorkflowNet = None
+worker_transitions: list = None
+worker_shared_log: SharedFlatEventLog = None
+worker_calculation_flags: tuple = None
+
+
+def initialize_conformance_worker(compact_net: CompactWorkflowNet, log_descriptor: SharedFlatEventLogDescriptor, calculation_flags: tuple):
+    global worker_net, worker_transitions, worker_shared_log, worker_calculation_flags
+    worker_net, worker_transitions = compact_net.make_workflow_net()
+    worker_shared_log = SharedFlatEventLog.attach(log_descriptor)
+    # the arrays have to be gone before the interpreter closes the block
+    atexit.register(worker_shared_log.release)
+    worker_calculation_flags = calculation_flags
+
+
+def calculate_run_conformance_results_for_shard(shard: range) -> Tuple[list[RunConformanceResult], dict[str, PlaceStatistics]]:
+    """
+    Runs in the worker process.
+    :param shard: the indices of the runs in the shared flat log
+    :return: the results of the runs in the order of the shard and the statistics of the places over the shard
+    """
+    runs: list[Run] = [worker_shared_log.flat_log.get_compact_run(run_index).make_run(worker_transitions) for run_index in shard]
+    run_to_conformance_result, place_to_decision_statistic = calculate_run_conformance_results(runs, worker_net, *worker_calculation_flags)
+    return [run_to_conformance_result[run] for run in runs], place_to_decision_statistic
+
+
+def calculate_run_conformance_results_in_parallel(runs: list[Run], model: WorkflowNet, workers: int, calculation_flags: tuple) \
+        -> Tuple[dict[Run, RunConformanceResult], dict[str, PlaceStatistics]]:
+    """
+    Same as calculate_run_conformance_results, but the runs are split into consecutive shards that are analyzed in a pool
+    of worker processes. The net is sent in its compact form, the runs are put once into a flat log in shared memory
+    (see SharedFlatEventLog), so every worker attaches to them without a copy and only gets the index ranges of its
+    shards. The total orders are calculated here, so they are the same as in the serial case and are set on the runs
+    as well. The results are merged in the order of the shards; since all merged values are integers, the result is the
+    same as the serial one.
+    :param calculation_flags: the flags of calculate_run_conformance_results in the same order
+    :return:
+    """
+    for run in runs:
+        if run.total_order is None:
+            run.total_order = find_total_order_for_run(run)
+    compact_net, transition_to_index = CompactWorkflowNet.make_class_instance_from_workflow_net(model, runs)
+    # the frequencies are not needed by the workers
+    flat_log: FlatEventLog = FlatEventLog.make_class_instance_from_event_log(PartiallyOrderedEventLog(dict.fromkeys(runs, 1)), transition_to_index)
+    number_shards: int = min(len(runs), workers * SHARDS_PER_WORKER)
+    shard_size: int = -(-len(runs) // number_shards)
+    shards: list[range] = [range(start, min(start + shard_size, len(runs))) for start in range(0, len(runs), shard_size)]
+
+    place_to_decision_statistic: dict[str, PlaceStatistics] = {place.name: PlaceStatistics() for place in model.inner_places}
+    run_to_conformance_result: dict[Run, RunConformanceResult] = dict()
+    run_iterator = iter(runs)
+    shared_log: SharedFlatEventLog = SharedFlatEventLog.make_class_instance_from_flat_log(flat_log)
+    try:
+        with ProcessPoolExecutor(max_workers=workers, initializer=initialize_conformance_worker,
+                                 initargs=(compact_net, shared_log.descriptor, calculation_flags)) as executor:
+            # map keeps the order of the shards
+            for shard_results, shard_place_statistics in executor.map(calculate_run_conformance_results_for_shard, shards):
+                for run_result in shard_results:
+                    run_to_conformance_result[next(run_iterator)] = run_result
+                for place_name, statistics in shard_place_statistics.items():
+                    place_to_decision_statistic[place_name].add_place_statistics(statistics)
+    finally:
+        shared_log.release()
+    return run_to_conformance_result, place_to_decision_statistic
@@ -0,0 +1,156 @@
+import json
+import os
+import tempfile
+
+from MasterThesisProject.source.algorithms.ConformanceMeasureAlgorithm import calculate_run_conformance_results
+from MasterThesisProject.source.algorithms.FindTotalOrderForPartialOrder import find_total_order_for_run
+from MasterThesisProject.source.structures.PartiallyOrderedEventLog import PartiallyOrderedEventLog
+from MasterThesisProject.source.structures.PartiallyOrderedLogConformanceResult import PartiallyOrderedLogConformanceResult, \
+    TokenResultsWeightedSum, PlaceStatistics
+from MasterThesisProject.source.structures.Run import Run
+from MasterThesisProject.source.structures.RunConformanceResult import RunConformanceResult
+from MasterThesisProject.source.structures.TokenResultCache import RunVariantRegistry, TokenResultCache
+from MasterThesisProject.source.structures.WorkflowNet import WorkflowNet
+
+# Increase whenever the format of the snapshots changes
+SNAPSHOT_FORMAT_VERSION: int = 2
+
+
+class IncrementalConformanceChecker:
+    """
+    Keeps the state of calculate_token_replay_conformance_norm_for_partial_order for a log that grows over time. Runs
+    are identified by their variant (see RunVariantRegistry): a run of a known variant only increases the frequency of
+    the variant, so only the weighted sums change, and only runs of new variants are analyzed. The result is the same
+    as the one of calculate_token_replay_conformance_norm_for_partial_order for the log of all variants seen so far.
+    Attributes:
+    ----------
+    model: the net, is not part of the snapshots
+    calculation_flags: the flags of calculate_run_conformance_results in the same order; the batch kernel is not allowed
+    run_variant_registry: gives the variant ids
+    variant_id_to_run_result: result of every variant seen so far
+    variant_id_to_frequency: how often each variant was seen so far
+    weighted_tokens_sums: the token counts of all runs weighted by the frequencies
+    place_to_decision_statistic: statistics of the inner places by name, every variant counts once
+    """
+
+    def __init__(self, model: WorkflowNet, do_calculate_precise_result: bool, never_use_heuristics=False, is_total_order=False,
+                 include_initial_and_final_place=True, use_csr_flow_network=False, use_multi_place_heuristic=False,
+                 token_result_cache: TokenResultCache = None):
+        """
+        :param token_result_cache: see calculate_token_replay_conformance_norm_for_partial_order; is not part of the snapshots
+        The other parameters are the ones of calculate_token_replay_conformance_norm_for_partial_order.
+        """
+        if not do_calculate_precise_result and never_use_heuristics:
+            raise Exception("The input flags contradict each other: you have to use the heuristics for the quick result!")
+        self.model = model
+        self.calculation_flags: tuple = (do_calculate_precise_result, never_use_heuristics, is_total_order, include_initial_and_final_place,
+                                         use_csr_flow_network, use_multi_place_heuristic, False)
+        self.token_result_cache = token_result_cache
+        self.run_variant_registry: RunVariantRegistry = RunVariantRegistry()
+        self.variant_id_to_run_result: dict[int, RunConformanceResult] = dict()
+        self.variant_id_to_frequency: dict[int, int] = dict()
+        self.weighted_tokens_sums: TokenResultsWeightedSum = TokenResultsWeightedSum()
+        self.place_to_decision_statistic: dict[str, PlaceStatistics] = {place.name: PlaceStatistics() for place in model.inner_places}
+
+    def add_runs(self, run_to_frequency: dict[Run, int]):
+        """
+        Adds the runs with the given frequencies. Only the runs of variants not seen before are analyzed, all of them in
+        one call of calculate_run_conformance_results.
+        :param run_to_frequency: the runs have to be labelled with the transitions of the model; a missing total order is set
+        """
+        new_runs: list[Run] = []
+        new_variant_ids: list[int] = []
+        variant_id_to_added_frequency: dict[int, int] = dict()
+        for run, frequency in run_to_frequency.items():
+            if frequency <= 0:
+                raise Exception("The frequency of a run has to be positive.")
+            if run.total_order is None:
+                run.total_order = find_total_order_for_run(run)
+            variant_id: int = self.run_variant_registry.get_variant_id(run)
+            if variant_id not in self.variant_id_to_frequency and variant_id not in variant_id_to_added_frequency:
+                new_runs.append(run)
+                new_variant_ids.append(variant_id)
+            variant_id_to_added_frequency[variant_id] = variant_id_to_added_frequency.get(variant_id, 0) + frequency
+        if new_runs:
+            run_to_conformance_result, place_to_decision_statistic = calculate_run_conformance_results(
+                new_runs, self.model, *self.calculation_flags, token_result_cache=self.token_result_cache)
+            for run, variant_id in zip(new_runs, new_variant_ids):
+                self.variant_id_to_run_result[variant_id] = run_to_conformance_result[run]
+            for place_name, statistics in place_to_decision_statistic.items():
+                self.place_to_decision_statistic[place_name].add_place_statistics(statistics)
+        for variant_id, frequency in variant_id_to_added_frequency.items():
+            self.variant_id_to_frequency[variant_id] = self.variant_id_to_frequency.get(variant_id, 0) + frequency
+            self.weighted_tokens_sums.add_result_for_run(frequency, self.variant_id_to_run_result[variant_id])
+
+    def add_event_log(self, event_log: PartiallyOrderedEventLog):
+        self.add_runs(event_log.run_to_frequency)
+
+    def get_run_result(self, run: Run) -> RunConformanceResult:
+        """
+        :return: the result of the variant of the run or None if the variant was not seen so far
+        """
+        if run.total_order is None:
+            run.total_order = find_total_order_for_run(run)
+        variant_id: int = self.run_variant_registry.run_key_to_variant_id.get(RunVariantRegistry.make_run_key(run), -1)
+        return self.variant_id_to_run_result.get(variant_id)
+
+    def get_result(self) -> PartiallyOrderedLogConformanceResult:
+        """
+        :return: the result for all runs seen so far; the results of the single runs are not contained, since the
+                 checker only knows the variants (see get_run_result)
+        """
+        if not self.variant_id_to_frequency:
+            raise Exception("No runs were added so far.")
+        total_result: PartiallyOrderedLogConformanceResult = PartiallyOrderedLogConformanceResult(
+            place_to_decision_statistic={place_name: PlaceStatistics(**vars(statistics))
+                                         for place_name, statistics in self.place_to_decision_statistic.items()})
+        total_result.fill_from_calculation_result(self.weighted_tokens_sums, dict())
+        return total_result
+
+    def save_snapshot(self, file_path: str):
+        """
+        Writes the state as json. We write into a temporary file first, so an interrupted call never leaves a broken
+        snapshot.
+        """
+        state: dict = {"format_version": SNAPSHOT_FORMAT_VERSION,
+                       "calculation_flags": list(self.calculation_flags),
+                       "place_names": sorted(self.place_to_decision_statistic),
+                       # as list of pairs, since the keys are tuples
+                       "run_key_to_variant_id": list(self.run_variant_registry.run_key_to_variant_id.items()),
+                       "variant_id_to_run_result": [(variant_id, vars(result)) for variant_id, result in self.variant_id_to_run_result.items()],
+                       "variant_id_to_frequency": list(self.variant_id_to_frequency.items()),
+                       "weighted_tokens_sums": vars(self.weighted_tokens_sums),
+                       "place_to_decision_statistic": {place_name: vars(statistics)
+                                                       for place_name, statistics in self.place_to_decision_statistic.items()}}
+        directory: str = os.path.dirname(os.path.abspath(file_path))
+        file_descriptor, temporary_file_path = tempfile.mkstemp(dir=directory)
+        with os.fdopen(file_descriptor, "w") as file:
+            json.dump(state, file)
+        os.replace(temporary_file_path, file_path)
+
+    def restore_snapshot(self, file_path: str):
+        """
+        Replaces the state by the one of the snapshot, which has to be written by a checker with the same flags for a
+        net with the same inner places.
+        """
+        with open(file_path) as file:
+            state: dict = json.load(file)
+        if state["format_version"] != SNAPSHOT_FORMAT_VERSION:
+            raise Exception("The snapshot has the format version %d instead of %d." % (state["format_version"], SNAPSHOT_FORMAT_VERSION))
+        if tuple(state["calculation_flags"]) != self.calculation_flags:
+            raise Exception("The snapshot was made with other flags of the calculation.")
+        if state["place_names"] != sorted(self.place_to_decision_statistic):
+            raise Exception("The snapshot was made for a net with other inner places.")
+        self.run_variant_registry = RunVariantRegistry()
+        for (labels, edges, successors, predecessors), variant_id in state["run_key_to_variant_id"]:
+            run_key: tuple = (tuple(labels), tuple(tuple(edge) for edge in edges), tuple(successors), tuple(predecessors))
+            self.run_variant_registry.run_key_to_variant_id[run_key] = variant_id
+        self.variant_id_to_run_result = dict()
+        for variant_id, result_variables in state["variant_id_to_run_result"]:
+            result: RunConformanceResult = RunConformanceResult()
+            vars(result).update(result_variables)
+            self.variant_id_to_run_result[variant_id] = result
+        self.variant_id_to_frequency = {variant_id: frequency for variant_id, frequency in state["variant_id_to_frequency"]}
+        self.weighted_tokens_sums = TokenResultsWeightedSum(**state["weighted_tokens_sums"])
+        self.place_to_decision_statistic = {place_name: PlaceStatistics(**statistics)
+                                            for place_name, statistics in state["place_to_decision_statistic"].items()}
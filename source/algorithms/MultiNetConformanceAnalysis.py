@@ -0,0 +1,112 @@
+import copy
+
+from MasterThesisProject.source.algorithms.ConformanceMeasureAlgorithm import calculate_run_conformance_results
+from MasterThesisProject.source.algorithms.FindTotalOrderForPartialOrder import find_total_order_for_run
+from MasterThesisProject.source.algorithms.PreflowPushAlgorithm4RunInWorkflownet import FlowNetworkSkeleton4Run
+from MasterThesisProject.source.structures.PartiallyOrderedEventLog import PartiallyOrderedEventLog
+from MasterThesisProject.source.structures.PartiallyOrderedLogConformanceResult import PartiallyOrderedLogConformanceResult, \
+    TokenResultsWeightedSum, PlaceStatistics
+from MasterThesisProject.source.structures.Run import Run
+from MasterThesisProject.source.structures.RunConformanceResult import RunConformanceResult
+from MasterThesisProject.source.structures.TokenResultCache import TokenResultCache
+from MasterThesisProject.source.structures.WorkflowNet import WorkflowNet, TransitionWorkflowNet
+
+# key (see get_label_key) of the transition the pnml importer adds to every net for invalid labels
+INVALID_TRANSITION_KEY: str = "INVALID TRANSITION"
+
+
+def get_label_key(transition: TransitionWorkflowNet) -> str:
+    """
+    The activity is the same for the corresponding transitions of different nets; transitions without activity (e.g. the
+    invalid transition) are identified by name.
+    """
+    return transition.name if transition.activity_description == "MISSING" else transition.activity_description
+
+
+def make_label_key_to_transition(model: WorkflowNet) -> dict[str, TransitionWorkflowNet]:
+    return {get_label_key(transition): transition for transition in model.transitions}
+
+
+def make_run_view_for_net(run: Run, label_key_to_transition: dict[str, TransitionWorkflowNet]) -> Run:
+    """
+    Makes a run with the same events, partial order, total order and canonical form as the given one, but labelled with
+    the transitions of another net; the events are not changed, only the labels of the view. The events are mapped by
+    their activity in the log (see Event4Run), so also the events the importer labelled with its invalid transition get
+    the right transition; activities that are not in the other net are replaced by its invalid transition.
+    :param run: the total order has to be set; the events contracted by compact_partial_order_of_run may touch places
+                of the other net, so the run must not have contracted events
+    :param label_key_to_transition: see make_label_key_to_transition
+    :return:
+    """
+    if run.has_contracted_events:
+        raise Exception("The run %s has contracted events, which may touch places of the other net, so it cannot be "
+                        "labelled with its transitions." % run.name_foreign_source)
+    labels: dict = dict()
+    for event, transition in run.labels.items():
+        label_key: str = get_label_key(transition) if event.activity is None else event.activity
+        if label_key == INVALID_TRANSITION_KEY:
+            raise Exception("The activity of event %s of run %s is unknown, so it cannot be labelled with the transitions of "
+                            "another net." % (event.name, run.name_foreign_source))
+        if label_key not in label_key_to_transition:
+            if INVALID_TRANSITION_KEY not in label_key_to_transition:
+                raise Exception("The activity %s is not in the net and the net has no invalid transition." % label_key)
+            label_key = INVALID_TRANSITION_KEY
+        labels[event] = label_key_to_transition[label_key]
+    # the shallow copy shares everything but the labels
+    run_view: Run = copy.copy(run)
+    run_view.labels = labels
+    return run_view
+
+
+def calculate_token_replay_conformance_for_several_nets(event_log: PartiallyOrderedEventLog,
+                                                        models: list[WorkflowNet],
+                                                        do_calculate_precise_result: bool,
+                                                        never_use_heuristics=False,
+                                                        is_total_order=False,
+                                                        include_initial_and_final_place=True,
+                                                        use_csr_flow_network=False,
+                                                        use_multi_place_heuristic=False,
+                                                        token_result_cache: TokenResultCache = None) \
+        -> list[PartiallyOrderedLogConformanceResult]:
+    """
+    Does calculate_token_replay_conformance_norm_for_partial_order for every net in one pass over the log. The total
+    order is calculated once per run and is then shared by the views of the run for the nets (see
+    make_run_view_for_net); since all nets of a run are analyzed one after another, the skeleton of the flow network is
+    also built only once per run and shared by the views. The runs are usually imported with one of the nets; for the
+    other nets the events are mapped by their activities in the log, so runs with contracted events (compact_partial_orders
+    flag of the importer) or invalid events without activity can only be analyzed for the net of their labels. The
+    parameters are the ones of calculate_token_replay_conformance_norm_for_partial_order; the cache is shared by all nets.
+    :return: the result for every net in the order of the nets; the results of the runs are given for the runs of the log
+    """
+    if not do_calculate_precise_result and never_use_heuristics:
+        raise Exception("The input flags contradict each other: you have to use the heuristics for the quick result!")
+    calculation_flags: tuple = (do_calculate_precise_result, never_use_heuristics, is_total_order, include_initial_and_final_place,
+                                use_csr_flow_network, use_multi_place_heuristic, False)
+    label_key_to_transition_per_net: list[dict[str, TransitionWorkflowNet]] = [make_label_key_to_transition(model) for model in models]
+    run_to_conformance_result_per_net: list[dict[Run, RunConformanceResult]] = [dict() for _ in models]
+    place_to_decision_statistic_per_net: list[dict[str, PlaceStatistics]] = [{place.name: PlaceStatistics() for place in model.inner_places}
+                                                                             for model in models]
+    for run in event_log.run_to_frequency:
+        if run.total_order is None:
+            run.total_order = find_total_order_for_run(run)
+        flow_network_skeleton: FlowNetworkSkeleton4Run = FlowNetworkSkeleton4Run(run)
+        for model, label_key_to_transition, run_to_conformance_result, place_to_decision_statistic in zip(
+                models, label_key_to_transition_per_net, run_to_conformance_result_per_net, place_to_decision_statistic_per_net):
+            is_labelled_for_net: bool = all(transition in model.transitions for transition in run.labels.values())
+            run_for_net: Run = run if is_labelled_for_net else make_run_view_for_net(run, label_key_to_transition)
+            run_results, run_place_statistics = calculate_run_conformance_results([run_for_net], model, *calculation_flags,
+                                                                                  token_result_cache=token_result_cache,
+                                                                                  flow_network_skeleton=flow_network_skeleton)
+            run_to_conformance_result[run] = run_results[run_for_net]
+            for place_name, statistics in run_place_statistics.items():
+                place_to_decision_statistic[place_name].add_place_statistics(statistics)
+    total_results: list[PartiallyOrderedLogConformanceResult] = []
+    for run_to_conformance_result, place_to_decision_statistic in zip(run_to_conformance_result_per_net, place_to_decision_statistic_per_net):
+        weighted_tokens_sums: TokenResultsWeightedSum = TokenResultsWeightedSum()
+        for run, frequency in event_log.run_to_frequency.items():
+            weighted_tokens_sums.add_result_for_run(frequency, run_to_conformance_result[run])
+        total_result: PartiallyOrderedLogConformanceResult = PartiallyOrderedLogConformanceResult(
+            place_to_decision_statistic=place_to_decision_statistic)
+        total_result.fill_from_calculation_result(weighted_tokens_sums, run_to_conformance_result)
+        total_results.append(total_result)
+    return total_results
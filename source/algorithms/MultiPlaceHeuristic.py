@@ -0,0 +1,122 @@
+from MasterThesisProject.source.structures.Run import Run
+from MasterThesisProject.source.structures.SinglePlaceTokenResult import SinglePlaceTokenResult
+from MasterThesisProject.source.structures.TotalOrderForRun import TotalOrder4Run
+from MasterThesisProject.source.structures.WorkflowNet import WorkflowNet, IncidenceIndex4WorkflowNet
+
+
+class MultiPlaceHeuristicResult:
+    """
+    Keeps the results of the forward and backward heuristic for all places of a net in lists indexed by the place
+    index of the incidence index of the net. Produced and consumed tokens do not depend on the direction.
+    """
+
+    def __init__(self, produced_token: list[int], consumed_token: list[int], forward_missing_token_max: list[int],
+                 forward_remaining_token_max: list[int], backward_missing_token_max: list[int],
+                 backward_remaining_token_max: list[int]):
+        self.produced_token = produced_token
+        self.consumed_token = consumed_token
+        self.forward_missing_token_max = forward_missing_token_max
+        self.forward_remaining_token_max = forward_remaining_token_max
+        self.backward_missing_token_max = backward_missing_token_max
+        self.backward_remaining_token_max = backward_remaining_token_max
+
+    def is_forward_heuristic_precise(self, place_index: int, is_total_order: bool) -> bool:
+        """
+        Same check as in decide_token_result_for_place: the forward heuristic is precise if it reaches the theoretic
+        optimum of missing tokens (or always for totally ordered runs).
+        """
+        return is_total_order or self.forward_missing_token_max[place_index] == max(0, self.consumed_token[place_index]
+                                                                                        - self.produced_token[place_index])
+
+    def get_single_place_result(self, place_index: int, is_backward_heuristic: bool) -> SinglePlaceTokenResult:
+        """
+        Same result as do_brute_force_heuristic_for_token_analysis would give for the place, i.e., the minimal values are
+        not filled and the result is not precise.
+        """
+        missing_token_max = self.backward_missing_token_max if is_backward_heuristic else self.forward_missing_token_max
+        remaining_token_max = self.backward_remaining_token_max if is_backward_heuristic else self.forward_remaining_token_max
+        return SinglePlaceTokenResult(self.produced_token[place_index], self.consumed_token[place_index],
+                                      missing_token_max=missing_token_max[place_index],
+                                      remaining_token_max=remaining_token_max[place_index], is_precise=False)
+
+
+def do_multi_place_heuristic_for_token_analysis(run: Run, model: WorkflowNet) -> MultiPlaceHeuristicResult:
+    """
+    Performs the forward and the backward brute force heuristic for all places of the net at once. We walk the total order
+    of the run only once: in step k the forward heuristic handles the k-th event and the backward heuristic the k-th
+    event from the end. Every event keeps a marking vector over all places, which is pushed to the successor (forward)
+    or predecessor (backward) event of the total order. The marking vectors are sparse (place index -> tokens), since
+    in a run only few places carry tokens at the same time.
+    :param run: the total order of the run has to be set
+    :param model:
+    :return:
+    """
+    incidence_index: IncidenceIndex4WorkflowNet = model.get_incidence_index()
+    number_places: int = len(incidence_index.places)
+    order: TotalOrder4Run = run.total_order
+    events: list = order.order
+    number_events: int = len(events)
+    preset_indices: list[list[int]] = [incidence_index.get_preset_indices(run.labels[event]) for event in events]
+    postset_indices: list[list[int]] = [incidence_index.get_postset_indices(run.labels[event]) for event in events]
+
+    produced_token: list[int] = [0] * number_places
+    consumed_token: list[int] = [0] * number_places
+    forward_missing: list[int] = [0] * number_places
+    forward_remaining: list[int] = [0] * number_places
+    # in backward direction the roles of consumption and production are switched
+    backward_remaining_raw: list[int] = [0] * number_places
+    event_to_forward_marking: dict = dict()
+    event_to_backward_marking: dict = dict()
+
+    def push_marking(marking: dict, next_event, event_to_marking: dict, remaining: list[int]):
+        if next_event is None:
+            for place_index, tokens in marking.items():
+                remaining[place_index] += tokens
+            return
+        next_marking: dict = event_to_marking.get(next_event)
+        if next_marking is None:
+            event_to_marking[next_event] = marking
+            return
+        if len(next_marking) < len(marking):
+            next_marking, marking = marking, next_marking
+            event_to_marking[next_event] = next_marking
+        for place_index, tokens in marking.items():
+            next_marking[place_index] = next_marking.get(place_index, 0) + tokens
+
+    for step in range(number_events):
+        # forward heuristic
+        event = events[step]
+        marking: dict = event_to_forward_marking.pop(event, None)
+        if marking is None:
+            marking = dict()
+        for place_index in preset_indices[step]:
+            consumed_token[place_index] += 1
+            tokens: int = marking.get(place_index, 0)
+            if tokens == 0:
+                forward_missing[place_index] += 1
+            else:
+                marking[place_index] = tokens - 1
+        for place_index in postset_indices[step]:
+            produced_token[place_index] += 1
+            marking[place_index] = marking.get(place_index, 0) + 1
+        push_marking(marking, order.event_to_successor_event[event], event_to_forward_marking, forward_remaining)
+        # backward heuristic; we do not need the missing tokens here as they correspond to the remaining tokens
+        position: int = number_events - 1 - step
+        event = events[position]
+        marking = event_to_backward_marking.pop(event, None)
+        if marking is None:
+            marking = dict()
+        for place_index in postset_indices[position]:
+            tokens: int = marking.get(place_index, 0)
+            if tokens != 0:
+                marking[place_index] = tokens - 1
+        for place_index in preset_indices[position]:
+            marking[place_index] = marking.get(place_index, 0) + 1
+        push_marking(marking, order.event_to_predecessor_event[event], event_to_backward_marking, backward_remaining_raw)
+
+    # for the backward heuristic we switch roles and correct remaining tokens (as in the single place version)
+    backward_missing: list[int] = backward_remaining_raw
+    backward_remaining: list[int] = [produced_token[index] - consumed_token[index] + backward_remaining_raw[index]
+                                     for index in range(number_places)]
+    return MultiPlaceHeuristicResult(produced_token, consumed_token, forward_missing, forward_remaining, backward_missing,
+                                     backward_remaining)
@@ -1,10 +1,11 @@
-import math
+import time
 from collections import deque
 from enum import Enum
-import networkx as nx
-import matplotlib.pyplot as plt
 from networkx import DiGraph
 
+from MasterThesisProject.source.structures.ConformanceInstrumentation import ConformanceInstrumentation, PHASE_MAX_FLOW_CONSTRUCTION, \
+    PHASE_MAX_FLOW_SOLVING
+from MasterThesisProject.source.structures.HeuristicTokenFlow4Place import HeuristicTokenFlow4Place
 from MasterThesisProject.source.structures.Run import Run, Event4Run
 from MasterThesisProject.source.structures.SinglePlaceTokenResult import SinglePlaceTokenResult
 from MasterThesisProject.source.structures.WorkflowNet import PlaceWorkflowNet
@@ -23,6 +24,8 @@ class NodeType(Enum):
 
 
 class Node4FlowNetwork:
+    __slots__ = ("type", "event", "excess", "label")
+
     def __init__(self, node_type: NodeType, event: Event4Run, label: int = -1):
         self.type = node_type
         self.event = event
@@ -46,6 +49,10 @@ class MaxFlowNetwork:
             during the algorithm
         maximal_possible_flow : int
             correct initilization is done in the construction of the flow network
+        event_to_top_node, event_to_bottom_node : dict
+            the TOP and BOTTOM node of every event of the run
+        number_pushes, number_relabels, number_discharges, number_gap_relabels, number_global_relabels : int
+            operation counters of the preflow push algorithm, a gap relabel counts once no matter how many nodes it lifts
     """
 
     def __init__(self, sink: Node4FlowNetwork, source: Node4FlowNetwork, network: DiGraph, number_sink_neighbor: int,
@@ -58,156 +65,363 @@ class MaxFlowNetwork:
         self.unreachable_sink_neighbors: int = 0
         self.realized_flow: int = 0
         self.maximal_possible_flow: int = 0
+        self.event_to_top_node: dict = dict()
+        self.event_to_bottom_node: dict = dict()
+        self.number_pushes: int = 0
+        self.number_relabels: int = 0
+        self.number_discharges: int = 0
+        self.number_gap_relabels: int = 0
+        self.number_global_relabels: int = 0
 
 
-def find_optimal_tokenflow_for_place(place: PlaceWorkflowNet, run: Run, heuristic: SinglePlaceTokenResult) \
-        -> SinglePlaceTokenResult:
+class FlowNetworkSkeleton4Run:
     """
-    Function calculates the minimal possible number of missing tokens in the optimal tokenflow.
+    The part of the maximum flow network that is the same for all places of a run: the TOP and BOTTOM nodes of all
+    events, source and sink, and the arcs between the events. Only the source and sink arcs and the capacities of the
+    inner arcs depend on the place, thus the flow network of a place is made by resetting the skeleton and attaching the
+    arcs of the place (see build_maximal_flow_problem). The nodes and arcs are only made for the first network, so a
+    skeleton of a run whose places are all decided by the heuristics costs nothing.
+    Attributes:
+    ----------
+        partial_order : DiGraph
+            the skeleton is only valid for runs with this partial order, which may differ in their labels (e.g. the
+            same run labelled with the transitions of different nets)
+        graph : DiGraph
+            the network of the place the skeleton was used for last, None before the first network
+        inner_edges : list[dict]
+            data of the arcs between the events and of their reverse arcs, in pairs (arc, reverse arc)
+        place_edges : list[tuple]
+            source and sink arcs (with their reverse arcs) of the place the skeleton was used for last
+    """
+
+    def __init__(self, run: Run):
+        self.partial_order: DiGraph = run.partial_order
+        self.events: list[Event4Run] = list(run.partial_order)
+        self.graph: DiGraph = None
+        self.sink: Node4FlowNetwork = None
+        self.source: Node4FlowNetwork = None
+        self.top_nodes: dict = dict()
+        self.bottom_nodes: dict = dict()
+        self.inner_edges: list[dict] = []
+        self.place_edges: list[tuple] = []
+
+    def build_graph(self):
+        self.sink = Node4FlowNetwork(NodeType.SINK, None, 0)
+        self.source = Node4FlowNetwork(NodeType.SOURCE, None)
+        self.graph = DiGraph()
+        self.graph.add_nodes_from([self.sink, self.source])
+        self.top_nodes = {event: Node4FlowNetwork(NodeType.TOP, event) for event in self.events}
+        self.bottom_nodes = {event: Node4FlowNetwork(NodeType.BOTTOM, event) for event in self.events}
+        for event in self.events:
+            # Connect top to bottom node
+            self.graph.add_edge(self.top_nodes[event], self.bottom_nodes[event])
+            self.graph.add_edge(self.bottom_nodes[event], self.top_nodes[event])
+            # connect bottom node to top node of following events
+            for next_event in self.partial_order.neighbors(event):
+                self.graph.add_edge(self.bottom_nodes[event], self.top_nodes[next_event])
+                self.graph.add_edge(self.top_nodes[next_event], self.bottom_nodes[event])
+        for event in self.events:
+            self.inner_edges.append(self.graph.adj[self.top_nodes[event]][self.bottom_nodes[event]])
+            self.inner_edges.append(self.graph.adj[self.bottom_nodes[event]][self.top_nodes[event]])
+            for next_event in self.partial_order.neighbors(event):
+                self.inner_edges.append(self.graph.adj[self.bottom_nodes[event]][self.top_nodes[next_event]])
+                self.inner_edges.append(self.graph.adj[self.top_nodes[next_event]][self.bottom_nodes[event]])
+
+    def reset(self, consumed_token: int, default_label: int):
+        """
+        Removes the source and sink arcs of the last place, removes all flow and sets the capacities of the inner arcs.
+        """
+        if self.graph is None:
+            self.build_graph()
+        self.graph.remove_edges_from(self.place_edges)
+        self.place_edges = []
+        for index in range(0, len(self.inner_edges), 2):
+            self.inner_edges[index].update(capacity=consumed_token, flow=0, residual=consumed_token)
+            self.inner_edges[index + 1].update(capacity=0, flow=0, residual=0)
+        for node in self.graph:
+            node.excess = 0
+            node.label = default_label
+        self.sink.label = 0
+
+    def add_edge_with_reverse_edge(self, from_node: Node4FlowNetwork, to_node: Node4FlowNetwork, capacity: int):
+        self.graph.add_edge(from_node, to_node, capacity=capacity, flow=0, residual=capacity)
+        self.graph.add_edge(to_node, from_node, capacity=0, flow=0, residual=0)
+        self.place_edges.extend([(from_node, to_node), (to_node, from_node)])
+
+
+def build_maximal_flow_problem(place: PlaceWorkflowNet, run: Run, consumed_token: int, produced_token=0,
+                               skeleton: FlowNetworkSkeleton4Run = None) -> MaxFlowNetwork:
+    """
+    Build network and also prepare initial labeling.
     :param place:
     :param run:
-    :param heuristic: Previous calculated heuristic has already information on produced and consumed tokens.
+    :param produced_token:
+    :param consumed_token:
+    :param skeleton: if given, the network is made from this skeleton of the run, so it is only valid until the next
+                     network is made from the skeleton; otherwise the network is independent of all others
     :return:
     """
+    if skeleton is None:
+        skeleton = FlowNetworkSkeleton4Run(run)
+    elif skeleton.partial_order is not run.partial_order:
+        raise Exception("The skeleton of the flow network was made for another run.")
+    # source and sink have special labeling, and we know the number of nodes in the flow network in advance
+    size_flow_network = 2 * len(skeleton.events) + 2
+    # we will calculate precise initial labels for the nodes; nodes that are not reached cannot flow to the sink,
+    # thus we choose a default label that disqualifies them but is still compatible with source, i.e., the size of the
+    # flow network + 1
+    default_label: int = size_flow_network + 1
+    skeleton.reset(consumed_token, default_label)
+    sink: Node4FlowNetwork = skeleton.sink
+    source: Node4FlowNetwork = skeleton.source
+    source.label = size_flow_network
+    source.excess = produced_token
+    graph: DiGraph = skeleton.graph
+    result_network: MaxFlowNetwork = MaxFlowNetwork(sink, source, graph, 0, set())
+    result_network.event_to_top_node = skeleton.top_nodes
+    result_network.event_to_bottom_node = skeleton.bottom_nodes
+    queue_for_labeling: deque[Node4FlowNetwork] = deque()
+    for event in skeleton.events:
+        transition = run.labels[event]
+        # connect source if a token on place p is produced in the event
+        if place in transition.postset:
+            skeleton.add_edge_with_reverse_edge(source, skeleton.bottom_nodes[event], 1)
+        # connect sink if a token on place p is consumed in the event and set label in top node
+        if place in transition.preset:
+            top_node_for_event: Node4FlowNetwork = skeleton.top_nodes[event]
+            top_node_for_event.label = 1
+            queue_for_labeling.append(top_node_for_event)
+            skeleton.add_edge_with_reverse_edge(top_node_for_event, sink, 1)
+            result_network.number_sink_neighbors += 1
+            result_network.sink_neighbors.add(top_node_for_event)
+    # now fill labels beginning from the top nodes connected to the sink
+    while queue_for_labeling:
+        next_node: Node4FlowNetwork = queue_for_labeling.popleft()
+        neighbor_without_label: set[Node4FlowNetwork] = {node for node in graph.predecessors(next_node)
+                                                         if (node.label == default_label and graph.edges[node, next_node]['capacity'] != 0)}
+        for neighbor_node in neighbor_without_label:
+            neighbor_node.label = next_node.label + 1
+        queue_for_labeling.extend(neighbor_without_label)
+    return result_network
+
+
+def calculate_maximal_flow(flow_network: MaxFlowNetwork, initial_flow: HeuristicTokenFlow4Place = None) -> int:
+    """
+    Highest label preflow push algorithm. The active nodes are kept in one bucket per label, so the next node is found
+    in constant time. We only need the value of the maximal flow and not the flow itself, thus we only run the first
+    phase: a node whose label reaches the size of the network can no longer reach the sink and is not discharged
+    anymore. Its excess would only flow back to the source. To get there fast we use two heuristics:
+    - gap relabeling: if no node has the label d anymore, no node with a label above d can reach the sink
+    - global relabeling: after size of the network many relabels, all labels are set to the exact distance to the sink
+    :param flow_network: network with valid initial labels, before the initial push
+    :param initial_flow: feasible flow, e.g., the one realized by the forward heuristic; then only the remaining source
+                         arcs are saturated in the initial push and only the missing augmenting work is left
+    :return: value of the maximal flow
+    """
+    network: DiGraph = flow_network.network
+    adjacency = network.adj
+    source: Node4FlowNetwork = flow_network.source
+    sink: Node4FlowNetwork = flow_network.sink
+    size_flow_network: int = network.number_of_nodes()
+    # label of the nodes that cannot reach the sink anymore, compatible with the source
+    dead_label: int = size_flow_network + 1
+    # active nodes and all nodes (except source and sink) by label; only labels below the size of the network are kept
+    active_buckets: list[list[Node4FlowNetwork]] = [[] for _ in range(size_flow_network)]
+    label_buckets: list[set[Node4FlowNetwork]] = [set() for _ in range(size_flow_network)]
+    inner_nodes: list[Node4FlowNetwork] = [node for node in network if node is not source and node is not sink]
+    for node in inner_nodes:
+        if node.label < size_flow_network:
+            label_buckets[node.label].add(node)
 
-    def build_maximal_flow_problem(consumed_token: int, produced_token=0) -> MaxFlowNetwork:
+    def set_flow(from_node: Node4FlowNetwork, to_node: Node4FlowNetwork, amount: int):
+        edge: dict = adjacency[from_node][to_node]
+        reverse_edge: dict = adjacency[to_node][from_node]
+        if amount > edge["residual"]:
+            raise Exception("The initial flow exceeds the capacity of an arc.")
+        edge["flow"] += amount
+        reverse_edge["flow"] -= amount
+        edge["residual"] -= amount
+        reverse_edge["residual"] += amount
+
+    def do_initial_flow():
         """
-        Build network and also prepare initial labeling.
-        :param produced_token:
-        :param consumed_token:
-        :return:
+        The flow is feasible, so no node has excess afterward; only the labels have to be recalculated.
         """
-        # source and sink have special labeling, and we know the number of nodes in the flow network in advance
-        sink: Node4FlowNetwork = Node4FlowNetwork(NodeType.SINK, None, 0)
-        size_flow_network = 2 * len(run.total_order.order) + 2
-        default_label: int = size_flow_network - 1
-        source: Node4FlowNetwork = Node4FlowNetwork(NodeType.SOURCE, None, size_flow_network)
-        source.excess = produced_token
-        graph: DiGraph = DiGraph()
-        graph.add_nodes_from([sink, source])
-        result_network: MaxFlowNetwork = MaxFlowNetwork(sink, source, graph, 0, set())
-        partial_order_run: DiGraph = run.partial_order
-        list_events: list[Event4Run] = list(partial_order_run)
-        # we will calculate precise initial labels for the nodes; nodes that are not reached cannot flow to the sink,
-        # thus we choose a default label that disqualifies them but is still compatible with source
-        # , i.e., the size of the flow network - 1
-        top_nodes: dict = {event: Node4FlowNetwork(NodeType.TOP, event, default_label) for event in list_events}
-        bottom_nodes: dict = {event: Node4FlowNetwork(NodeType.BOTTOM, event, default_label) for event in list_events}
-        queue_for_labeling: deque[Node4FlowNetwork] = deque()
-        for event in list_events:
-            # Connect top to bottom node
-            graph.add_edge(top_nodes[event], bottom_nodes[event], capacity=consumed_token, flow=0,
-                           residual=consumed_token)
-            graph.add_edge(bottom_nodes[event], top_nodes[event], capacity=0, flow=0, residual=0)
-            # connect source if a token on place p is produced in the event
-            if place in event.label.postset:
-                graph.add_edge(source, bottom_nodes[event], capacity=1, flow=0, residual=1)
-                graph.add_edge(bottom_nodes[event], source, capacity=0, flow=0, residual=0)
-            # connect sink if a token on place p is consumed in the event and set label in top node
-            if place in event.label.preset:
-                top_node_for_event: Node4FlowNetwork = top_nodes[event]
-                top_node_for_event.label = 1
-                queue_for_labeling.append(top_node_for_event)
-                graph.add_edge(top_node_for_event, sink, capacity=1, flow=0, residual=1)
-                graph.add_edge(sink, top_node_for_event, capacity=0, flow=0, residual=0)
-                result_network.number_sink_neighbors += 1
-                result_network.sink_neighbors.add(top_node_for_event)
-            # connect bottom node to top node of following events
-            for next_event in partial_order_run.neighbors(event):
-                graph.add_edge(bottom_nodes[event], top_nodes[next_event], capacity=consumed_token, flow=0,
-                               residual=consumed_token)
-                graph.add_edge(top_nodes[next_event], bottom_nodes[event], capacity=0, flow=0, residual=0)
-        # now fill labels beginning from the top nodes connected to the sink
-        while queue_for_labeling:
-            next_node: Node4FlowNetwork = queue_for_labeling.popleft()
-            neighbor_without_label: set[Node4FlowNetwork] = {node for node in graph.predecessors(next_node)
-                                                             if (node.label == default_label and graph.edges[node, next_node]['capacity'] != 0)}
-            for neighbor_node in neighbor_without_label:
-                neighbor_node.label = next_node.label + 1
-            queue_for_labeling.extend(neighbor_without_label)
-        return result_network
-
-    # If the heuristic is not provided we have to calculate the consumed token now
-    number_consumed_tokens: int = 0
-    number_produced_tokens: int = 0
-    if heuristic is None:
-        for event_in_run in run.labels:
-            if place in event_in_run.label.preset:
-                number_consumed_tokens += 1
-            if place in event_in_run.label.postset:
-                number_produced_tokens += 1
-    else:
-        number_consumed_tokens = heuristic.consumed_token
-        number_produced_tokens = heuristic.produced_token
-    flow_network: MaxFlowNetwork = build_maximal_flow_problem(number_consumed_tokens, number_produced_tokens)
-    active_nodes: set[Node4FlowNetwork] = set()
+        for event, amount in initial_flow.event_to_produced_token.items():
+            set_flow(source, flow_network.event_to_bottom_node[event], amount)
+            source.excess -= amount
+            flow_network.maximal_possible_flow += amount
+        for event, amount in initial_flow.event_to_passed_token.items():
+            set_flow(flow_network.event_to_top_node[event], flow_network.event_to_bottom_node[event], amount)
+        for event, amount in initial_flow.event_to_consumed_token.items():
+            set_flow(flow_network.event_to_top_node[event], sink, amount)
+            sink.excess += amount
+            flow_network.realized_flow += amount
+        for (event, next_event), amount in initial_flow.edge_to_pushed_token.items():
+            set_flow(flow_network.event_to_bottom_node[event], flow_network.event_to_top_node[next_event], amount)
+        global_relabel()
 
     def do_initial_push():
         """
         NOTE: due to the network structure we never directly push from sink to source!
         :return:
         """
-        for source_neighbor in flow_network.network.neighbors(flow_network.source):
-            flow_network.network.edges[flow_network.source, source_neighbor]["flow"] = 1
-            flow_network.network.edges[flow_network.source, source_neighbor]["residual"] = 0
-            flow_network.network.edges[source_neighbor, flow_network.source]["flow"] = -1
-            flow_network.network.edges[source_neighbor, flow_network.source]["residual"] = 1
-            source_neighbor.excess = 1
-            flow_network.source.excess -= 1
+        for source_neighbor, edge in adjacency[source].items():
+            if edge["residual"] == 0:
+                continue
+            edge["flow"] = 1
+            edge["residual"] = 0
+            reverse_edge: dict = adjacency[source_neighbor][source]
+            reverse_edge["flow"] = -1
+            reverse_edge["residual"] = 1
+            source_neighbor.excess += 1
+            source.excess -= 1
             flow_network.maximal_possible_flow += 1
-            active_nodes.add(source_neighbor)
-        if flow_network.source.excess != 0:
+            if source_neighbor.label < size_flow_network:
+                active_buckets[source_neighbor.label].append(source_neighbor)
+        if source.excess != 0:
             raise Exception("Source has still excess after initial push.")
 
-    def push(from_node: Node4FlowNetwork, to_node: Node4FlowNetwork):
-        amount: int = min(from_node.excess, flow_network.network.edges[from_node, to_node]["residual"])
+    def push(from_node: Node4FlowNetwork, to_node: Node4FlowNetwork, edge: dict):
+        amount: int = min(from_node.excess, edge["residual"])
         if amount < 0 or amount > from_node.excess:
             raise Exception("A push operation pushes more than possible.")
-        flow_network.network.edges[from_node, to_node]["flow"] += amount
-        flow_network.network.edges[to_node, from_node]["flow"] -= amount
-        flow_network.network.edges[from_node, to_node]["residual"] -= amount
-        flow_network.network.edges[to_node, from_node]["residual"] += amount
+        reverse_edge: dict = adjacency[to_node][from_node]
+        edge["flow"] += amount
+        reverse_edge["flow"] -= amount
+        edge["residual"] -= amount
+        reverse_edge["residual"] += amount
         from_node.excess -= amount
         to_node.excess += amount
+        flow_network.number_pushes += 1
         # if flow reached the sink, we can higher the already realized flow
-        if to_node == flow_network.sink:
+        if to_node is sink:
             flow_network.realized_flow += amount
 
     def relabel(node: Node4FlowNetwork):
+        old_label: int = node.label
         # effectively infinity
-        new_label: int = flow_network.source.label + 2
-        for neighbor in flow_network.network.neighbors(node):
-            if flow_network.network.edges[node, neighbor]["residual"] > 0:
+        new_label: int = dead_label - 1
+        for neighbor, edge in adjacency[node].items():
+            if edge["residual"] > 0:
                 new_label = min(new_label, neighbor.label)
         node.label = new_label + 1
+        flow_network.number_relabels += 1
         # the sink neighbor has now increased its label and can no longer push to the is sink
         if node in flow_network.sink_neighbors:
             flow_network.unreachable_sink_neighbors += 1
+        label_buckets[old_label].discard(node)
+        if not label_buckets[old_label]:
+            # gap: the node itself and all nodes above cannot reach the sink anymore; there are no active nodes above
+            # the old label, since we always discharge a node with the highest label
+            flow_network.number_gap_relabels += 1
+            node.label = dead_label
+            for label in range(old_label + 1, size_flow_network):
+                for lifted_node in label_buckets[label]:
+                    lifted_node.label = dead_label
+                label_buckets[label].clear()
+        elif node.label < size_flow_network:
+            label_buckets[node.label].add(node)
 
-    def discharge(node: Node4FlowNetwork):
-        while node.excess > 0:
-            for neighbor_node in flow_network.network.neighbors(node):
-                if flow_network.network.edges[node, neighbor_node]["residual"] > 0:
-                    if node.label == neighbor_node.label + 1:
-                        push(node, neighbor_node)
-                        is_neighbor_sink_or_source: bool = (neighbor_node == flow_network.source or neighbor_node == flow_network.sink)
-                        is_neighbor_new_active_node: bool = neighbor_node.excess > 0 and neighbor_node not in active_nodes
-                        if is_neighbor_new_active_node and not is_neighbor_sink_or_source:
-                            active_nodes.add(neighbor_node)
-                        if len(active_nodes) > number_produced_tokens:
-                            raise Exception("There is more excess flow than produced tokens in the net.")
-                        if node.excess == 0:
-                            return
+    def discharge(node: Node4FlowNetwork) -> int:
+        """
+        :return: the highest label of a node that became active
+        """
+        flow_network.number_discharges += 1
+        highest_new_active_label: int = -1
+        while node.excess > 0 and node.label < size_flow_network:
+            for neighbor_node, edge in adjacency[node].items():
+                if edge["residual"] > 0 and node.label == neighbor_node.label + 1:
+                    is_neighbor_new_active_node: bool = neighbor_node.excess == 0 and neighbor_node is not source \
+                                                        and neighbor_node is not sink
+                    push(node, neighbor_node, edge)
+                    if is_neighbor_new_active_node:
+                        active_buckets[neighbor_node.label].append(neighbor_node)
+                        highest_new_active_label = max(highest_new_active_label, neighbor_node.label)
+                    if node.excess == 0:
+                        return highest_new_active_label
             relabel(node)
+        return highest_new_active_label
 
+    def global_relabel():
+        """
+        Exact distance labels to the sink by a backward breadth first search in the residual network.
+        """
+        flow_network.number_global_relabels += 1
+        for node in inner_nodes:
+            node.label = dead_label
+        for bucket in label_buckets:
+            bucket.clear()
+        queue: deque[Node4FlowNetwork] = deque([sink])
+        while queue:
+            next_node: Node4FlowNetwork = queue.popleft()
+            for neighbor_node in network.predecessors(next_node):
+                if neighbor_node.label == dead_label and adjacency[neighbor_node][next_node]["residual"] > 0:
+                    neighbor_node.label = next_node.label + 1
+                    label_buckets[neighbor_node.label].add(neighbor_node)
+                    queue.append(neighbor_node)
+        for bucket in active_buckets:
+            bucket.clear()
+        for node in inner_nodes:
+            if node.excess > 0 and node.label < size_flow_network:
+                active_buckets[node.label].append(node)
+
+    if initial_flow is not None:
+        do_initial_flow()
     do_initial_push()
-    while len(active_nodes) != 0:
-        current_node: Node4FlowNetwork = max(active_nodes, key=lambda node: node.label)
-        active_nodes.remove(current_node)
-        discharge(current_node)
+    highest_active_label: int = size_flow_network - 1
+    relabels_at_last_global_relabel: int = 0
+    while highest_active_label >= 0:
+        if flow_network.number_relabels - relabels_at_last_global_relabel >= size_flow_network:
+            global_relabel()
+            relabels_at_last_global_relabel = flow_network.number_relabels
+            highest_active_label = size_flow_network - 1
+        bucket: list[Node4FlowNetwork] = active_buckets[highest_active_label]
+        if not bucket:
+            highest_active_label -= 1
+            continue
+        highest_active_label = max(highest_active_label, discharge(bucket.pop()))
+
+    return sum(adjacency[sink_neighbor][sink]["flow"] for sink_neighbor in flow_network.sink_neighbors)
 
-    maximal_flow: int = sum(flow_network.network.edges[sink_neighbor, flow_network.sink]["flow"]
-                            for sink_neighbor in flow_network.sink_neighbors)
+
+def find_optimal_tokenflow_for_place(place: PlaceWorkflowNet, run: Run, heuristic: SinglePlaceTokenResult,
+                                     initial_flow: HeuristicTokenFlow4Place = None,
+                                     instrumentation: ConformanceInstrumentation = None,
+                                     flow_network_skeleton: FlowNetworkSkeleton4Run = None) -> SinglePlaceTokenResult:
+    """
+    Function calculates the minimal possible number of missing tokens in the optimal tokenflow.
+    :param place:
+    :param run:
+    :param heuristic: Previous calculated heuristic has already information on produced and consumed tokens.
+    :param initial_flow: token flow realized by the forward heuristic, the maximal flow is calculated starting from it
+    :param instrumentation: if given, the times of construction and solving and the operation counters are added
+    :param flow_network_skeleton: skeleton of the run (see FlowNetworkSkeleton4Run), e.g. shared by all places of the
+                                  run; without, the network is built from scratch
+    :return:
+    """
+    # If the heuristic is not provided we have to calculate the consumed token now
+    number_consumed_tokens: int = 0
+    number_produced_tokens: int = 0
+    if heuristic is None:
+        for transition in run.labels.values():
+            if place in transition.preset:
+                number_consumed_tokens += 1
+            if place in transition.postset:
+                number_produced_tokens += 1
+    else:
+        number_consumed_tokens = heuristic.consumed_token
+        number_produced_tokens = heuristic.produced_token
+    start_time: float = time.perf_counter() if instrumentation is not None else 0.0
+    flow_network: MaxFlowNetwork = build_maximal_flow_problem(place, run, number_consumed_tokens, number_produced_tokens,
+                                                               flow_network_skeleton)
+    if instrumentation is not None:
+        construction_end_time: float = time.perf_counter()
+        instrumentation.add_phase_time(PHASE_MAX_FLOW_CONSTRUCTION, construction_end_time - start_time)
+    maximal_flow: int = calculate_maximal_flow(flow_network, initial_flow)
+    if instrumentation is not None:
+        instrumentation.add_phase_time(PHASE_MAX_FLOW_SOLVING, time.perf_counter() - construction_end_time)
+        instrumentation.add_flow_network_counters(flow_network)
     missing_token: int = number_consumed_tokens - maximal_flow
     remaining_token: int = number_produced_tokens - number_consumed_tokens + missing_token
     result: SinglePlaceTokenResult = SinglePlaceTokenResult(number_produced_tokens, number_consumed_tokens,
@@ -0,0 +1,324 @@
+import time
+
+from MasterThesisProject.source.structures.ConformanceInstrumentation import ConformanceInstrumentation, PHASE_MAX_FLOW_CONSTRUCTION, \
+    PHASE_MAX_FLOW_SOLVING
+from MasterThesisProject.source.structures.HeuristicTokenFlow4Place import HeuristicTokenFlow4Place
+from MasterThesisProject.source.structures.Run import Run
+from MasterThesisProject.source.structures.SinglePlaceTokenResult import SinglePlaceTokenResult
+from MasterThesisProject.source.structures.WorkflowNet import PlaceWorkflowNet
+
+
+class CsrMaxFlowNetwork:
+    """
+    Array based version of the maximum flow network implied by a run and a place. In contrast to the networkx based
+    implementation, all nodes are plain integers and all arcs are kept in compressed sparse row (CSR) arrays.
+    ...
+    Attributes:
+    ----------
+        number_events : int
+            the events of the run are numbered 0..n-1; the TOP node of event i is 2i, the BOTTOM node is 2i+1
+        source : int
+            node 2n
+        sink : int
+            node 2n+1
+        arc_offsets : list[int]
+            the arcs leaving node u are the arcs arc_offsets[u], ..., arc_offsets[u+1]-1
+        arc_head : list[int]
+            target node of every arc
+        arc_residual : list[int]
+            residual capacity of every arc (the flow is implicitly given by the residual capacity of the reverse arc)
+        arc_reverse : list[int]
+            index of the paired reverse arc
+        number_pushes, number_relabels, number_discharges, number_gap_relabels, number_global_relabels : int
+            operation counters of the preflow push algorithm, a gap relabel counts once no matter how many nodes it lifts
+    """
+
+    def __init__(self, number_events: int, arc_offsets: list[int], arc_head: list[int], arc_residual: list[int],
+                 arc_reverse: list[int]):
+        self.number_events = number_events
+        self.number_nodes = 2 * number_events + 2
+        self.source = 2 * number_events
+        self.sink = 2 * number_events + 1
+        self.arc_offsets = arc_offsets
+        self.arc_head = arc_head
+        self.arc_residual = arc_residual
+        self.arc_reverse = arc_reverse
+        self.label: list[int] = [0] * self.number_nodes
+        self.excess: list[int] = [0] * self.number_nodes
+        self.number_pushes: int = 0
+        self.number_relabels: int = 0
+        self.number_discharges: int = 0
+        self.number_gap_relabels: int = 0
+        self.number_global_relabels: int = 0
+
+    @staticmethod
+    def make_instance_from_arc_list(number_events: int, arc_tail: list[int], arc_head: list[int], arc_capacity: list[int]) \
+            -> "CsrMaxFlowNetwork":
+        """
+        Builds the CSR arrays from an arc list, where the arcs 2k and 2k+1 are always a pair of an arc and its reverse arc.
+        We sort the arcs by their tail node with a counting sort and translate the pairing to the new positions.
+        """
+        number_nodes: int = 2 * number_events + 2
+        arc_offsets: list[int] = [0] * (number_nodes + 1)
+        for tail in arc_tail:
+            arc_offsets[tail + 1] += 1
+        for node in range(number_nodes):
+            arc_offsets[node + 1] += arc_offsets[node]
+        next_free_position: list[int] = arc_offsets[:-1]
+        new_position: list[int] = [0] * len(arc_tail)
+        for arc_index, tail in enumerate(arc_tail):
+            new_position[arc_index] = next_free_position[tail]
+            next_free_position[tail] += 1
+        csr_head: list[int] = [0] * len(arc_tail)
+        csr_residual: list[int] = [0] * len(arc_tail)
+        csr_reverse: list[int] = [0] * len(arc_tail)
+        for arc_index, position in enumerate(new_position):
+            csr_head[position] = arc_head[arc_index]
+            csr_residual[position] = arc_capacity[arc_index]
+            csr_reverse[position] = new_position[arc_index ^ 1]
+        return CsrMaxFlowNetwork(number_events, arc_offsets, csr_head, csr_residual, csr_reverse)
+
+    def add_flow(self, tail: int, head: int, amount: int):
+        """
+        Sends flow over the arc from tail to head, which has to exist and have enough residual capacity. The excess of
+        the nodes is not changed.
+        """
+        for arc in range(self.arc_offsets[tail], self.arc_offsets[tail + 1]):
+            if self.arc_head[arc] == head and self.arc_residual[arc] > 0:
+                if amount > self.arc_residual[arc]:
+                    raise Exception("The initial flow exceeds the capacity of an arc.")
+                self.arc_residual[arc] -= amount
+                self.arc_residual[self.arc_reverse[arc]] += amount
+                return
+        raise Exception("There is no arc with residual capacity from node %d to node %d." % (tail, head))
+
+    def set_initial_flow(self, event_to_index: dict, initial_flow: HeuristicTokenFlow4Place):
+        """
+        Sets a feasible flow, e.g., the one realized by the forward heuristic. Afterward only the remaining source arcs
+        are saturated in the initial push of calculate_maximal_flow. The labels have to be set afterward.
+        """
+        for event, amount in initial_flow.event_to_produced_token.items():
+            self.add_flow(self.source, 2 * event_to_index[event] + 1, amount)
+            self.excess[self.source] -= amount
+        for event, amount in initial_flow.event_to_passed_token.items():
+            self.add_flow(2 * event_to_index[event], 2 * event_to_index[event] + 1, amount)
+        for event, amount in initial_flow.event_to_consumed_token.items():
+            self.add_flow(2 * event_to_index[event], self.sink, amount)
+            self.excess[self.sink] += amount
+        for (event, next_event), amount in initial_flow.edge_to_pushed_token.items():
+            self.add_flow(2 * event_to_index[event] + 1, 2 * event_to_index[next_event], amount)
+
+    def set_initial_labels(self):
+        """
+        Exact distance labels to the sink by a backward breadth first search; nodes that cannot reach the sink get the
+        label 2n+3 (size of the network + 1), which disqualifies them but is still compatible with the source.
+        """
+        dead_label: int = self.number_nodes + 1
+        label: list[int] = [dead_label] * self.number_nodes
+        label[self.sink] = 0
+        label[self.source] = self.number_nodes
+        arc_offsets, arc_head, arc_residual, arc_reverse = self.arc_offsets, self.arc_head, self.arc_residual, self.arc_reverse
+        queue: list[int] = [self.sink]
+        for node in queue:
+            # the reverse arcs leaving the node tell us which nodes have an arc with capacity to the node
+            for arc in range(arc_offsets[node], arc_offsets[node + 1]):
+                neighbor: int = arc_head[arc]
+                if label[neighbor] == dead_label and arc_residual[arc_reverse[arc]] > 0:
+                    label[neighbor] = label[node] + 1
+                    queue.append(neighbor)
+        self.label = label
+
+    def calculate_maximal_flow(self) -> int:
+        """
+        Highest label preflow push algorithm with current arc pointers, bucket lists of the active nodes and the gap and
+        global relabeling heuristics (see calculate_maximal_flow of the networkx based implementation). Only the first
+        phase is done, i.e., nodes that cannot reach the sink anymore are not discharged. Returns the value of the
+        maximal flow, i.e., the excess of the sink after termination.
+        """
+        arc_offsets, arc_head, arc_residual, arc_reverse = self.arc_offsets, self.arc_head, self.arc_residual, self.arc_reverse
+        label, excess = self.label, self.excess
+        source, sink, number_nodes = self.source, self.sink, self.number_nodes
+        dead_label: int = number_nodes + 1
+        # the inner nodes are 0..2n-1; nodes with a label below the size of the network are kept in the buckets
+        active_buckets: list[list[int]] = [[] for _ in range(number_nodes)]
+        label_buckets: list[set[int]] = [set() for _ in range(number_nodes)]
+        for node in range(source):
+            if label[node] < number_nodes:
+                label_buckets[label[node]].add(node)
+        # initial push: saturate all arcs leaving the source
+        for arc in range(arc_offsets[source], arc_offsets[source + 1]):
+            amount: int = arc_residual[arc]
+            if amount == 0:
+                continue
+            neighbor: int = arc_head[arc]
+            arc_residual[arc] = 0
+            arc_residual[arc_reverse[arc]] += amount
+            if excess[neighbor] == 0 and neighbor != sink and label[neighbor] < number_nodes:
+                active_buckets[label[neighbor]].append(neighbor)
+            excess[neighbor] += amount
+            excess[source] -= amount
+        current_arc: list[int] = arc_offsets[:-1]
+        highest_active_label: int = number_nodes - 1
+        relabels_at_last_global_relabel: int = 0
+        while highest_active_label >= 0:
+            if self.number_relabels - relabels_at_last_global_relabel >= number_nodes:
+                self.do_global_relabel(active_buckets, label_buckets)
+                relabels_at_last_global_relabel = self.number_relabels
+                current_arc = arc_offsets[:-1]
+                highest_active_label = number_nodes - 1
+            bucket: list[int] = active_buckets[highest_active_label]
+            if not bucket:
+                highest_active_label -= 1
+                continue
+            node: int = bucket.pop()
+            # discharge
+            self.number_discharges += 1
+            end_arc: int = arc_offsets[node + 1]
+            while excess[node] > 0:
+                arc: int = current_arc[node]
+                if arc == end_arc:
+                    # relabel
+                    self.number_relabels += 1
+                    old_label: int = label[node]
+                    new_label: int = dead_label - 1
+                    for relabel_arc in range(arc_offsets[node], end_arc):
+                        if arc_residual[relabel_arc] > 0 and label[arc_head[relabel_arc]] < new_label:
+                            new_label = label[arc_head[relabel_arc]]
+                    label[node] = new_label + 1
+                    current_arc[node] = arc_offsets[node]
+                    label_buckets[old_label].discard(node)
+                    if not label_buckets[old_label]:
+                        # gap: there are no active nodes above the old label, since we discharge a highest one
+                        self.number_gap_relabels += 1
+                        label[node] = dead_label
+                        for lifted_label in range(old_label + 1, number_nodes):
+                            for lifted_node in label_buckets[lifted_label]:
+                                label[lifted_node] = dead_label
+                            label_buckets[lifted_label].clear()
+                    elif label[node] < number_nodes:
+                        label_buckets[label[node]].add(node)
+                    if label[node] >= number_nodes:
+                        break
+                    continue
+                neighbor: int = arc_head[arc]
+                if arc_residual[arc] > 0 and label[node] == label[neighbor] + 1:
+                    amount: int = min(excess[node], arc_residual[arc])
+                    arc_residual[arc] -= amount
+                    arc_residual[arc_reverse[arc]] += amount
+                    excess[node] -= amount
+                    self.number_pushes += 1
+                    if excess[neighbor] == 0 and neighbor != source and neighbor != sink:
+                        active_buckets[label[neighbor]].append(neighbor)
+                        if label[neighbor] > highest_active_label:
+                            highest_active_label = label[neighbor]
+                    excess[neighbor] += amount
+                else:
+                    current_arc[node] = arc + 1
+        return excess[sink]
+
+    def do_global_relabel(self, active_buckets: list[list[int]], label_buckets: list[set[int]]):
+        """
+        Sets all labels to the exact distance to the sink in the residual network and refills the buckets.
+        """
+        self.number_global_relabels += 1
+        label, excess, number_nodes = self.label, self.excess, self.number_nodes
+        for bucket in label_buckets:
+            bucket.clear()
+        for bucket in active_buckets:
+            bucket.clear()
+        self.set_initial_labels()
+        label[:] = self.label
+        self.label = label
+        for node in range(self.source):
+            if label[node] < number_nodes:
+                label_buckets[label[node]].add(node)
+                if excess[node] > 0:
+                    active_buckets[label[node]].append(node)
+
+
+def build_csr_flow_network_for_place(place: PlaceWorkflowNet, run: Run, consumed_token: int,
+                                     initial_flow: HeuristicTokenFlow4Place = None) -> CsrMaxFlowNetwork:
+    """
+    Builds the same network as the networkx based implementation: every event is split in a TOP (consuming) and BOTTOM
+    (producing) node, the source feeds every producing BOTTOM node, every consuming TOP node feeds the sink and the edges
+    of the partial order connect the BOTTOM node of an event with the TOP nodes of its successors.
+    :param place:
+    :param run:
+    :param consumed_token: capacity of the inner arcs of the network
+    :param initial_flow: if given, this feasible flow is set before the labels are calculated
+    :return: the network with initial labels, but without the initial push
+    """
+    events: list = list(run.partial_order)
+    number_events: int = len(events)
+    event_to_index: dict = {event: index for index, event in enumerate(events)}
+    source: int = 2 * number_events
+    sink: int = source + 1
+    arc_tail: list[int] = []
+    arc_head: list[int] = []
+    arc_capacity: list[int] = []
+
+    def add_arc_with_reverse_arc(tail: int, head: int, capacity: int):
+        arc_tail.append(tail)
+        arc_head.append(head)
+        arc_capacity.append(capacity)
+        arc_tail.append(head)
+        arc_head.append(tail)
+        arc_capacity.append(0)
+
+    for index, event in enumerate(events):
+        top_node: int = 2 * index
+        bottom_node: int = top_node + 1
+        transition = run.labels[event]
+        add_arc_with_reverse_arc(top_node, bottom_node, consumed_token)
+        if place in transition.postset:
+            add_arc_with_reverse_arc(source, bottom_node, 1)
+        if place in transition.preset:
+            add_arc_with_reverse_arc(top_node, sink, 1)
+        for next_event in run.partial_order.neighbors(event):
+            add_arc_with_reverse_arc(bottom_node, 2 * event_to_index[next_event], consumed_token)
+    network: CsrMaxFlowNetwork = CsrMaxFlowNetwork.make_instance_from_arc_list(number_events, arc_tail, arc_head, arc_capacity)
+    if initial_flow is not None:
+        network.set_initial_flow(event_to_index, initial_flow)
+    network.set_initial_labels()
+    return network
+
+
+def find_optimal_tokenflow_for_place_csr(place: PlaceWorkflowNet, run: Run, heuristic: SinglePlaceTokenResult,
+                                         initial_flow: HeuristicTokenFlow4Place = None,
+                                         instrumentation: ConformanceInstrumentation = None,
+                                         flow_network_skeleton=None) -> SinglePlaceTokenResult:
+    """
+    Drop-in replacement for find_optimal_tokenflow_for_place that works on integer indexed CSR arrays instead of a
+    networkx DiGraph. The result is identical, since the value of a maximal flow is unique.
+    :param place:
+    :param run:
+    :param heuristic: Previous calculated heuristic has already information on produced and consumed tokens.
+    :param initial_flow: token flow realized by the forward heuristic, the maximal flow is calculated starting from it
+    :param instrumentation: see find_optimal_tokenflow_for_place
+    :param flow_network_skeleton: not used, the arrays are built for every place
+    :return:
+    """
+    number_consumed_tokens: int = 0
+    number_produced_tokens: int = 0
+    if heuristic is None:
+        for transition in run.labels.values():
+            if place in transition.preset:
+                number_consumed_tokens += 1
+            if place in transition.postset:
+                number_produced_tokens += 1
+    else:
+        number_consumed_tokens = heuristic.consumed_token
+        number_produced_tokens = heuristic.produced_token
+    start_time: float = time.perf_counter() if instrumentation is not None else 0.0
+    flow_network: CsrMaxFlowNetwork = build_csr_flow_network_for_place(place, run, number_consumed_tokens, initial_flow)
+    if instrumentation is not None:
+        construction_end_time: float = time.perf_counter()
+        instrumentation.add_phase_time(PHASE_MAX_FLOW_CONSTRUCTION, construction_end_time - start_time)
+    maximal_flow: int = flow_network.calculate_maximal_flow()
+    if instrumentation is not None:
+        instrumentation.add_phase_time(PHASE_MAX_FLOW_SOLVING, time.perf_counter() - construction_end_time)
+        instrumentation.add_flow_network_counters(flow_network)
+    missing_token: int = number_consumed_tokens - maximal_flow
+    remaining_token: int = number_produced_tokens - number_consumed_tokens + missing_token
+    return SinglePlaceTokenResult(number_produced_tokens, number_consumed_tokens, missing_token, missing_token,
+                                  remaining_token, remaining_token, True)
@@ -0,0 +1,78 @@
+import time
+
+import networkx as nx
+
+from MasterThesisProject.source.algorithms.ConformanceMeasureAlgorithm import calculate_token_replay_conformance_norm_for_partial_order
+from MasterThesisProject.source.algorithms.FindTotalOrderForPartialOrder import find_total_order_for_run
+from MasterThesisProject.source.structures.PartiallyOrderedEventLog import PartiallyOrderedEventLog
+from MasterThesisProject.source.algorithms.CompactPartialOrderForRun import compact_partial_orders_of_event_log
+from MasterThesisProject.source.structures.PartiallyOrderedLogConformanceResult import PartiallyOrderedLogConformanceResult
+from MasterThesisProject.source.structures.Run import Run
+from MasterThesisProject.source.structures.WorkflowNet import WorkflowNet
+from MasterThesisProject.source.utils.ImportCCOxesFileToEventLog import import_cco_xes_file_to_event_log
+from MasterThesisProject.source.utils.ImporterPnmlFileToInternalWorkflowNet import import_pnml_file_to_workflow_net
+
+# Parameter to control the benchmark; the bundled files of the tests are used by default
+net_file_path: str = "test/utils/8.pnml"
+log_file_path: str = "test/utils/Repair_alpha_logwise_oneRperPoVar.xes"
+number_repetitions: int = 20
+calculation_methods = ["Heuristic and flow network", "Only heuristic", "Only flow network"]
+do_calculate_precise_result_flags = [True, False, True]
+never_use_heuristic_flags = [False, False, True]
+
+
+def count_events_and_edges(event_log: PartiallyOrderedEventLog) -> (int, int):
+    return (sum(len(run.labels) for run in event_log.run_to_frequency),
+            sum(run.partial_order.number_of_edges() for run in event_log.run_to_frequency))
+
+
+def make_log_with_transitive_closures(event_log: PartiallyOrderedEventLog) -> PartiallyOrderedEventLog:
+    """
+    Logs whose po_successors contain the whole order relation look like this.
+    """
+    run_to_frequency: dict[Run, int] = dict()
+    for run, frequency in event_log.run_to_frequency.items():
+        closed_run: Run = Run(nx.transitive_closure_dag(run.partial_order))
+        closed_run.name_foreign_source = run.name_foreign_source
+        run_to_frequency[closed_run] = frequency
+    return PartiallyOrderedEventLog(run_to_frequency)
+
+
+def compare_logs(log_name: str, event_log: PartiallyOrderedEventLog, compact_log: PartiallyOrderedEventLog, net: WorkflowNet):
+    for run in list(event_log.run_to_frequency) + list(compact_log.run_to_frequency):
+        run.total_order = find_total_order_for_run(run)
+    number_events, number_edges = count_events_and_edges(event_log)
+    number_events_compact, number_edges_compact = count_events_and_edges(compact_log)
+    print("{} with {} runs.".format(log_name, len(event_log.run_to_frequency)))
+    print("Events: {} -> {}".format(number_events, number_events_compact))
+    print("Edges:  {} -> {}".format(number_edges, number_edges_compact))
+    for method, do_calculate_precise_result, never_use_heuristics in zip(calculation_methods, do_calculate_precise_result_flags,
+                                                                         never_use_heuristic_flags):
+        time_original, result_original = time_conformance_analysis(event_log, net, do_calculate_precise_result, never_use_heuristics)
+        time_compact, result_compact = time_conformance_analysis(compact_log, net, do_calculate_precise_result, never_use_heuristics)
+        print("{}: {:.4f}s -> {:.4f}s (conformance {:.4f} -> {:.4f})".format(method, time_original, time_compact,
+                                                                            result_original.conformance_level,
+                                                                            result_compact.conformance_level))
+
+
+def time_conformance_analysis(event_log: PartiallyOrderedEventLog, net: WorkflowNet, do_calculate_precise_result: bool,
+                              never_use_heuristics: bool) -> (float, PartiallyOrderedLogConformanceResult):
+    start = time.perf_counter()
+    result: PartiallyOrderedLogConformanceResult = None
+    for _ in range(number_repetitions):
+        result = calculate_token_replay_conformance_norm_for_partial_order(event_log, net, do_calculate_precise_result, never_use_heuristics)
+    return (time.perf_counter() - start) / number_repetitions, result
+
+
+if __name__ == "__main__":
+    net, name_to_transition = import_pnml_file_to_workflow_net(net_file_path)
+    start_import = time.perf_counter()
+    log, _ = import_cco_xes_file_to_event_log(log_file_path, name_to_transition)
+    time_import = time.perf_counter() - start_import
+    start_import = time.perf_counter()
+    compact_log, _ = import_cco_xes_file_to_event_log(log_file_path, name_to_transition, compact_partial_orders=True)
+    time_import_compact = time.perf_counter() - start_import
+    print("Import: {:.3f}s -> {:.3f}s".format(time_import, time_import_compact))
+    compare_logs("Log " + log_file_path, log, compact_log, net)
+    closed_log: PartiallyOrderedEventLog = make_log_with_transitive_closures(log)
+    compare_logs("Same log with transitive closures", closed_log, compact_partial_orders_of_event_log(closed_log), net)
@@ -0,0 +1,94 @@
+import random
+import time
+
+from networkx import DiGraph
+
+from MasterThesisProject.source.algorithms.FindTotalOrderForPartialOrder import find_total_order_for_run
+from MasterThesisProject.source.algorithms.PreflowPushAlgorithm4RunInWorkflownet import find_optimal_tokenflow_for_place
+from MasterThesisProject.source.algorithms.PreflowPushAlgorithmCsrArrays import find_optimal_tokenflow_for_place_csr
+from MasterThesisProject.source.structures.Run import Event4Run, Run
+from MasterThesisProject.source.structures.WorkflowNet import PlaceWorkflowNet, TransitionWorkflowNet
+
+# Parameter to control the benchmark
+random_seed: int = 42
+number_runs: int = 200
+number_events_per_run: int = 60
+# probability that an event is ordered before an event at most 'maximal_edge_distance' positions later
+edge_probability: float = 0.15
+maximal_edge_distance: int = 10
+# size of the adversarial runs, see make_adversarial_run_for_place
+adversarial_width: int = 40
+adversarial_chain_length: int = 200
+
+
+def make_random_run_for_place(place: PlaceWorkflowNet, number_events: int, random_generator: random.Random) -> Run:
+    """
+    Builds a random partial order on the given number of events, where every event randomly consumes and/or produces
+    a token on the place. Edges only go from lower to higher event numbers, so the result is always acyclic.
+    """
+    transitions: list[TransitionWorkflowNet] = [
+        TransitionWorkflowNet("Nothing", preset=set(), postset=set()),
+        TransitionWorkflowNet("Consuming", preset={place}, postset=set()),
+        TransitionWorkflowNet("Producing", preset=set(), postset={place}),
+        TransitionWorkflowNet("Consuming and producing", preset={place}, postset={place})]
+    events: list[Event4Run] = [Event4Run("Event %d" % index, random_generator.choice(transitions)) for index in range(number_events)]
+    partial_order: DiGraph = DiGraph()
+    partial_order.add_nodes_from(events)
+    for index, event in enumerate(events):
+        for next_index in range(index + 1, min(number_events, index + maximal_edge_distance + 1)):
+            if random_generator.random() < edge_probability:
+                partial_order.add_edge(event, events[next_index])
+    run: Run = Run(partial_order)
+    run.total_order = find_total_order_for_run(run)
+    return run
+
+
+def make_adversarial_run_for_place(place: PlaceWorkflowNet, width: int, chain_length: int) -> Run:
+    """
+    Run on which a preflow push algorithm without gap and global relabeling needs a quadratic number of relabels:
+    'width' concurrent producing events are followed by a long chain of events that do nothing and a single consuming
+    event at its end. Another 'width' consuming events are concurrent to everything, so the capacity of the inner arcs
+    is large enough that all produced tokens enter the chain, but only one of them can be consumed. All others have to
+    be pushed back through the whole chain to the source.
+    """
+    transition_nothing: TransitionWorkflowNet = TransitionWorkflowNet("Nothing", preset=set(), postset=set())
+    transition_consuming: TransitionWorkflowNet = TransitionWorkflowNet("Consuming", preset={place}, postset=set())
+    transition_producing: TransitionWorkflowNet = TransitionWorkflowNet("Producing", preset=set(), postset={place})
+    producing_events: list[Event4Run] = [Event4Run("Producing event %d" % index, transition_producing) for index in range(width)]
+    chain_events: list[Event4Run] = [Event4Run("Chain event %d" % index, transition_nothing) for index in range(chain_length)]
+    consuming_events: list[Event4Run] = [Event4Run("Consuming event %d" % index, transition_consuming) for index in range(width + 1)]
+    partial_order: DiGraph = DiGraph()
+    partial_order.add_nodes_from(producing_events + chain_events + consuming_events)
+    partial_order.add_edges_from((event, chain_events[0]) for event in producing_events)
+    partial_order.add_edges_from(zip(chain_events, chain_events[1:]))
+    partial_order.add_edge(chain_events[-1], consuming_events[0])
+    run: Run = Run(partial_order)
+    run.total_order = find_total_order_for_run(run)
+    return run
+
+
+def time_engine(find_optimal_tokenflow, place: PlaceWorkflowNet, runs: list[Run]) -> (float, list):
+    start = time.perf_counter()
+    results = [find_optimal_tokenflow(place, run, None) for run in runs]
+    return time.perf_counter() - start, results
+
+
+if __name__ == "__main__":
+    benchmark_place: PlaceWorkflowNet = PlaceWorkflowNet("Benchmark place")
+    generator: random.Random = random.Random(random_seed)
+    benchmark_runs: list[Run] = [make_random_run_for_place(benchmark_place, number_events_per_run, generator) for _ in range(number_runs)]
+    time_networkx, results_networkx = time_engine(find_optimal_tokenflow_for_place, benchmark_place, benchmark_runs)
+    time_csr, results_csr = time_engine(find_optimal_tokenflow_for_place_csr, benchmark_place, benchmark_runs)
+    for result_networkx, result_csr in zip(results_networkx, results_csr):
+        if str(result_networkx) != str(result_csr):
+            raise Exception("The engines disagree: {} vs. {}".format(result_networkx, result_csr))
+    print("Max flow for {} runs with {} events each.".format(number_runs, number_events_per_run))
+    print("networkx engine: {:.3f}s".format(time_networkx))
+    print("CSR engine:      {:.3f}s".format(time_csr))
+    print("Speedup:         {:.1f}x".format(time_networkx / time_csr))
+    adversarial_runs: list[Run] = [make_adversarial_run_for_place(benchmark_place, adversarial_width, adversarial_chain_length)]
+    time_networkx, results_networkx = time_engine(find_optimal_tokenflow_for_place, benchmark_place, adversarial_runs)
+    time_csr, results_csr = time_engine(find_optimal_tokenflow_for_place_csr, benchmark_place, adversarial_runs)
+    print("Adversarial run with width {} and chain length {}.".format(adversarial_width, adversarial_chain_length))
+    print("networkx engine: {:.3f}s".format(time_networkx))
+    print("CSR engine:      {:.3f}s".format(time_csr))
@@ -0,0 +1,86 @@
+import random
+import tracemalloc
+
+from networkx import DiGraph
+
+from MasterThesisProject.source.algorithms.ConformanceMeasureAlgorithm import calculate_token_replay_conformance_norm_for_partial_order
+from MasterThesisProject.source.algorithms.FindTotalOrderForPartialOrder import find_total_order_for_run
+from MasterThesisProject.source.algorithms.PreflowPushAlgorithm4RunInWorkflownet import Node4FlowNetwork, NodeType
+from MasterThesisProject.source.structures.PartiallyOrderedEventLog import PartiallyOrderedEventLog
+from MasterThesisProject.source.structures.Run import Event4Run, Run
+from MasterThesisProject.source.structures.SinglePlaceTokenResult import SinglePlaceTokenResult
+from MasterThesisProject.source.structures.WorkflowNet import PlaceWorkflowNet, TransitionWorkflowNet, WorkflowNet
+
+# Parameter to control the benchmark
+random_seed: int = 7
+number_places: int = 60
+number_transitions: int = 30
+number_runs: int = 200
+number_events_per_run: int = 50
+number_objects: int = 100000
+
+
+def make_random_net(random_generator: random.Random) -> (WorkflowNet, list[TransitionWorkflowNet]):
+    start_place: PlaceWorkflowNet = PlaceWorkflowNet("Start")
+    end_place: PlaceWorkflowNet = PlaceWorkflowNet("End")
+    inner_places: list[PlaceWorkflowNet] = [PlaceWorkflowNet("P%d" % index) for index in range(number_places)]
+    transitions: list[TransitionWorkflowNet] = []
+    for index in range(number_transitions):
+        transition: TransitionWorkflowNet = TransitionWorkflowNet("T%d" % index, "Activity %d" % index)
+        transition.add_place_iteration_to_preset(random_generator.sample(inner_places, 2))
+        transition.add_place_iteration_to_postset(random_generator.sample(inner_places, 2))
+        transitions.append(transition)
+    transitions[0].add_place_to_preset(start_place)
+    transitions[-1].add_place_to_postset(end_place)
+    return WorkflowNet.make_class_instance_from_transitions(set(transitions), start_place, end_place), transitions
+
+
+def make_random_log(transitions: list[TransitionWorkflowNet], random_generator: random.Random) -> PartiallyOrderedEventLog:
+    run_to_frequency: dict[Run, int] = dict()
+    for _ in range(number_runs):
+        events: list[Event4Run] = [Event4Run("Event %d" % index, random_generator.choice(transitions)) for index in range(number_events_per_run)]
+        partial_order: DiGraph = DiGraph()
+        partial_order.add_nodes_from(events)
+        for index in range(number_events_per_run):
+            for next_index in range(index + 1, min(number_events_per_run, index + 6)):
+                if random_generator.random() < 0.3:
+                    partial_order.add_edge(events[index], events[next_index])
+        run: Run = Run(partial_order)
+        run.total_order = find_total_order_for_run(run)
+        run_to_frequency[run] = 1
+    return PartiallyOrderedEventLog(run_to_frequency)
+
+
+def measure(function) -> (float, int, object):
+    """
+    :return: peak of the traced memory in MiB, number of memory blocks allocated during the call and still alive at its
+             end (without the result), and the result of the function
+    """
+    tracemalloc.start()
+    blocks_before: int = sum(statistic.count for statistic in tracemalloc.take_snapshot().statistics("filename"))
+    result = function()
+    blocks_after: int = sum(statistic.count for statistic in tracemalloc.take_snapshot().statistics("filename"))
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak / 2 ** 20, blocks_after - blocks_before, result
+
+
+if __name__ == "__main__":
+    generator: random.Random = random.Random(random_seed)
+    net, net_transitions = make_random_net(generator)
+    transition: TransitionWorkflowNet = net_transitions[0]
+    peak, blocks, events = measure(lambda: [Event4Run("Event", transition) for _ in range(number_objects)])
+    print("{} events: peak {:.1f} MiB, {} blocks".format(number_objects, peak, blocks))
+    peak, blocks, nodes = measure(lambda: [Node4FlowNetwork(NodeType.TOP, None) for _ in range(number_objects)])
+    print("{} flow network nodes: peak {:.1f} MiB, {} blocks".format(number_objects, peak, blocks))
+    peak, blocks, results = measure(lambda: [SinglePlaceTokenResult() for _ in range(number_objects)])
+    print("{} token results: peak {:.1f} MiB, {} blocks".format(number_objects, peak, blocks))
+    del events, nodes, results
+    peak, blocks, log = measure(lambda: make_random_log(net_transitions, generator))
+    print("Log with {} runs of {} events: peak {:.1f} MiB, {} blocks".format(number_runs, number_events_per_run, peak, blocks))
+    for do_calculate_precise_result, never_use_heuristics, use_multi_place_heuristic in [(False, False, False), (False, False, True),
+                                                                                          (True, False, False), (True, True, False)]:
+        peak, blocks, _ = measure(lambda: calculate_token_replay_conformance_norm_for_partial_order(
+            log, net, do_calculate_precise_result, never_use_heuristics, use_multi_place_heuristic=use_multi_place_heuristic))
+        print("Conformance analysis (precise: {}, never use heuristics: {}, multi place heuristic: {}): peak {:.2f} MiB, {} blocks".format(
+            do_calculate_precise_result, never_use_heuristics, use_multi_place_heuristic, peak, blocks))
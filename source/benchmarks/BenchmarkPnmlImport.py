@@ -0,0 +1,70 @@
+import os
+import random
+import tempfile
+import time
+import xml.etree.ElementTree as ElementTree
+
+from MasterThesisProject.source.benchmarks.SyntheticGenerators import make_synthetic_workflow_net
+from MasterThesisProject.source.structures.WorkflowNet import WorkflowNet
+from MasterThesisProject.source.utils.ImporterPnmlFileToInternalWorkflowNet import import_pnml_file_to_workflow_net, \
+    import_pnml_file_to_workflow_net_with_pm4py
+
+# Parameter to control the benchmark; the nets are made by make_synthetic_workflow_net
+random_seed: int = 11
+number_repetitions: int = 5
+# (number of places, number of transitions, arcs per transition)
+net_sizes: list[tuple[int, int, int]] = [(100, 80, 3), (1000, 800, 3), (5000, 4000, 3)]
+
+
+def write_workflow_net_to_pnml_file(net: WorkflowNet, file_path: str):
+    """
+    Writes the net in the pnml format of ProM, with the start place as initial and the end place as final marking.
+    """
+    pnml_element: ElementTree.Element = ElementTree.Element("pnml")
+    net_element: ElementTree.Element = ElementTree.SubElement(pnml_element, "net", id="net1",
+                                                              type="http://www.pnml.org/version-2009/grammar/pnmlcoremodel")
+    page_element: ElementTree.Element = ElementTree.SubElement(net_element, "page", id="n0")
+    for place in sorted(net.places, key=lambda place_of_net: place_of_net.name):
+        place_element: ElementTree.Element = ElementTree.SubElement(page_element, "place", id=place.name)
+        ElementTree.SubElement(ElementTree.SubElement(place_element, "name"), "text").text = place.name
+        if place is net.start_place:
+            ElementTree.SubElement(ElementTree.SubElement(place_element, "initialMarking"), "text").text = "1"
+    for transition in sorted(net.transitions, key=lambda transition_of_net: transition_of_net.name):
+        transition_element: ElementTree.Element = ElementTree.SubElement(page_element, "transition", id=transition.name)
+        ElementTree.SubElement(ElementTree.SubElement(transition_element, "name"), "text").text = transition.activity_description
+        for place in transition.preset:
+            ElementTree.SubElement(page_element, "arc", id="%s->%s" % (place.name, transition.name), source=place.name, target=transition.name)
+        for place in transition.postset:
+            ElementTree.SubElement(page_element, "arc", id="%s->%s" % (transition.name, place.name), source=transition.name, target=place.name)
+    final_markings_element: ElementTree.Element = ElementTree.SubElement(net_element, "finalmarkings")
+    place_marking_element: ElementTree.Element = ElementTree.SubElement(ElementTree.SubElement(final_markings_element, "marking"), "place",
+                                                                        idref=net.end_place.name)
+    ElementTree.SubElement(place_marking_element, "text").text = "1"
+    ElementTree.ElementTree(pnml_element).write(file_path, encoding="UTF-8", xml_declaration=True)
+
+
+def measure_import(import_function, file_path: str) -> float:
+    """
+    :return: the minimal time of the import over the repetitions
+    """
+    durations: list[float] = []
+    for _ in range(number_repetitions):
+        start = time.perf_counter()
+        import_function(file_path)
+        durations.append(time.perf_counter() - start)
+    return min(durations)
+
+
+if __name__ == "__main__":
+    random_generator: random.Random = random.Random(random_seed)
+    # the first import of pm4py takes seconds, it should not be part of the times
+    import pm4py
+    with tempfile.TemporaryDirectory() as directory:
+        for number_places, number_transitions, arcs_per_transition in net_sizes:
+            net, _ = make_synthetic_workflow_net(number_places, number_transitions, arcs_per_transition, random_generator)
+            pnml_file_path: str = os.path.join(directory, "net_%d.pnml" % number_places)
+            write_workflow_net_to_pnml_file(net, pnml_file_path)
+            seconds_direct: float = measure_import(import_pnml_file_to_workflow_net, pnml_file_path)
+            seconds_pm4py: float = measure_import(import_pnml_file_to_workflow_net_with_pm4py, pnml_file_path)
+            print("{} places, {} transitions: direct {:.4f}s, pm4py {:.4f}s, speedup {:.1f}".format(
+                number_places, number_transitions, seconds_direct, seconds_pm4py, seconds_pm4py / seconds_direct))
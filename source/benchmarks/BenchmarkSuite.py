@@ -0,0 +1,224 @@
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+
+from MasterThesisProject.source.algorithms.BruteForceHeuristic import do_brute_force_heuristic_for_token_analysis
+from MasterThesisProject.source.algorithms.ConformanceMeasureAlgorithm import calculate_token_replay_conformance_norm_for_partial_order, \
+    calculate_run_conformance_results
+from MasterThesisProject.source.algorithms.FindTotalOrderForPartialOrder import find_total_order_for_run
+from MasterThesisProject.source.algorithms.MultiPlaceHeuristic import do_multi_place_heuristic_for_token_analysis
+from MasterThesisProject.source.algorithms.PreflowPushAlgorithm4RunInWorkflownet import find_optimal_tokenflow_for_place
+from MasterThesisProject.source.algorithms.PreflowPushAlgorithmCsrArrays import find_optimal_tokenflow_for_place_csr
+from MasterThesisProject.source.benchmarks.SyntheticGenerators import make_synthetic_workflow_net, make_synthetic_event_log
+from MasterThesisProject.source.structures.PartiallyOrderedEventLog import PartiallyOrderedEventLog
+from MasterThesisProject.source.structures.PartiallyOrderedLogConformanceResult import PartiallyOrderedLogConformanceResult, TokenResultsWeightedSum
+from MasterThesisProject.source.structures.WorkflowNet import WorkflowNet, IncidenceIndex4WorkflowNet
+from MasterThesisProject.source.utils.ImportCCOxesFileToEventLog import import_cco_xes_file_to_event_log, import_xes_file_totally_ordered_log
+from MasterThesisProject.source.utils.ImporterPnmlFileToInternalWorkflowNet import import_pnml_file_to_workflow_net
+
+# Parameter to control the benchmark
+random_seed: int = 11
+# every stage is timed this often, we report the minimum and the median
+number_repetitions: int = 3
+# synthetic workloads, see make_synthetic_workflow_net and make_synthetic_run
+synthetic_workloads: list[dict] = [
+    {"name": "narrow_sequential", "number_places": 20, "number_transitions": 15, "arcs_per_transition": 2, "number_runs": 200,
+     "width": 2, "depth": 20, "concurrency": 0.2},
+    {"name": "wide_concurrent", "number_places": 40, "number_transitions": 30, "arcs_per_transition": 2, "number_runs": 100,
+     "width": 10, "depth": 8, "concurrency": 0.8},
+    {"name": "many_places", "number_places": 200, "number_transitions": 60, "arcs_per_transition": 4, "number_runs": 100,
+     "width": 4, "depth": 15, "concurrency": 0.5}
+]
+# the bundled fixtures of the tests: name, net, log and whether the log is partially ordered
+path_to_fixtures: str = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "test", "utils")
+fixture_workloads: list[tuple[str, str, str, bool]] = [
+    ("repair_po", "8.pnml", "Repair_alpha_logwise_oneRperPoVar.xes", True),
+    ("reviewing_to", "reviewing_5.pnml", "reviewing_complete_only.xes", False)
+]
+# modules whose import time in a fresh interpreter is measured, the startup cost of the worker processes and the CLI
+startup_modules: list[str] = ["MasterThesisProject.source.algorithms.ConformanceMeasureAlgorithm",
+                              "MasterThesisProject.source.utils.ImportCCOxesFileToEventLog",
+                              "MasterThesisProject.source.utils.ImporterPnmlFileToInternalWorkflowNet"]
+output_file_path: str = "benchmark_results.json"
+# if given, the stages that got slower by more than the tolerance compared to this earlier output are printed
+baseline_file_path: str = None
+regression_tolerance: float = 0.1
+
+
+def measure_stage(stage_function, number_runs: int, number_events: int) -> dict:
+    """
+    Times the stage 'number_repetitions' times and measures the peak memory in one more call, since tracing the
+    allocations slows the stage down.
+    :return: the metrics of the stage
+    """
+    durations: list[float] = []
+    for _ in range(number_repetitions):
+        start = time.perf_counter()
+        stage_function()
+        durations.append(time.perf_counter() - start)
+    tracemalloc.start()
+    stage_function()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    seconds_min: float = min(durations)
+    return {"seconds_min": seconds_min,
+            "seconds_median": statistics.median(durations),
+            "runs_per_second": number_runs / seconds_min if seconds_min > 0 else None,
+            "events_per_second": number_events / seconds_min if seconds_min > 0 else None,
+            "peak_memory_mib": peak / 2 ** 20}
+
+
+def benchmark_pipeline(net: WorkflowNet, event_log: PartiallyOrderedEventLog) -> dict:
+    """
+    Times the steps of the conformance analysis separately and the whole analysis.
+    :return: the metrics of every stage by name
+    """
+    runs: list = list(event_log.run_to_frequency)
+    number_events: int = sum(len(run.labels) for run in runs)
+    incidence_index: IncidenceIndex4WorkflowNet = net.get_incidence_index()
+    run_and_touched_places: list[tuple] = [(run, [incidence_index.places[place_index]
+                                                  for place_index in incidence_index.get_touched_inner_place_indices(run.labels.values())])
+                                           for run in runs]
+    # the flow network only gets the places the heuristics cannot decide
+    estimated_place_results: list = []
+    calculate_run_conformance_results(runs, net, False, False, False, True, False, False, False, estimated_place_results=estimated_place_results)
+    flow_problems: list[tuple] = [(incidence_index.places[place_index], run, result) for run, place_index, result in estimated_place_results]
+    run_to_conformance_result, _ = calculate_run_conformance_results(runs, net, True, False, False, True, False, False, False)
+
+    def aggregate():
+        weighted_tokens_sums: TokenResultsWeightedSum = TokenResultsWeightedSum()
+        for run, frequency in event_log.run_to_frequency.items():
+            weighted_tokens_sums.add_result_for_run(frequency, run_to_conformance_result[run])
+        PartiallyOrderedLogConformanceResult().fill_from_calculation_result(weighted_tokens_sums, run_to_conformance_result)
+
+    stages: dict = {
+        "total_order": lambda: [find_total_order_for_run(run) for run in runs],
+        "forward_heuristic": lambda: [do_brute_force_heuristic_for_token_analysis(run, net, place, False)
+                                      for run, places in run_and_touched_places for place in places],
+        "backward_heuristic": lambda: [do_brute_force_heuristic_for_token_analysis(run, net, place, True)
+                                       for run, places in run_and_touched_places for place in places],
+        "multi_place_heuristic": lambda: [do_multi_place_heuristic_for_token_analysis(run, net) for run in runs],
+        "preflow_push_networkx": lambda: [find_optimal_tokenflow_for_place(place, run, result) for place, run, result in flow_problems],
+        "preflow_push_csr": lambda: [find_optimal_tokenflow_for_place_csr(place, run, result) for place, run, result in flow_problems],
+        "aggregation": aggregate,
+        "conformance_analysis_heuristics": lambda: calculate_token_replay_conformance_norm_for_partial_order(event_log, net, False),
+        "conformance_analysis_precise": lambda: calculate_token_replay_conformance_norm_for_partial_order(event_log, net, True)
+    }
+    stage_metrics: dict = {name: measure_stage(stage_function, len(runs), number_events) for name, stage_function in stages.items()}
+    stage_metrics["preflow_push_networkx"]["number_flow_problems"] = len(flow_problems)
+    stage_metrics["preflow_push_csr"]["number_flow_problems"] = len(flow_problems)
+    return {"number_runs": len(runs), "number_events": number_events, "number_inner_places": len(net.inner_places), "stages": stage_metrics}
+
+
+def benchmark_fixture(net_file_name: str, log_file_name: str, is_partially_ordered_log: bool) -> dict:
+    net_file_path: str = os.path.join(path_to_fixtures, net_file_name)
+    log_file_path: str = os.path.join(path_to_fixtures, log_file_name)
+    net, label_to_transition = import_pnml_file_to_workflow_net(net_file_path)
+
+    def import_log() -> PartiallyOrderedEventLog:
+        if is_partially_ordered_log:
+            return import_cco_xes_file_to_event_log(log_file_path, label_to_transition)[0]
+        return import_xes_file_totally_ordered_log(log_file_path, label_to_transition)[0]
+
+    event_log: PartiallyOrderedEventLog = import_log()
+    for run in event_log.run_to_frequency:
+        run.total_order = find_total_order_for_run(run)
+    result: dict = benchmark_pipeline(net, event_log)
+    result["stages"]["import_net"] = measure_stage(lambda: import_pnml_file_to_workflow_net(net_file_path), result["number_runs"],
+                                                   result["number_events"])
+    result["stages"]["import_log"] = measure_stage(import_log, result["number_runs"], result["number_events"])
+    return result
+
+
+def measure_import_time(module_name: str) -> dict:
+    """
+    Times the import of the module in a fresh interpreter, minus the startup of an interpreter that imports nothing.
+    """
+    def run_interpreter(code: str) -> list[float]:
+        durations: list[float] = []
+        for _ in range(number_repetitions):
+            start = time.perf_counter()
+            subprocess.run([sys.executable, "-c", code], check=True)
+            durations.append(time.perf_counter() - start)
+        return durations
+
+    empty_interpreter_seconds: float = min(run_interpreter("pass"))
+    import_durations: list[float] = [duration - empty_interpreter_seconds for duration in run_interpreter("import " + module_name)]
+    return {"seconds_min": min(import_durations), "seconds_median": statistics.median(import_durations), "runs_per_second": None,
+            "events_per_second": None, "peak_memory_mib": None}
+
+
+def get_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], cwd=os.path.dirname(os.path.abspath(__file__)), capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def run_benchmark_suite() -> dict:
+    workload_results: dict = dict()
+    for workload in synthetic_workloads:
+        random_generator: random.Random = random.Random(random_seed)
+        net, transitions = make_synthetic_workflow_net(workload["number_places"], workload["number_transitions"],
+                                                       workload["arcs_per_transition"], random_generator)
+        event_log: PartiallyOrderedEventLog = make_synthetic_event_log(transitions, workload["number_runs"], workload["width"], workload["depth"],
+                                                                       workload["concurrency"], random_generator)
+        workload_results[workload["name"]] = benchmark_pipeline(net, event_log)
+        workload_results[workload["name"]]["parameters"] = workload
+        print("Workload {} done.".format(workload["name"]))
+    for name, net_file_name, log_file_name, is_partially_ordered_log in fixture_workloads:
+        workload_results[name] = benchmark_fixture(net_file_name, log_file_name, is_partially_ordered_log)
+        workload_results[name]["parameters"] = {"net": net_file_name, "log": log_file_name, "is_partially_ordered_log": is_partially_ordered_log}
+        print("Workload {} done.".format(name))
+    workload_results["startup"] = {"number_runs": 0, "number_events": 0, "parameters": {"modules": startup_modules},
+                                   "stages": {"import " + module_name.rsplit(".", 1)[-1]: measure_import_time(module_name)
+                                              for module_name in startup_modules}}
+    print("Workload startup done.")
+    return {"metadata": {"commit": get_commit(), "time": datetime.now().isoformat(), "python": platform.python_version(),
+                         "machine": platform.machine(), "random_seed": random_seed, "number_repetitions": number_repetitions},
+            "workloads": workload_results}
+
+
+def find_regressions(baseline: dict, current: dict, tolerance: float) -> list[str]:
+    """
+    :return: a description of every stage of a workload in both results whose minimal time grew by more than the
+             tolerance (relative)
+    """
+    regressions: list[str] = []
+    for workload_name, workload in current["workloads"].items():
+        baseline_stages: dict = baseline["workloads"].get(workload_name, dict()).get("stages", dict())
+        for stage_name, metrics in workload["stages"].items():
+            if stage_name not in baseline_stages or baseline_stages[stage_name]["seconds_min"] <= 0:
+                continue
+            change: float = metrics["seconds_min"] / baseline_stages[stage_name]["seconds_min"] - 1
+            if change > tolerance:
+                regressions.append("{} / {}: {:.4f}s -> {:.4f}s (+{:.0%})".format(workload_name, stage_name, baseline_stages[stage_name]["seconds_min"],
+                                                                                 metrics["seconds_min"], change))
+    return regressions
+
+
+if __name__ == "__main__":
+    suite_results: dict = run_benchmark_suite()
+    with open(output_file_path, "w") as file:
+        json.dump(suite_results, file, indent=2)
+    for workload_name, workload_result in suite_results["workloads"].items():
+        print("{} ({} runs, {} events):".format(workload_name, workload_result["number_runs"], workload_result["number_events"]))
+        for stage_name, stage_result in workload_result["stages"].items():
+            print("    {:<32} {:>10.4f}s {:>12.0f} events/s {:>8.2f} MiB".format(stage_name, stage_result["seconds_min"],
+                                                                                 stage_result["events_per_second"] or 0,
+                                                                                 stage_result["peak_memory_mib"] or 0))
+    if baseline_file_path is not None:
+        with open(baseline_file_path) as file:
+            baseline_results: dict = json.load(file)
+        found_regressions: list[str] = find_regressions(baseline_results, suite_results, regression_tolerance)
+        print("Regressions compared to {}:".format(baseline_file_path) if found_regressions else "No regressions.")
+        for regression in found_regressions:
+            print("    " + regression)
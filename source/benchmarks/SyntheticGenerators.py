@@ -0,0 +1,64 @@
+import random
+
+from networkx import DiGraph
+
+from MasterThesisProject.source.algorithms.FindTotalOrderForPartialOrder import find_total_order_for_run
+from MasterThesisProject.source.structures.PartiallyOrderedEventLog import PartiallyOrderedEventLog
+from MasterThesisProject.source.structures.Run import Event4Run, Run
+from MasterThesisProject.source.structures.WorkflowNet import PlaceWorkflowNet, TransitionWorkflowNet, WorkflowNet
+
+
+def make_synthetic_workflow_net(number_places: int, number_transitions: int, arcs_per_transition: int,
+                                random_generator: random.Random) -> (WorkflowNet, list[TransitionWorkflowNet]):
+    """
+    Net with the given number of inner places, where every transition consumes from and produces on
+    'arcs_per_transition' random inner places. The first transition consumes from the start place and the last one
+    produces on the end place.
+    :return: the net and its transitions; the activity of a transition is "Activity <index>"
+    """
+    start_place: PlaceWorkflowNet = PlaceWorkflowNet("Start")
+    end_place: PlaceWorkflowNet = PlaceWorkflowNet("End")
+    inner_places: list[PlaceWorkflowNet] = [PlaceWorkflowNet("P%d" % index) for index in range(number_places)]
+    transitions: list[TransitionWorkflowNet] = []
+    for index in range(number_transitions):
+        transition: TransitionWorkflowNet = TransitionWorkflowNet("T%d" % index, "Activity %d" % index)
+        transition.add_place_iteration_to_preset(random_generator.sample(inner_places, min(arcs_per_transition, number_places)))
+        transition.add_place_iteration_to_postset(random_generator.sample(inner_places, min(arcs_per_transition, number_places)))
+        transitions.append(transition)
+    transitions[0].add_place_to_preset(start_place)
+    transitions[-1].add_place_to_postset(end_place)
+    return WorkflowNet.make_class_instance_from_transitions(set(transitions), start_place, end_place), transitions
+
+
+def make_synthetic_run(transitions: list[TransitionWorkflowNet], width: int, depth: int, concurrency: float,
+                       random_generator: random.Random) -> Run:
+    """
+    Layered partial order with 'depth' layers of 'width' events each and randomly chosen labels. An event is ordered
+    before an event of the next layer with probability 1 - concurrency; every event of a later layer has at least one
+    predecessor in the layer before, so the longest chain always has 'depth' events. With concurrency 0 all events of
+    consecutive layers are ordered, with concurrency 1 a layer only depends on a single event of the layer before.
+    :return: the run with total order
+    """
+    layers: list[list[Event4Run]] = [[Event4Run("Event %d.%d" % (layer_index, index), random_generator.choice(transitions))
+                                      for index in range(width)] for layer_index in range(depth)]
+    partial_order: DiGraph = DiGraph()
+    for layer in layers:
+        partial_order.add_nodes_from(layer)
+    for layer, next_layer in zip(layers, layers[1:]):
+        for next_event in next_layer:
+            predecessors: list[Event4Run] = [event for event in layer if random_generator.random() >= concurrency]
+            if not predecessors:
+                predecessors = [random_generator.choice(layer)]
+            partial_order.add_edges_from((event, next_event) for event in predecessors)
+    run: Run = Run(partial_order)
+    run.total_order = find_total_order_for_run(run)
+    return run
+
+
+def make_synthetic_event_log(transitions: list[TransitionWorkflowNet], number_runs: int, width: int, depth: int, concurrency: float,
+                             random_generator: random.Random) -> PartiallyOrderedEventLog:
+    """
+    Log of 'number_runs' runs made by make_synthetic_run, each with frequency one.
+    """
+    return PartiallyOrderedEventLog({make_synthetic_run(transitions, width, depth, concurrency, random_generator): 1
+                                     for _ in range(number_runs)})
@@ -3,6 +3,8 @@ import pandas as pd
 from pm4py.objects.petri_net.importer import importer as pnml_importer
 from pm4py.algo.conformance.tokenreplay.algorithm import apply
 
+from MasterThesisProject.source.utils.ColumnarResultSink import ColumnarResultSink
+
 
 path_nets: str = "data/nets/"
 path_results: str = "results/to/Control_TokenReplay_PM4PY/"
@@ -43,8 +45,8 @@ column_names_trace_details = ["Net name",
                               "Produced Tokens"
                               ]
 
-results_df: pd.DataFrame = pd.DataFrame(columns=colum_names)
-trace_details_df: pd.DataFrame = pd.DataFrame(columns=column_names_trace_details)
+results: ColumnarResultSink = ColumnarResultSink(colum_names)
+trace_details: ColumnarResultSink = ColumnarResultSink(column_names_trace_details)
 token_replay_results = []
 average_fitness: dict[str, float] = dict()
 for pair in log_net_pairs:
@@ -62,18 +64,17 @@ for pair in log_net_pairs:
     trace_fitness_list = [trace_result["trace_fitness"] for trace_result in result]
     average_fitnes_result = sum(trace_fitness_list) / len(trace_fitness_list)
     average_fitness[pair["net"]] = average_fitnes_result
-    results_df.loc[len(results_df)] = [pair["net"], pair["log"], token_replay_norm, missing_tokens, consumed_tokens, remaining_tokens, produced_tokens]
+    results.add_row([pair["net"], pair["log"], token_replay_norm, missing_tokens, consumed_tokens, remaining_tokens, produced_tokens])
     if pair["net"] == nets_with_trace_documentation[0]:
-        for trace_result in result:
-            trace_details_df.loc[len(trace_details_df)] = [pair["net"],
-                                                           pair["log"],
-                                                           trace_result["missing_tokens"],
-                                                           trace_result["consumed_tokens"],
-                                                           trace_result["remaining_tokens"],
-                                                           trace_result["produced_tokens"]
-                                                           ]
+        trace_details.add_columns([pair["net"], pair["log"]],
+                                  [[trace_result["missing_tokens"] for trace_result in result],
+                                   [trace_result["consumed_tokens"] for trace_result in result],
+                                   [trace_result["remaining_tokens"] for trace_result in result],
+                                   [trace_result["produced_tokens"] for trace_result in result]])
 
+trace_details_df: pd.DataFrame = trace_details.build_data_frame()
 trace_details_df.to_csv("results/to/Control_TokenReplay_PM4PY/trace_details_review5")
+results_df: pd.DataFrame = results.build_data_frame()
 if do_persist_general_results:
     results_df.to_csv("results/to/Control_TokenReplay_PM4PY/control_results")
 
@@ -7,9 +7,12 @@ from pandas import DataFrame
 
 from MasterThesisProject.source.algorithms.ConformanceMeasureAlgorithm import calculate_token_replay_conformance_norm_for_partial_order
 from MasterThesisProject.source.algorithms.FindTotalOrderForPartialOrder import find_total_order_for_run
-from MasterThesisProject.source.structures.PartiallyOrderedLogConformanceResult import PartiallyOrderedLogConformanceResult, PlaceStatistics
-from MasterThesisProject.source.structures.RunConformanceResult import RunConformanceResult
+from MasterThesisProject.source.structures.PartiallyOrderedLogConformanceResult import PartiallyOrderedLogConformanceResult
+from MasterThesisProject.source.structures.TokenResultCache import TokenResultCache
 from MasterThesisProject.source.utils.ImportCCOxesFileToEventLog import import_cco_xes_file_to_event_log, import_xes_file_totally_ordered_log
+from MasterThesisProject.source.utils.ColumnarResultSink import ColumnarResultSink
+from MasterThesisProject.source.utils.ExperimentScheduler import ExperimentTask, ExperimentCheckpoint, make_experiment_tasks, run_experiment_tasks
+from MasterThesisProject.source.utils.ImportCache import import_net_and_log_with_cache
 from MasterThesisProject.source.utils.ImporterPnmlFileToInternalWorkflowNet import import_pnml_file_to_workflow_net
 
 # Definition of experiment parameters
@@ -47,8 +50,28 @@ net_log_pairs_po = [
 ]
 # Parameter to control experiment
 number_tests_per_pair: int = 100
+# the (pair, method, iteration) tasks run on this many worker processes, each pinned to its own core, so the run times
+# of parallel tasks do not compete for a core; use at most the number of physical cores
+number_workers: int = 1
+# completed tasks are recorded in the checkpoint, an interrupted sweep continues with the missing tasks; the
+# checkpoint has to be deleted (or do_resume_sweep set to False) to repeat a completed sweep
+do_resume_sweep: bool = True
 is_experiment_with_po: bool = True
 do_persist_results: bool = False
+# the persisted results are additionally written to partitioned parquet datasets (needs pyarrow); the general results
+# are partitioned by net, log and calculation method, the place and run statistics by net and log
+write_parquet_results: bool = False
+# imported nets and logs are kept in a binary format, which is read on the next experiment with the same files
+use_import_cache: bool = True
+# isomorphic runs are replayed only once (with the sum of the frequencies); the run statistics then only contain one run per class.
+# Only the precise results stay the same, the bounds of the heuristics and the statistics of the decisions may change
+merge_isomorphic_runs: bool = False
+# the partial orders are replaced by their transitive reductions (after contracting events that touch no place); the
+# precise results stay the same, but the results of the heuristics may change
+compact_partial_orders: bool = False
+# results of places are reused between iterations and nets; only use it if the run times are not of interest, as later
+# iterations only hit the cache
+use_token_result_cache: bool = False
 
 # The following parameter should normally not be changed but if you want to experiment feel free.
 include_invalid_data: bool = True
@@ -60,6 +83,9 @@ count_initial_and_final_places: bool = True
 # Following information is directly filled from above choices
 path_for_logs: str = "data/partially_ordered_logs/" if is_experiment_with_po else "data/totally_ordered_logs/"
 path_for_results: str = "results/po/" if is_experiment_with_po else "results/to/"
+path_for_import_cache: str = "data/cache/"
+path_for_parquet_results: str = path_for_results + "dataset/"
+path_for_checkpoint: str = path_for_results + "sweep_checkpoint.jsonl"
 calculation_methods = ["Heuristic and flow network", "Only heuristic", "Only flow network"] if is_experiment_with_po else ["Classic token replay"]
 do_calculate_precise_result_flags = [True, False, True] if is_experiment_with_po else [True]
 never_use_heuristic_flags = [False, False, True] if is_experiment_with_po else [False]
@@ -119,156 +145,194 @@ column_names_place_statistics = ["Start time",
 # Definition(End)
 
 results_this_experiment: DataFrame = pd.DataFrame(columns=colum_names_general_results)
+token_result_cache: TokenResultCache = TokenResultCache() if use_token_result_cache else None
 
 
-def do_experiment_for_data(net_log_pair: dict[str, str]):
-    # After each iteration we save the subresults to avoid data loss. In the end we will produce a master file
-    iteration_sub_results: list[DataFrame] = []
-    net_name = net_log_pair["net"].replace(".pnml", "")
+# the net and log of the last task of this process, the workers keep them for the next tasks of the same pair
+loaded_pair_key: str = None
+loaded_net_and_log: tuple = None
+
+
+def get_net_and_log_names(net_log_pair: dict[str, str]) -> (str, str):
+    return net_log_pair["net"].replace(".pnml", ""), net_log_pair["log"].replace(".xes", "")
+
+
+def load_net_and_log(net_log_pair: dict[str, str]) -> tuple:
+    """
+    :return: net, label to transition map, log and the first invalid label of the runs with invalid labels
+    """
+    global loaded_pair_key, loaded_net_and_log
+    pair_key: str = "{}|{}".format(net_log_pair["net"], net_log_pair["log"])
+    if pair_key == loaded_pair_key:
+        return loaded_net_and_log
     net_file_name = "data/nets/" + net_log_pair["net"]
-    log_name = net_log_pair["log"].replace(".xes", "")
     log_file_name = path_for_logs + net_log_pair["log"]
-    print("Beginning experiment for log-net-pair ({},{}).".format(log_name, net_name))
-    net_internal_format, name_to_transition = import_pnml_file_to_workflow_net(net_file_name)
-    log_internal_format, invalid_run_to_false_labels = import_cco_xes_file_to_event_log(log_file_name, name_to_transition,
-                                                                                        include_data_with_invalid_transitions) \
-        if is_experiment_with_po else import_xes_file_totally_ordered_log(log_file_name, name_to_transition, include_data_with_invalid_transitions)
-    # set the total orders in advance to avoid non-deterministic behavior
-    for run in log_internal_format.run_to_frequency:
-        run.total_order = find_total_order_for_run(run)
-    # now do the iterations
-    for number_iteration in range(number_tests_per_pair):
-        iteration_sub_result: DataFrame = DataFrame(columns=colum_names_general_results)
-        print("Iteration {} of {}.".format(number_iteration + 1, number_tests_per_pair))
-        # Also iterate over different calculation methods
-        for index_calc_method in range(len(calculation_methods)):
-            do_calculate_precise_result: bool = do_calculate_precise_result_flags[index_calc_method]
-            never_use_heuristic: bool = never_use_heuristic_flags[index_calc_method]
-            time_stamp: datetime = datetime.now()
-            start_experiment = time.perf_counter()
-            result: PartiallyOrderedLogConformanceResult = calculate_token_replay_conformance_norm_for_partial_order(log_internal_format,
-                                                                                                                     net_internal_format,
-                                                                                                                     do_calculate_precise_result,
-                                                                                                                     never_use_heuristic,
-                                                                                                                     not is_experiment_with_po,
-                                                                                                                     count_initial_and_final_places)
-            end_experiment = time.perf_counter()
-            time_experiment = end_experiment - start_experiment
-            # The other places are either ones calculated in flow network or only by better heuristic
-            number_other_places: int = result.number_places_decided_flow_network if do_calculate_precise_result else result.number_places_only_estimated
-            iteration_sub_result.loc[len(iteration_sub_result)] = [time_stamp,
-                                                                   net_name,
-                                                                   log_name,
-                                                                   include_invalid_data,
-                                                                   count_initial_and_final_places,
-                                                                   calculation_methods[index_calc_method],
-                                                                   time_experiment,
-                                                                   result.upper_bound_conformance,
-                                                                   result.lower_bound_conformance,
-                                                                   result.number_places_decided_forward_heuristic,
-                                                                   result.number_places_decided_backward_heuristic,
-                                                                   number_other_places,
-                                                                   result.missing_tokens_max,
-                                                                   result.missing_tokens_min,
-                                                                   result.consumed_tokens,
-                                                                   result.remaining_tokens_max,
-                                                                   result.remaining_tokens_min,
-                                                                   result.produced_tokens]
+    print("Beginning experiment for log-net-pair ({},{}).".format(*reversed(get_net_and_log_names(net_log_pair))))
+    if use_import_cache:
+        # the cache sets the total orders, which are then the same for all experiments
+        net_internal_format, name_to_transition, log_internal_format, invalid_run_to_false_labels = import_net_and_log_with_cache(
+            net_file_name, log_file_name, is_experiment_with_po, include_data_with_invalid_transitions, path_for_import_cache,
+            compact_partial_orders)
+    else:
+        net_internal_format, name_to_transition = import_pnml_file_to_workflow_net(net_file_name)
+        log_internal_format, invalid_run_to_false_labels = import_cco_xes_file_to_event_log(log_file_name, name_to_transition,
+                                                                                            include_data_with_invalid_transitions,
+                                                                                            compact_partial_orders) \
+            if is_experiment_with_po else import_xes_file_totally_ordered_log(log_file_name, name_to_transition, include_data_with_invalid_transitions)
+        # set the total orders in advance to avoid non-deterministic behavior
+        for run in log_internal_format.run_to_frequency:
+            run.total_order = find_total_order_for_run(run)
+    if merge_isomorphic_runs:
+        log_internal_format = log_internal_format.merge_isomorphic_runs()
+    loaded_pair_key = pair_key
+    loaded_net_and_log = (net_internal_format, name_to_transition, log_internal_format, invalid_run_to_false_labels)
+    return loaded_net_and_log
+
+
+def write_statistics(net_log_pair: dict[str, str], time_stamp: datetime, result: PartiallyOrderedLogConformanceResult):
+    """
+    Writes the statistics for every place and every run, which we only need once per pair.
+    """
+    net_name, log_name = get_net_and_log_names(net_log_pair)
+    net_internal_format, _, log_internal_format, invalid_run_to_false_labels = load_net_and_log(net_log_pair)
+    leading_values: list = [time_stamp, net_name, log_name, include_invalid_data, count_initial_and_final_places]
+    # Place statistics; if they are persisted, the rows are written to the file in chunks
+    place_statistic_result: ColumnarResultSink = ColumnarResultSink(
+        column_names_place_statistics,
+        path_for_results + "place_details/Result_POL_PlaceStats_{}_{}_{}.csv".format(net_name, log_name,
+                                                                                     time_stamp.strftime("%Y-%m-%d_%H-%M-%S"))
+        if do_persist_results and not write_parquet_results else None)
+    place_statistic_result.add_place_statistics(leading_values, result.place_to_decision_statistic,
+                                                [place.name for place in net_internal_format.inner_places])
+    place_statistic_result.close()
+    if do_persist_results and write_parquet_results:
+        # pyarrow is only needed for the datasets
+        from MasterThesisProject.source.utils.ParquetResultDataset import write_results_to_dataset, PARTITION_COLUMNS_STATISTICS
+        write_results_to_dataset(place_statistic_result.build_data_frame(), path_for_parquet_results + "place_details/",
+                                 PARTITION_COLUMNS_STATISTICS)
+    # Run statistics
+    run_statistic_result: ColumnarResultSink = ColumnarResultSink(
+        colum_names_run_statistics,
+        path_for_results + "run_details/Result_POL_RunStats_{}_{}_{}.csv".format(net_name, log_name, time_stamp.strftime("%Y-%m-%d_%H-%M-%S"))
+        if do_persist_results and not write_parquet_results else None)
+    # Additionally, we add all invalid runs to the run statistics if they are not present; otherwise we set the first false
+    # label on the already added runs.
+    run_statistic_result.add_run_results(leading_values, result.run_to_conformance_result, log_internal_format.run_to_frequency,
+                                         invalid_run_to_false_labels if include_data_with_invalid_transitions else None)
+    if not include_data_with_invalid_transitions:
+        for run_name in invalid_run_to_false_labels:
+            run_statistic_result.add_row(leading_values + [run_name,
+                                                           1,
+                                                           math.nan,
+                                                           math.nan,
+                                                           invalid_run_to_false_labels[run_name],
+                                                           math.nan,
+                                                           math.nan,
+                                                           math.nan,
+                                                           math.nan,
+                                                           math.nan,
+                                                           math.nan])
+    run_statistic_result.close()
+    if do_persist_results and write_parquet_results:
+        from MasterThesisProject.source.utils.ParquetResultDataset import write_results_to_dataset, PARTITION_COLUMNS_STATISTICS
+        write_results_to_dataset(run_statistic_result.build_data_frame(), path_for_parquet_results + "run_details/",
+                                 PARTITION_COLUMNS_STATISTICS)
 
-            # We only need to save once the statistics for every place and every run
-            if number_iteration == 0 and index_calc_method == 0:
-                # Place statistics
-                place_statistic_result: DataFrame = DataFrame(columns=column_names_place_statistics)
-                for place in net_internal_format.inner_places:
-                    place_count: PlaceStatistics = result.place_to_decision_statistic[place.name]
-                    place_statistic_result.loc[len(place_statistic_result)] = [time_stamp,
-                                                                               net_name,
-                                                                               log_name,
-                                                                               include_invalid_data,
-                                                                               count_initial_and_final_places,
-                                                                               place.name,
-                                                                               place_count.forward_heuristic,
-                                                                               place_count.backward_heuristic,
-                                                                               place_count.maximal_flow,
-                                                                               place_count.missing_token_max,
-                                                                               place_count.missing_token_min,
-                                                                               place_count.consumed_token,
-                                                                               place_count.remaining_token_max,
-                                                                               place_count.remaining_token_min,
-                                                                               place_count.produced_token
-                                                                               ]
-                if do_persist_results:
-                    place_statistic_result.to_csv(
-                        path_for_results + "place_details/Result_POL_PlaceStats_{}_{}_{}.csv".format(net_name, log_name,
-                                                                                                     time_stamp.strftime("%Y-%m-%d_%H-%M-%S")),
-                        index=False)
-                # Run statistics
-                run_statistic_result: DataFrame = DataFrame(columns=colum_names_run_statistics)
-                for run in result.run_to_conformance_result:
-                    run_conformance_result: RunConformanceResult = result.run_to_conformance_result[run]
-                    run_statistic_result.loc[len(run_statistic_result)] = [time_stamp,
-                                                                           net_name,
-                                                                           log_name,
-                                                                           include_invalid_data,
-                                                                           count_initial_and_final_places,
-                                                                           run.name_foreign_source,
-                                                                           log_internal_format.run_to_frequency[run],
-                                                                           run_conformance_result.conformance_level_max,
-                                                                           run_conformance_result.conformance_level_min,
-                                                                           None,
-                                                                           run_conformance_result.missing_token_max,
-                                                                           run_conformance_result.missing_token_min,
-                                                                           run_conformance_result.consumed_token,
-                                                                           run_conformance_result.remaining_token_max,
-                                                                           run_conformance_result.remaining_token_min,
-                                                                           run_conformance_result.produced_token
-                                                                           ]
-                # Additionally, we add all invalid runs to the run statistics if they are not present; otherwise we se the first false
-                # label on the already added transitions.
-                for run_name in invalid_run_to_false_labels:
-                    invalid_label: str = invalid_run_to_false_labels[run_name]
-                    if not include_data_with_invalid_transitions:
-                        run_statistic_result.loc[len(run_statistic_result)] = [time_stamp,
-                                                                               net_name,
-                                                                               log_name,
-                                                                               include_invalid_data,
-                                                                               count_initial_and_final_places,
-                                                                               run_name,
-                                                                               1,
-                                                                               math.nan,
-                                                                               math.nan,
-                                                                               invalid_label,
-                                                                               math.nan,
-                                                                               math.nan,
-                                                                               math.nan,
-                                                                               math.nan,
-                                                                               math.nan,
-                                                                               math.nan]
-                    else:
-                        run_statistic_result.loc[run_statistic_result["Run represent (PO/TO name)"] == run_name, "Invalid event label"] = invalid_label
-                if do_persist_results:
-                    run_statistic_result.to_csv(
-                        path_for_results + "run_details/Result_POL_RunStats_{}_{}_{}.csv".format(net_name, log_name, time_stamp.strftime("%Y-%m-%d_%H-%M-%S")),
-                        index=False)
-        iteration_sub_results.append(iteration_sub_result)
-        # Writing of subresults is not really needed, thus we skip it.
-        # # Write subresults
-        # file_name_subresult = path_for_results + "parts/Result_ConformanceAndTime_" + datetime.now().strftime("%Y-%m-%d_%H-%M-%S") + "_Iteration_" + str(
-        #     number_iteration)
-        # iteration_sub_result.to_csv(file_name_subresult, index=False)
-    # At the end concat results and write into file
+
+def execute_experiment_task(task: ExperimentTask) -> list:
+    """
+    Measures one calculation method in one iteration for the net and log of the task; the first task of a pair also
+    writes the place and run statistics.
+    :return: the row of the general results, with the start time in iso format (the row goes into the checkpoint)
+    """
+    net_name, log_name = get_net_and_log_names(task.net_log_pair)
+    net_internal_format, _, log_internal_format, _ = load_net_and_log(task.net_log_pair)
+    print("Iteration {} of {} for ({},{}), {}.".format(task.iteration + 1, number_tests_per_pair, log_name, net_name,
+                                                      calculation_methods[task.method_index]))
+    do_calculate_precise_result: bool = do_calculate_precise_result_flags[task.method_index]
+    never_use_heuristic: bool = never_use_heuristic_flags[task.method_index]
+    time_stamp: datetime = datetime.now()
+    start_experiment = time.perf_counter()
+    result: PartiallyOrderedLogConformanceResult = calculate_token_replay_conformance_norm_for_partial_order(log_internal_format,
+                                                                                                             net_internal_format,
+                                                                                                             do_calculate_precise_result,
+                                                                                                             never_use_heuristic,
+                                                                                                             not is_experiment_with_po,
+                                                                                                             count_initial_and_final_places,
+                                                                                                             token_result_cache=token_result_cache)
+    end_experiment = time.perf_counter()
+    time_experiment = end_experiment - start_experiment
+    # The other places are either ones calculated in flow network or only by better heuristic
+    number_other_places: int = result.number_places_decided_flow_network if do_calculate_precise_result else result.number_places_only_estimated
+    general_result_row: list = ColumnarResultSink.make_log_result_row([time_stamp.isoformat(),
+                                                                       net_name,
+                                                                       log_name,
+                                                                       include_invalid_data,
+                                                                       count_initial_and_final_places,
+                                                                       calculation_methods[task.method_index],
+                                                                       time_experiment],
+                                                                      result, number_other_places)
+    # We only need to save once the statistics for every place and every run
+    if task.iteration == 0 and task.method_index == 0:
+        write_statistics(task.net_log_pair, time_stamp, result)
+    return general_result_row
+
+
+def write_general_results(net_log_pair: dict[str, str], rows: list[list]):
+    """
+    Writes the results of all iterations of the pair into a file.
+    :param rows: the rows of execute_experiment_task in the order of the iterations and methods
+    """
+    net_name, log_name = get_net_and_log_names(net_log_pair)
+    general_results: ColumnarResultSink = ColumnarResultSink(colum_names_general_results)
+    for row in rows:
+        general_results.add_row([datetime.fromisoformat(row[0])] + row[1:])
     file_name_total_result: str = path_for_results + "general/Result_ConformanceANdTime_{}_{}_{}".format(net_name, log_name,
                                                                                                          datetime.now().strftime("%Y-%m-%d_%H-%M-%S"))
-    combined_results: DataFrame = pd.concat(iteration_sub_results)
+    combined_results: DataFrame = general_results.build_data_frame()
     if do_persist_results:
         combined_results.to_csv(file_name_total_result, index=False)
+        if write_parquet_results:
+            # pyarrow is only needed for the datasets
+            from MasterThesisProject.source.utils.ParquetResultDataset import write_results_to_dataset, PARTITION_COLUMNS_GENERAL_RESULTS
+            write_results_to_dataset(combined_results, path_for_parquet_results + "general/", PARTITION_COLUMNS_GENERAL_RESULTS)
+
+
+def write_general_results_of_completed_pairs(checkpoint: ExperimentCheckpoint, pair_key_to_tasks: dict[str, list[ExperimentTask]],
+                                             completed_pair_keys: list[str]):
+    """
+    Writes the general results of the pairs whose tasks are all done and that were not written so far.
+    """
+    for pair_key in completed_pair_keys:
+        if pair_key not in checkpoint.written_pair_keys:
+            write_general_results(pair_key_to_tasks[pair_key][0].net_log_pair,
+                                  [checkpoint.task_key_to_row[task.get_key()] for task in pair_key_to_tasks[pair_key]])
+            checkpoint.add_written_pair(pair_key)
 
 
-timestamp_total_experiment: str = str(datetime.now())
-with open("WrongPOXesReadingLog.txt", "a") as log_file:
-    log_file.write("Observed problems for experiments at time: " + timestamp_total_experiment + ".\n")
-net_log_pairs = net_log_pairs_po if is_experiment_with_po else net_log_pairs_to
-for net_log_pair in net_log_pairs:
-    do_experiment_for_data(net_log_pair)
-with open("WrongPOXesReadingLog.txt", "a") as log_file:
-    log_file.write("END LOG FOR EXPERIMENT AT TIME " + timestamp_total_experiment + ".\n")
+if __name__ == "__main__":
+    timestamp_total_experiment: str = str(datetime.now())
+    with open("WrongPOXesReadingLog.txt", "a") as log_file:
+        log_file.write("Observed problems for experiments at time: " + timestamp_total_experiment + ".\n")
+    net_log_pairs = net_log_pairs_po if is_experiment_with_po else net_log_pairs_to
+    experiment_tasks: list[ExperimentTask] = make_experiment_tasks(net_log_pairs, len(calculation_methods), number_tests_per_pair)
+    checkpoint: ExperimentCheckpoint = ExperimentCheckpoint(path_for_checkpoint, {
+        "net_log_pairs": net_log_pairs, "number_tests_per_pair": number_tests_per_pair, "calculation_methods": calculation_methods,
+        "include_data_with_invalid_transitions": include_data_with_invalid_transitions, "count_initial_and_final_places": count_initial_and_final_places,
+        "merge_isomorphic_runs": merge_isomorphic_runs, "compact_partial_orders": compact_partial_orders}, do_resume_sweep)
+    pair_key_to_tasks: dict[str, list[ExperimentTask]] = dict()
+    for experiment_task in experiment_tasks:
+        pair_key_to_tasks.setdefault(experiment_task.get_pair_key(), []).append(experiment_task)
+    pair_key_to_number_missing_tasks: dict[str, int] = {pair_key: sum(not checkpoint.is_completed(task) for task in tasks)
+                                                        for pair_key, tasks in pair_key_to_tasks.items()}
+    completed_pair_keys: list[str] = [pair_key for pair_key, number_missing_tasks in pair_key_to_number_missing_tasks.items()
+                                      if number_missing_tasks == 0]
+    for experiment_task, _ in run_experiment_tasks(experiment_tasks, execute_experiment_task, checkpoint, number_workers):
+        pair_key_to_number_missing_tasks[experiment_task.get_pair_key()] -= 1
+        if pair_key_to_number_missing_tasks[experiment_task.get_pair_key()] == 0:
+            completed_pair_keys.append(experiment_task.get_pair_key())
+        write_general_results_of_completed_pairs(checkpoint, pair_key_to_tasks, completed_pair_keys)
+    # the pairs completed before an interruption, whose results were not written
+    write_general_results_of_completed_pairs(checkpoint, pair_key_to_tasks, completed_pair_keys)
+    with open("WrongPOXesReadingLog.txt", "a") as log_file:
+        log_file.write("END LOG FOR EXPERIMENT AT TIME " + timestamp_total_experiment + ".\n")
@@ -1,11 +1,24 @@
-import glob
 import os
 
 import pandas as pd
 from pandas import DataFrame
 
 path_for_masterfile: str = "results/po/general/"
-result_csv_files = os.listdir(path_for_masterfile)
+name_masterfile: str = "Masterfile_General"
+# if the experiments wrote a parquet dataset (see write_parquet_results), the master file is made by a scan of it
+path_for_parquet_dataset: str = "results/po/dataset/general/"
+use_parquet_dataset: bool = False
 
-all_data: DataFrame = pd.concat([pd.read_csv(path_for_masterfile + file_name) for file_name in result_csv_files], ignore_index=True)
-all_data.to_csv(path_for_masterfile + "Masterfile_General")
\ No newline at end of file
+if use_parquet_dataset:
+    from MasterThesisProject.source.experiments.ExperimentPartialOrderConFormanceAnalysis import colum_names_general_results
+    from MasterThesisProject.source.utils.ParquetResultDataset import write_master_file_from_dataset
+    write_master_file_from_dataset(path_for_parquet_dataset, path_for_masterfile + name_masterfile, colum_names_general_results)
+else:
+    # we append one file after the other, so only a single result file is in memory
+    result_csv_files = [file_name for file_name in sorted(os.listdir(path_for_masterfile)) if file_name != name_masterfile]
+    number_written_rows: int = 0
+    for file_name in result_csv_files:
+        file_data: DataFrame = pd.read_csv(path_for_masterfile + file_name)
+        file_data.index = pd.RangeIndex(number_written_rows, number_written_rows + len(file_data))
+        file_data.to_csv(path_for_masterfile + name_masterfile, mode="w" if number_written_rows == 0 else "a", header=number_written_rows == 0)
+        number_written_rows += len(file_data)
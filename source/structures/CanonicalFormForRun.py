@@ -0,0 +1,75 @@
+import hashlib
+
+from networkx import DiGraph
+from networkx.algorithms.isomorphism import DiGraphMatcher
+
+from MasterThesisProject.source.structures.Run import Run
+
+
+class CanonicalForm4Run:
+    """
+    Result of a Weisfeiler-Lehman style refinement of the labels of a run: every event gets a colour that only depends on
+    the name of its transition and (iteratively) on the colours of its predecessors and successors. Isomorphic runs have the same hash
+    value; different runs usually have different ones, but we have to check with are_runs_isomorphic to be sure.
+    Attributes:
+    ----------
+    hash_value: hex string, which does not depend on the process (so it can be used for cache keys)
+    event_to_colour: the final colour of every event, which is used to speed up the exact isomorphism check
+    """
+
+    def __init__(self, hash_value: str, event_to_colour: dict):
+        self.hash_value = hash_value
+        self.event_to_colour = event_to_colour
+
+
+def calculate_colour(*parts) -> str:
+    return hashlib.blake2b(repr(parts).encode(), digest_size=16).hexdigest()
+
+
+def get_canonical_form_for_run(run: Run) -> CanonicalForm4Run:
+    """
+    The form is calculated once and then kept in the run.
+    :param run:
+    :return:
+    """
+    if run.canonical_form is not None:
+        return run.canonical_form
+    partial_order: DiGraph = run.partial_order
+    # the transitions are compared by name and not by activity, since transitions of a net may share an activity
+    event_to_colour: dict = {event: calculate_colour(run.labels[event].name) for event in partial_order}
+    number_colours: int = len(set(event_to_colour.values()))
+    # the partition of the events gets finer in every step; when it stays the same, it is stable
+    for _ in range(len(event_to_colour)):
+        event_to_colour = {event: calculate_colour(colour,
+                                                   sorted(event_to_colour[predecessor] for predecessor in partial_order.predecessors(event)),
+                                                   sorted(event_to_colour[successor] for successor in partial_order.successors(event)))
+                           for event, colour in event_to_colour.items()}
+        new_number_colours: int = len(set(event_to_colour.values()))
+        if new_number_colours == number_colours:
+            break
+        number_colours = new_number_colours
+    run.canonical_form = CanonicalForm4Run(calculate_colour(sorted(event_to_colour.values()), partial_order.number_of_edges()),
+                                           event_to_colour)
+    return run.canonical_form
+
+
+def are_runs_isomorphic(first_run: Run, second_run: Run) -> bool:
+    """
+    Exact check whether there is a bijection of the events that keeps the transitions (by name) and the edges.
+    """
+    first_form: CanonicalForm4Run = get_canonical_form_for_run(first_run)
+    second_form: CanonicalForm4Run = get_canonical_form_for_run(second_run)
+    if first_form.hash_value != second_form.hash_value:
+        return False
+
+    def make_coloured_graph(run: Run, event_to_colour: dict) -> DiGraph:
+        graph: DiGraph = DiGraph()
+        graph.add_nodes_from((event, {"colour": colour}) for event, colour in event_to_colour.items())
+        graph.add_edges_from(run.partial_order.edges())
+        return graph
+
+    # the colours include the labels, so it suffices to match them
+    matcher: DiGraphMatcher = DiGraphMatcher(make_coloured_graph(first_run, first_form.event_to_colour),
+                                             make_coloured_graph(second_run, second_form.event_to_colour),
+                                             node_match=lambda first, second: first["colour"] == second["colour"])
+    return matcher.is_isomorphic()
@@ -0,0 +1,133 @@
+from typing import Tuple
+
+from networkx import DiGraph
+
+from MasterThesisProject.source.structures.Run import Run, Event4Run
+from MasterThesisProject.source.structures.TotalOrderForRun import TotalOrder4Run
+from MasterThesisProject.source.structures.WorkflowNet import WorkflowNet, PlaceWorkflowNet, TransitionWorkflowNet
+
+
+class CompactWorkflowNet:
+    """
+    Picklable representation of a workflow net that only consists of names and integer indices, so it can be sent to
+    other processes cheaply. Transitions with index >= number_net_transitions do not belong to the net but occur as labels
+    in runs (e.g. in hand-made runs); they are rebuilt, but not added to the net.
+    Attributes:
+    ----------
+    place_names: name of every place, the index of a place is its position in the list
+    transition_preset_indices/transition_postset_indices: for every transition the indices of the places in its pre-/postset
+    """
+
+    def __init__(self, place_names: list[str], start_place_index: int, end_place_index: int, transition_names: list[str],
+                 transition_activity_descriptions: list[str], transition_preset_indices: list[list[int]],
+                 transition_postset_indices: list[list[int]], number_net_transitions: int):
+        self.place_names = place_names
+        self.start_place_index = start_place_index
+        self.end_place_index = end_place_index
+        self.transition_names = transition_names
+        self.transition_activity_descriptions = transition_activity_descriptions
+        self.transition_preset_indices = transition_preset_indices
+        self.transition_postset_indices = transition_postset_indices
+        self.number_net_transitions = number_net_transitions
+
+    @staticmethod
+    def make_class_instance_from_workflow_net(net: WorkflowNet, runs: list[Run] = None) \
+            -> Tuple["CompactWorkflowNet", dict[TransitionWorkflowNet, int]]:
+        """
+        :param net:
+        :param runs: labels of these runs, which are not transitions of the net, are added as well
+        :return: the compact net and the index of every transition (which is needed to make compact runs)
+        """
+        places: list[PlaceWorkflowNet] = list(net.get_incidence_index().places)
+        place_to_index: dict[PlaceWorkflowNet, int] = {place: index for index, place in enumerate(places)}
+        transitions: list[TransitionWorkflowNet] = list(net.transitions)
+        transition_to_index: dict[TransitionWorkflowNet, int] = {transition: index for index, transition in enumerate(transitions)}
+        for run in runs if runs is not None else []:
+            for transition in run.labels.values():
+                if transition not in transition_to_index:
+                    transition_to_index[transition] = len(transitions)
+                    transitions.append(transition)
+        compact_net: CompactWorkflowNet = CompactWorkflowNet(
+            [place.name for place in places], place_to_index[net.start_place], place_to_index[net.end_place],
+            [transition.name for transition in transitions], [transition.activity_description for transition in transitions],
+            [sorted(place_to_index[place] for place in transition.preset if place in place_to_index) for transition in transitions],
+            [sorted(place_to_index[place] for place in transition.postset if place in place_to_index) for transition in transitions],
+            len(net.transitions))
+        return compact_net, transition_to_index
+
+    def make_workflow_net(self) -> Tuple[WorkflowNet, list[TransitionWorkflowNet]]:
+        """
+        :return: the rebuilt net and the list of all rebuilt transitions (including the ones not belonging to the net)
+        """
+        places: list[PlaceWorkflowNet] = [PlaceWorkflowNet(name) for name in self.place_names]
+        transitions: list[TransitionWorkflowNet] = []
+        for index, name in enumerate(self.transition_names):
+            preset: list[PlaceWorkflowNet] = [places[place_index] for place_index in self.transition_preset_indices[index]]
+            postset: list[PlaceWorkflowNet] = [places[place_index] for place_index in self.transition_postset_indices[index]]
+            if index < self.number_net_transitions:
+                transition: TransitionWorkflowNet = TransitionWorkflowNet(name, self.transition_activity_descriptions[index])
+                transition.add_place_iteration_to_preset(preset)
+                transition.add_place_iteration_to_postset(postset)
+            else:
+                # do not register the transition at the places, as it is not part of the net
+                transition = TransitionWorkflowNet(name, self.transition_activity_descriptions[index], set(preset), set(postset))
+            transitions.append(transition)
+        net: WorkflowNet = WorkflowNet.make_class_instance_from_transitions(set(transitions[:self.number_net_transitions]),
+                                                                            places[self.start_place_index],
+                                                                            places[self.end_place_index])
+        return net, transitions
+
+
+class CompactRun:
+    """
+    Picklable representation of a run: the events are numbered by their position in the partial order, every event only
+    keeps the index of its label and the edges are a flat list of event indices (source, target, source, target, ...).
+    If the total order is set, it is kept as event indices, where -1 stands for no successor/predecessor.
+    The names of the events are not kept.
+    """
+
+    def __init__(self, name_foreign_source: str, event_transition_indices: list[int], edges: list[int],
+                 total_order: list[int] = None, successors: list[int] = None, predecessors: list[int] = None):
+        self.name_foreign_source = name_foreign_source
+        self.event_transition_indices = event_transition_indices
+        self.edges = edges
+        self.total_order = total_order
+        self.successors = successors
+        self.predecessors = predecessors
+
+    @staticmethod
+    def make_class_instance_from_run(run: Run, transition_to_index: dict[TransitionWorkflowNet, int]) -> "CompactRun":
+        events: list[Event4Run] = list(run.partial_order)
+        event_to_index: dict[Event4Run, int] = {event: index for index, event in enumerate(events)}
+        edges: list[int] = []
+        for source, target in run.partial_order.edges():
+            edges.append(event_to_index[source])
+            edges.append(event_to_index[target])
+        compact_run: CompactRun = CompactRun(run.name_foreign_source, [transition_to_index[run.labels[event]] for event in events], edges)
+        order: TotalOrder4Run = run.total_order
+        if order is not None:
+            compact_run.total_order = [event_to_index[event] for event in order.order]
+            compact_run.successors = [-1 if order.event_to_successor_event[event] is None
+                                      else event_to_index[order.event_to_successor_event[event]] for event in events]
+            compact_run.predecessors = [-1 if order.event_to_predecessor_event[event] is None
+                                        else event_to_index[order.event_to_predecessor_event[event]] for event in events]
+        return compact_run
+
+    def make_run(self, transitions: list[TransitionWorkflowNet]) -> Run:
+        """
+        :param transitions: the transitions rebuilt from the compact net the run was made with
+        :return:
+        """
+        events: list[Event4Run] = [Event4Run("Event %d" % index, transitions[transition_index])
+                                   for index, transition_index in enumerate(self.event_transition_indices)]
+        partial_order: DiGraph = DiGraph()
+        partial_order.add_nodes_from(events)
+        partial_order.add_edges_from((events[self.edges[position]], events[self.edges[position + 1]])
+                                     for position in range(0, len(self.edges), 2))
+        run: Run = Run(partial_order, self.name_foreign_source)
+        if self.total_order is not None:
+            run.total_order = TotalOrder4Run(
+                [events[index] for index in self.total_order],
+                {event: None if self.successors[index] == -1 else events[self.successors[index]] for index, event in enumerate(events)},
+                {event: None if self.predecessors[index] == -1 else events[self.predecessors[index]] for index, event in enumerate(events)})
+        return run
@@ -0,0 +1,75 @@
+import heapq
+
+# Phases of the conformance analysis we measure
+PHASE_INITIAL_AND_FINAL_PLACE: str = "initial and final place"
+PHASE_TOTAL_ORDER: str = "total order"
+PHASE_FORWARD_HEURISTIC: str = "forward heuristic"
+PHASE_BACKWARD_HEURISTIC: str = "backward heuristic"
+PHASE_MULTI_PLACE_HEURISTIC: str = "multi place heuristic"
+PHASE_MAX_FLOW_CONSTRUCTION: str = "max flow construction"
+PHASE_MAX_FLOW_SOLVING: str = "max flow solving"
+
+
+class ConformanceInstrumentation:
+    """
+    Optional accounting of the time and work of the conformance analysis, see the parameter instrumentation of
+    calculate_token_replay_conformance_norm_for_partial_order. Without an instrumentation object the algorithms only
+    check for None. The times are wall clock times in seconds and are summed over all calls.
+    Attributes:
+    ----------
+    phase_to_seconds: cumulative time of every phase (see the PHASE constants)
+    phase_to_calls: number of calls of every phase
+    number_pushes, number_relabels, number_discharges, number_gap_relabels, number_global_relabels: operation counters
+        of the preflow push algorithm summed over all maximal flow problems
+    number_slowest_pairs: how many of the slowest (run, place) pairs are kept
+    slowest_pairs: min heap of (seconds, sequence number, run, place name) of the slowest pairs; the time of a pair is
+        the time to decide the place in the run, including heuristics and flow network
+    """
+
+    def __init__(self, number_slowest_pairs: int = 10):
+        self.phase_to_seconds: dict[str, float] = dict()
+        self.phase_to_calls: dict[str, int] = dict()
+        self.number_pushes: int = 0
+        self.number_relabels: int = 0
+        self.number_discharges: int = 0
+        self.number_gap_relabels: int = 0
+        self.number_global_relabels: int = 0
+        self.number_slowest_pairs = number_slowest_pairs
+        self.slowest_pairs: list[tuple] = []
+        self.number_recorded_pairs: int = 0
+
+    def add_phase_time(self, phase: str, seconds: float):
+        self.phase_to_seconds[phase] = self.phase_to_seconds.get(phase, 0.0) + seconds
+        self.phase_to_calls[phase] = self.phase_to_calls.get(phase, 0) + 1
+
+    def add_flow_network_counters(self, flow_network):
+        """
+        :param flow_network: a solved network of one of the preflow push engines
+        """
+        self.number_pushes += flow_network.number_pushes
+        self.number_relabels += flow_network.number_relabels
+        self.number_discharges += flow_network.number_discharges
+        self.number_gap_relabels += flow_network.number_gap_relabels
+        self.number_global_relabels += flow_network.number_global_relabels
+
+    def add_place_time(self, run, place_name: str, seconds: float):
+        self.number_recorded_pairs += 1
+        entry: tuple = (seconds, self.number_recorded_pairs, run, place_name)
+        if len(self.slowest_pairs) < self.number_slowest_pairs:
+            heapq.heappush(self.slowest_pairs, entry)
+        elif self.number_slowest_pairs > 0 and seconds > self.slowest_pairs[0][0]:
+            heapq.heapreplace(self.slowest_pairs, entry)
+
+    def get_slowest_pairs(self) -> list[tuple]:
+        """
+        :return: (seconds, run, place name) of the slowest pairs, the slowest first
+        """
+        return [(seconds, run, place_name) for seconds, _, run, place_name in sorted(self.slowest_pairs, reverse=True)]
+
+    def make_report(self) -> str:
+        lines: list[str] = ["{:<25} {:>10.4f}s {:>9} calls".format(phase, seconds, self.phase_to_calls[phase])
+                            for phase, seconds in sorted(self.phase_to_seconds.items(), key=lambda item: -item[1])]
+        lines.append("Preflow push: {} pushes, {} relabels, {} discharges, {} gap relabels, {} global relabels".format(
+            self.number_pushes, self.number_relabels, self.number_discharges, self.number_gap_relabels, self.number_global_relabels))
+        lines.extend("{:.4f}s for place {} in {}".format(seconds, place_name, run) for seconds, run, place_name in self.get_slowest_pairs())
+        return "\n".join(lines)
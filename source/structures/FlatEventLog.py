@@ -0,0 +1,187 @@
+import json
+import os
+from multiprocessing.shared_memory import SharedMemory
+
+import numpy as np
+
+from MasterThesisProject.source.structures.CompactRepresentations import CompactRun
+from MasterThesisProject.source.structures.PartiallyOrderedEventLog import PartiallyOrderedEventLog
+from MasterThesisProject.source.structures.Run import Run
+from MasterThesisProject.source.structures.WorkflowNet import TransitionWorkflowNet
+
+
+class FlatEventLog:
+    """
+    The runs of a log in a few flat integer arrays, i.e., all compact runs (see CompactRun) of the log concatenated.
+    The events of run r are the positions event_offsets[r] to event_offsets[r+1] of the event arrays and its edges the
+    pairs edge_offsets[r] to edge_offsets[r+1] of the edges array (which keeps source, target, source, target, ...).
+    All event indices are local to the run. Every run has its total order, which is thus fixed once the flat log is made.
+    Attributes:
+    ----------
+    event_transitions: index of the label of every event (in the transition order of the compact net)
+    total_orders: for every run the local event indices in the total order
+    successors/predecessors: for every event the local index of its successor/predecessor in the total order or -1
+    """
+    ARRAY_NAMES: list[str] = ["frequencies", "event_offsets", "event_transitions", "edge_offsets", "edges", "total_orders",
+                              "successors", "predecessors"]
+
+    def __init__(self, run_names: list[str], frequencies: np.ndarray, event_offsets: np.ndarray, event_transitions: np.ndarray,
+                 edge_offsets: np.ndarray, edges: np.ndarray, total_orders: np.ndarray, successors: np.ndarray,
+                 predecessors: np.ndarray):
+        self.run_names = run_names
+        self.frequencies = frequencies
+        self.event_offsets = event_offsets
+        self.event_transitions = event_transitions
+        self.edge_offsets = edge_offsets
+        self.edges = edges
+        self.total_orders = total_orders
+        self.successors = successors
+        self.predecessors = predecessors
+
+    @staticmethod
+    def make_class_instance_from_event_log(event_log: PartiallyOrderedEventLog,
+                                           transition_to_index: dict[TransitionWorkflowNet, int]) -> "FlatEventLog":
+        """
+        :param event_log: the total orders of all runs have to be set
+        :param transition_to_index: see CompactWorkflowNet.make_class_instance_from_workflow_net
+        :return:
+        """
+        run_names: list[str] = []
+        frequencies: list[int] = []
+        event_offsets: list[int] = [0]
+        edge_offsets: list[int] = [0]
+        event_transitions: list[int] = []
+        edges: list[int] = []
+        total_orders: list[int] = []
+        successors: list[int] = []
+        predecessors: list[int] = []
+        for run, frequency in event_log.run_to_frequency.items():
+            if run.total_order is None:
+                raise Exception("The flat log keeps the total orders, so they have to be set for all runs (missing for run %s)."
+                                % run.name_foreign_source)
+            compact_run: CompactRun = CompactRun.make_class_instance_from_run(run, transition_to_index)
+            run_names.append(compact_run.name_foreign_source)
+            frequencies.append(frequency)
+            event_transitions.extend(compact_run.event_transition_indices)
+            edges.extend(compact_run.edges)
+            total_orders.extend(compact_run.total_order)
+            successors.extend(compact_run.successors)
+            predecessors.extend(compact_run.predecessors)
+            event_offsets.append(len(event_transitions))
+            edge_offsets.append(len(edges) // 2)
+        return FlatEventLog(run_names, np.array(frequencies, dtype=np.int64), np.array(event_offsets, dtype=np.int64),
+                            np.array(event_transitions, dtype=np.int32), np.array(edge_offsets, dtype=np.int64),
+                            np.array(edges, dtype=np.int32), np.array(total_orders, dtype=np.int32),
+                            np.array(successors, dtype=np.int32), np.array(predecessors, dtype=np.int32))
+
+    def get_number_runs(self) -> int:
+        return len(self.run_names)
+
+    def get_compact_run(self, run_index: int) -> CompactRun:
+        event_start: int = int(self.event_offsets[run_index])
+        event_end: int = int(self.event_offsets[run_index + 1])
+        edge_start: int = 2 * int(self.edge_offsets[run_index])
+        edge_end: int = 2 * int(self.edge_offsets[run_index + 1])
+        return CompactRun(self.run_names[run_index], self.event_transitions[event_start:event_end].tolist(),
+                          self.edges[edge_start:edge_end].tolist(), self.total_orders[event_start:event_end].tolist(),
+                          self.successors[event_start:event_end].tolist(), self.predecessors[event_start:event_end].tolist())
+
+    def make_event_log(self, transitions: list[TransitionWorkflowNet]) -> PartiallyOrderedEventLog:
+        """
+        :param transitions: the transitions rebuilt from the compact net the flat log was made with
+        :return:
+        """
+        frequencies: list[int] = self.frequencies.tolist()
+        run_to_frequency: dict[Run, int] = dict()
+        for run_index in range(self.get_number_runs()):
+            run_to_frequency[self.get_compact_run(run_index).make_run(transitions)] = frequencies[run_index]
+        return PartiallyOrderedEventLog(run_to_frequency)
+
+    def save(self, directory: str):
+        """
+        Every array is saved in its own .npy file, so it can be memory mapped when loading.
+        """
+        os.makedirs(directory, exist_ok=True)
+        for array_name in FlatEventLog.ARRAY_NAMES:
+            np.save(os.path.join(directory, array_name + ".npy"), getattr(self, array_name))
+        with open(os.path.join(directory, "run_names.json"), "w") as file:
+            json.dump(self.run_names, file)
+
+    @staticmethod
+    def load(directory: str, mmap_mode: str = "r") -> "FlatEventLog":
+        """
+        :param mmap_mode: see numpy.load; with the default the arrays are only memory mapped (read only) and not read
+        :return:
+        """
+        with open(os.path.join(directory, "run_names.json")) as file:
+            run_names: list[str] = json.load(file)
+        arrays: list[np.ndarray] = [np.load(os.path.join(directory, array_name + ".npy"), mmap_mode=mmap_mode)
+                                    for array_name in FlatEventLog.ARRAY_NAMES]
+        return FlatEventLog(run_names, *arrays)
+
+
+class SharedFlatEventLogDescriptor:
+    """
+    Picklable description of a flat log in shared memory, the only thing sent to the processes that attach to it.
+    Attributes:
+    ----------
+    shared_memory_name: name of the block
+    run_names: names of the runs
+    array_layout: for every array of FlatEventLog.ARRAY_NAMES its dtype, its offset in the block in bytes and its length
+    """
+
+    def __init__(self, shared_memory_name: str, run_names: list[str], array_layout: list[tuple[str, int, int]]):
+        self.shared_memory_name = shared_memory_name
+        self.run_names = run_names
+        self.array_layout = array_layout
+
+
+class SharedFlatEventLog:
+    """
+    A flat log whose arrays lie in a single block of shared memory, so worker processes attach to them without copying
+    and only rebuild the runs they need (see FlatEventLog.get_compact_run). The process that made the block owns it;
+    every process calls release when it is done, which removes the block if called by the owner.
+    Attributes:
+    ----------
+    shared_memory: the block
+    descriptor: the description to attach to the block in other processes
+    flat_log: the flat log with the arrays in the block
+    is_owner: whether this process made the block
+    """
+
+    def __init__(self, shared_memory: SharedMemory, descriptor: SharedFlatEventLogDescriptor, is_owner: bool):
+        self.shared_memory = shared_memory
+        self.descriptor = descriptor
+        arrays: list[np.ndarray] = [np.ndarray((length,), dtype=np.dtype(dtype), buffer=shared_memory.buf, offset=offset)
+                                    for dtype, offset, length in descriptor.array_layout]
+        self.flat_log = FlatEventLog(descriptor.run_names, *arrays)
+        self.is_owner = is_owner
+
+    @staticmethod
+    def make_class_instance_from_flat_log(flat_log: FlatEventLog) -> "SharedFlatEventLog":
+        arrays: list[np.ndarray] = [getattr(flat_log, array_name) for array_name in FlatEventLog.ARRAY_NAMES]
+        array_layout: list[tuple[str, int, int]] = []
+        size: int = 0
+        for array in arrays:
+            # every array starts at a multiple of 8 bytes, so all dtypes are aligned
+            size = -(-size // 8) * 8
+            array_layout.append((array.dtype.str, size, len(array)))
+            size += array.nbytes
+        # a block can not be empty
+        shared_memory: SharedMemory = SharedMemory(create=True, size=max(size, 1))
+        shared_log: SharedFlatEventLog = SharedFlatEventLog(shared_memory, SharedFlatEventLogDescriptor(shared_memory.name, list(flat_log.run_names),
+                                                                                                        array_layout), True)
+        for array_name, array in zip(FlatEventLog.ARRAY_NAMES, arrays):
+            getattr(shared_log.flat_log, array_name)[:] = array
+        return shared_log
+
+    @staticmethod
+    def attach(descriptor: SharedFlatEventLogDescriptor) -> "SharedFlatEventLog":
+        return SharedFlatEventLog(SharedMemory(name=descriptor.shared_memory_name), descriptor, False)
+
+    def release(self):
+        # the arrays have to be gone before the block can be closed
+        self.flat_log = None
+        self.shared_memory.close()
+        if self.is_owner:
+            self.shared_memory.unlink()
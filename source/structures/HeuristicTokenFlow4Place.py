@@ -0,0 +1,24 @@
+class HeuristicTokenFlow4Place:
+    """
+    Token flow on a single place that the forward heuristic realized, restricted to the tokens that are consumed. It is
+    given in terms of the arcs of the maximum flow network implied by the run (see build_maximal_flow_problem), so it is
+    a feasible flow there and can be used as initial flow of the preflow push algorithm. Events without an entry have
+    no flow on the corresponding arc.
+    Attributes:
+    ----------
+    event_to_consumed_token: flow on the arc from the TOP node of the event to the sink (0 or 1)
+    event_to_produced_token: flow on the arc from the source to the BOTTOM node of the event (0 or 1)
+    event_to_passed_token: flow on the arc from the TOP node to the BOTTOM node of the event
+    edge_to_pushed_token: for an edge (event, successor event) of the partial order the flow on the arc from the BOTTOM
+                          node of the event to the TOP node of the successor event; the heuristic only uses the edges to
+                          the successors in the total order
+    """
+
+    def __init__(self):
+        self.event_to_consumed_token: dict = dict()
+        self.event_to_produced_token: dict = dict()
+        self.event_to_passed_token: dict = dict()
+        self.edge_to_pushed_token: dict = dict()
+
+    def get_flow_value(self) -> int:
+        return sum(self.event_to_consumed_token.values())
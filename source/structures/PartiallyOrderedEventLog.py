@@ -1,6 +1,33 @@
+from MasterThesisProject.source.structures.CanonicalFormForRun import get_canonical_form_for_run, are_runs_isomorphic
 from MasterThesisProject.source.structures.Run import Run
 
 
 class PartiallyOrderedEventLog:
-    def __init__(self, run_to_frequency: dict[Run]):
+    def __init__(self, run_to_frequency: dict[Run], run_to_merged_runs: dict[Run, list[Run]] = None):
         self.run_to_frequency = run_to_frequency
+        # only set for merged logs: for every run of the log all runs of the original log isomorphic to it
+        self.run_to_merged_runs = run_to_merged_runs
+
+    def merge_isomorphic_runs(self) -> "PartiallyOrderedEventLog":
+        """
+        Runs with isomorphic partial orders, labelled by the same transitions, have the same precise conformance, so it
+        suffices to replay one of them with the sum of the frequencies. The first run of every isomorphism class is kept.
+        Only the precise results stay the same: the heuristics depend on the total order of the kept run, so their
+        bounds, the numbers of places decided by each method and the place statistics may change.
+        :return: a new log; the original log is not changed
+        """
+        hash_to_runs: dict[str, list[Run]] = dict()
+        run_to_frequency: dict[Run, int] = dict()
+        run_to_merged_runs: dict[Run, list[Run]] = dict()
+        for run, frequency in self.run_to_frequency.items():
+            hash_value: str = get_canonical_form_for_run(run).hash_value
+            candidates: list[Run] = hash_to_runs.setdefault(hash_value, [])
+            represent: Run = next((candidate for candidate in candidates if are_runs_isomorphic(candidate, run)), None)
+            if represent is None:
+                candidates.append(run)
+                run_to_frequency[run] = frequency
+                run_to_merged_runs[run] = [run]
+            else:
+                run_to_frequency[represent] += frequency
+                run_to_merged_runs[represent].append(run)
+        return PartiallyOrderedEventLog(run_to_frequency, run_to_merged_runs)
@@ -50,6 +50,59 @@ class PlaceStatistics:
         self.remaining_token_max += result.remaining_token_max
         self.remaining_token_min += result.remaining_token_min
 
+    def add_place_statistics(self, other: "PlaceStatistics"):
+        """
+        Merges the statistics of the same place calculated on another part of the log.
+        """
+        self.forward_heuristic += other.forward_heuristic
+        self.backward_heuristic += other.backward_heuristic
+        self.maximal_flow += other.maximal_flow
+        self.produced_token += other.produced_token
+        self.consumed_token += other.consumed_token
+        self.missing_token_max += other.missing_token_max
+        self.missing_token_min += other.missing_token_min
+        self.remaining_token_max += other.remaining_token_max
+        self.remaining_token_min += other.remaining_token_min
+
+
+class PlaceStatisticsArrays:
+    """
+    Struct of arrays version of PlaceStatistics for all places of a net: every field is a preallocated list indexed by
+    the place index of the incidence index of the net. The conformance analysis accumulates into these lists and only
+    makes the PlaceStatistics objects in the end.
+    """
+
+    def __init__(self, number_places: int):
+        self.forward_heuristic: list[int] = [0] * number_places
+        self.backward_heuristic: list[int] = [0] * number_places
+        self.maximal_flow: list[int] = [0] * number_places
+        self.produced_token: list[int] = [0] * number_places
+        self.consumed_token: list[int] = [0] * number_places
+        self.missing_token_max: list[int] = [0] * number_places
+        self.missing_token_min: list[int] = [0] * number_places
+        self.remaining_token_max: list[int] = [0] * number_places
+        self.remaining_token_min: list[int] = [0] * number_places
+
+    def add_token_counts(self, place_index: int, produced_token: int, consumed_token: int, missing_token_min: int,
+                         missing_token_max: int, remaining_token_min: int, remaining_token_max: int):
+        self.produced_token[place_index] += produced_token
+        self.consumed_token[place_index] += consumed_token
+        self.missing_token_min[place_index] += missing_token_min
+        self.missing_token_max[place_index] += missing_token_max
+        self.remaining_token_min[place_index] += remaining_token_min
+        self.remaining_token_max[place_index] += remaining_token_max
+
+    def add_single_place_result(self, place_index: int, result: SinglePlaceTokenResult):
+        self.add_token_counts(place_index, result.produced_token, result.consumed_token, result.missing_token_min,
+                              result.missing_token_max, result.remaining_token_min, result.remaining_token_max)
+
+    def make_place_statistics(self, place_index: int) -> PlaceStatistics:
+        return PlaceStatistics(self.forward_heuristic[place_index], self.backward_heuristic[place_index], self.maximal_flow[place_index],
+                               self.produced_token[place_index], self.consumed_token[place_index],
+                               missing_token_max=self.missing_token_max[place_index], missing_token_min=self.missing_token_min[place_index],
+                               remaining_token_min=self.remaining_token_min[place_index],
+                               remaining_token_max=self.remaining_token_max[place_index])
+
 
 class PartiallyOrderedLogConformanceResult:
     def __init__(self, is_precise_result: bool = False, lower_bound_conformance: float = 0, upper_bound_conformance: float = 1,
@@ -5,9 +5,15 @@ from MasterThesisProject.source.structures.WorkflowNet import TransitionWorkflow
 
 
 class Event4Run:
-    def __init__(self, name: str, label: TransitionWorkflowNet):
+    # there are millions of events in our logs, so we do not want a __dict__ for every single one
+    __slots__ = ("name", "label", "activity")
+
+    def __init__(self, name: str, label: TransitionWorkflowNet, activity: str = None):
         self.name = name
         self.label = label
+        # the activity of the event in the log; it differs from the one of the label if the label is the invalid transition.
+        # None if the event is not read from a log
+        self.activity = activity
 
     def __str__(self):
         return "Event name: %s, Label: %s, Activity %s" % (self.name, self.label, self.label.activity_description)
@@ -18,7 +24,11 @@ class Run:
         self.partial_order: nx.DiGraph = partial_order
         self.labels: dict = {event:  event.label for event in list(partial_order)}
         self.total_order: TotalOrder4Run = None
+        # set by get_canonical_form_for_run on first use
+        self.canonical_form = None
         self.name_foreign_source = "UNKNOWN" if name_foreign_source is None else name_foreign_source
+        # true if events were removed from the partial order (see compact_partial_order_of_run)
+        self.has_contracted_events: bool = False
 
     def __str__(self):
         return "Run with " + str(len(self.labels)) + " Events (Foreign name: " + self.name_foreign_source + ")."
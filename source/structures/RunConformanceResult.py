@@ -28,6 +28,18 @@ class RunConformanceResult:
         self.remaining_token_max += result.remaining_token_max
         self.remaining_token_min += result.remaining_token_min
 
+    def add_token_counts(self, produced_token: int, consumed_token: int, missing_token_min: int, missing_token_max: int,
+                         remaining_token_min: int, remaining_token_max: int):
+        """
+        Same as add_single_place_result, but without the need of a result object.
+        """
+        self.produced_token += produced_token
+        self.consumed_token += consumed_token
+        self.missing_token_max += missing_token_max
+        self.missing_token_min += missing_token_min
+        self.remaining_token_max += remaining_token_max
+        self.remaining_token_min += remaining_token_min
+
     def calculate_and_set_conformance_level(self):
         def calculate_conformance_level_for_tokens(produced: int, consumed: int, missing: int, remaining: int) -> float:
             first_term: float = 1 - (missing/consumed)
@@ -1,4 +1,8 @@
 class SinglePlaceTokenResult:
+    # one result is made for every place of every run
+    __slots__ = ("produced_token", "consumed_token", "missing_token_min", "remaining_token_min", "missing_token_max",
+                 "remaining_token_max", "is_precise")
+
     def __init__(self, produced_token: int = 0, consumed_token: int = 0, missing_token_min: int = 0,
                  missing_token_max: int = 0, remaining_token_min: int = 0, remaining_token_max: int = 0,
                  is_precise: bool = True):
@@ -0,0 +1,78 @@
+from collections import OrderedDict
+
+from MasterThesisProject.source.structures.Run import Run
+from MasterThesisProject.source.structures.TotalOrderForRun import TotalOrder4Run
+
+
+class RunVariantRegistry:
+    """
+    Gives every variant of a run an integer id. Two runs are the same variant if they are equal after numbering the
+    events by their position in the total order: same transitions (by name), same edges and same successors and
+    predecessors in the total order. Then all results of the conformance analysis are the same, including the ones of
+    the heuristics, which depend on the total order. The transitions are not compared by activity, since transitions
+    of a net with the same activity may have different presets and postsets.
+    Without labels, only the order structure is compared (see TokenResultCache).
+    Attributes:
+    ----------
+    include_labels: whether the transitions are part of the variant
+    run_key_to_variant_id: id of every variant seen so far
+    """
+
+    def __init__(self, include_labels: bool = True):
+        self.include_labels = include_labels
+        self.run_key_to_variant_id: dict[tuple, int] = dict()
+
+    @staticmethod
+    def make_run_key(run: Run, include_labels: bool = True) -> tuple:
+        order: TotalOrder4Run = run.total_order
+        event_to_position: dict = {event: position for position, event in enumerate(order.order)}
+        event_to_position[None] = -1
+        return (tuple(run.labels[event].name for event in order.order) if include_labels else (),
+                tuple(sorted((event_to_position[source], event_to_position[target]) for source, target in run.partial_order.edges())),
+                tuple(event_to_position[order.event_to_successor_event[event]] for event in order.order),
+                tuple(event_to_position[order.event_to_predecessor_event[event]] for event in order.order))
+
+    def get_variant_id(self, run: Run) -> int:
+        """
+        :param run: the total order has to be set
+        """
+        return self.run_key_to_variant_id.setdefault(RunVariantRegistry.make_run_key(run, self.include_labels), len(self.run_key_to_variant_id))
+
+
+class TokenResultCache:
+    """
+    Least recently used cache for the result of a single place in a run. The result only depends on the order structure
+    of the run and on which of its events produce or consume tokens on the place, thus the key is (variant id without
+    labels, positions in the total order of the events producing on the place, positions of the events consuming from
+    the place, flags of the calculation). Since the key does not contain the transitions, the results are shared
+    between nets. The cached values are not changed by the users.
+    """
+
+    def __init__(self, maximal_size: int = 100000):
+        self.maximal_size = maximal_size
+        self.key_to_value: OrderedDict = OrderedDict()
+        self.run_variant_registry: RunVariantRegistry = RunVariantRegistry(include_labels=False)
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: tuple):
+        """
+        :return: the cached value or None
+        """
+        value = self.key_to_value.get(key)
+        if value is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.key_to_value.move_to_end(key)
+        return value
+
+    def put(self, key: tuple, value):
+        self.key_to_value[key] = value
+        self.key_to_value.move_to_end(key)
+        if len(self.key_to_value) > self.maximal_size:
+            self.key_to_value.popitem(last=False)
+
+    def get_hit_rate(self) -> float:
+        number_requests: int = self.hits + self.misses
+        return self.hits / number_requests if number_requests > 0 else 0.0
@@ -50,6 +50,55 @@ class TransitionWorkflowNet:
             self.add_place_to_preset(place)
 
 
+class IncidenceIndex4WorkflowNet:
+    """
+    Integer indexed view on the flow relation of a workflow net: every place gets an index and every transition knows
+    the indices of the places in its preset and postset. This allows algorithms to keep per place information in arrays
+    instead of dictionaries and to avoid the edge lookups in the networkx graph.
+    """
+
+    def __init__(self, net: "WorkflowNet"):
+        self.places: list[PlaceWorkflowNet] = list(net.places)
+        self.place_to_index: dict[PlaceWorkflowNet, int] = {place: index for index, place in enumerate(self.places)}
+        self.inner_place_indices: list[int] = [self.place_to_index[place] for place in net.inner_places]
+        self.is_inner_place: list[bool] = [False] * len(self.places)
+        for place_index in self.inner_place_indices:
+            self.is_inner_place[place_index] = True
+        self.transition_to_preset_indices: dict[TransitionWorkflowNet, list[int]] = dict()
+        self.transition_to_postset_indices: dict[TransitionWorkflowNet, list[int]] = dict()
+        for transition in net.transitions:
+            self.add_transition(transition)
+
+    def add_transition(self, transition: TransitionWorkflowNet):
+        """
+        Transitions not belonging to the net (e.g. in hand-made runs) are added on demand; only places of the net are indexed.
+        """
+        self.transition_to_preset_indices[transition] = sorted(self.place_to_index[place] for place in transition.preset
+                                                               if place in self.place_to_index)
+        self.transition_to_postset_indices[transition] = sorted(self.place_to_index[place] for place in transition.postset
+                                                                if place in self.place_to_index)
+
+    def get_preset_indices(self, transition: TransitionWorkflowNet) -> list[int]:
+        if transition not in self.transition_to_preset_indices:
+            self.add_transition(transition)
+        return self.transition_to_preset_indices[transition]
+
+    def get_postset_indices(self, transition: TransitionWorkflowNet) -> list[int]:
+        if transition not in self.transition_to_postset_indices:
+            self.add_transition(transition)
+        return self.transition_to_postset_indices[transition]
+
+    def get_touched_inner_place_indices(self, transitions: Iterable[TransitionWorkflowNet]) -> list[int]:
+        """
+        :return: sorted indices of the inner places in the preset or postset of at least one of the transitions
+        """
+        touched_place_indices: set[int] = set()
+        for transition in set(transitions):
+            touched_place_indices.update(self.get_preset_indices(transition))
+            touched_place_indices.update(self.get_postset_indices(transition))
+        return sorted(place_index for place_index in touched_place_indices if self.is_inner_place[place_index])
+
+
 class WorkflowNet:
 
     def __init__(self, graph: DiGraph, start_place: PlaceWorkflowNet, end_place: PlaceWorkflowNet, places: set[PlaceWorkflowNet],
@@ -63,6 +112,15 @@ class WorkflowNet:
         inner_places_aux.remove(end_place)
         self.inner_places: set = inner_places_aux
         self.transitions = transitions
+        self.incidence_index: IncidenceIndex4WorkflowNet = None
+
+    def get_incidence_index(self) -> IncidenceIndex4WorkflowNet:
+        """
+        The index is built on first use and then kept, so the net should not be changed afterward.
+        """
+        if self.incidence_index is None:
+            self.incidence_index = IncidenceIndex4WorkflowNet(self)
+        return self.incidence_index
 
     @staticmethod
     def make_class_instance_from_transitions(transitions: set[TransitionWorkflowNet], start_place: PlaceWorkflowNet,
@@ -0,0 +1,153 @@
+import os
+
+import pandas as pd
+from pandas import DataFrame
+
+from MasterThesisProject.source.structures.PartiallyOrderedLogConformanceResult import PartiallyOrderedLogConformanceResult, PlaceStatistics
+from MasterThesisProject.source.structures.Run import Run
+from MasterThesisProject.source.structures.RunConformanceResult import RunConformanceResult
+
+
+class ColumnarResultSink:
+    """
+    Collects the rows of a result table column by column and builds the DataFrame once, instead of appending every row
+    with DataFrame.loc, which copies the frame for every row. If a file is given, the rows are written to the csv file
+    in chunks instead, so the table never has to be in memory as a whole.
+    The add methods for the results of the conformance analysis take the leading values of the rows (e.g. time, net and
+    log name), which are the same for all added rows, and append the values of the result in the column order of the
+    experiments (see ExperimentPartialOrderConFormanceAnalysis).
+    Attributes:
+    ----------
+    column_names: names of the columns
+    columns: values of the rows not written so far, one list per column
+    file_path: csv file the chunks are written to or None
+    chunk_size: number of rows after which a chunk is written
+    number_written_rows: number of rows written to the file so far
+    """
+
+    def __init__(self, column_names: list[str], file_path: str = None, chunk_size: int = 100000):
+        self.column_names = column_names
+        self.columns: list[list] = [[] for _ in column_names]
+        self.file_path = file_path
+        self.chunk_size = chunk_size
+        self.number_written_rows: int = 0
+        if file_path is not None and os.path.exists(file_path):
+            # the chunks are appended, so we start with an empty file
+            os.remove(file_path)
+
+    def get_number_buffered_rows(self) -> int:
+        return len(self.columns[0]) if self.columns else 0
+
+    def add_row(self, row: list):
+        if len(row) != len(self.column_names):
+            raise Exception("The row has %d values but the sink has %d columns." % (len(row), len(self.column_names)))
+        for column, value in zip(self.columns, row):
+            column.append(value)
+        self.write_chunk_if_full()
+
+    def add_columns(self, leading_values: list, result_columns: list[list]):
+        """
+        Adds one row for every entry of the result columns, each starting with the leading values.
+        :param leading_values: values of the first columns, the same for all rows
+        :param result_columns: values of the remaining columns, one list of the same length per column
+        """
+        if len(leading_values) + len(result_columns) != len(self.column_names):
+            raise Exception("The rows have %d values but the sink has %d columns." % (len(leading_values) + len(result_columns),
+                                                                                      len(self.column_names)))
+        number_rows: int = len(result_columns[0]) if result_columns else 0
+        for column, value in zip(self.columns, leading_values):
+            column.extend([value] * number_rows)
+        for column, values in zip(self.columns[len(leading_values):], result_columns):
+            if len(values) != number_rows:
+                raise Exception("The result columns have different lengths.")
+            column.extend(values)
+        self.write_chunk_if_full()
+
+    @staticmethod
+    def make_log_result_row(leading_values: list, result: PartiallyOrderedLogConformanceResult, number_other_places: int) -> list:
+        """
+        :return: the row of add_log_result, e.g. for results that are collected by other processes before they are added
+        """
+        return leading_values + [result.upper_bound_conformance,
+                                 result.lower_bound_conformance,
+                                 result.number_places_decided_forward_heuristic,
+                                 result.number_places_decided_backward_heuristic,
+                                 number_other_places,
+                                 result.missing_tokens_max,
+                                 result.missing_tokens_min,
+                                 result.consumed_tokens,
+                                 result.remaining_tokens_max,
+                                 result.remaining_tokens_min,
+                                 result.produced_tokens]
+
+    def add_log_result(self, leading_values: list, result: PartiallyOrderedLogConformanceResult, number_other_places: int):
+        """
+        Appends conformance (maximum, minimum), places decided by the heuristics, the other places and the token counts.
+        :param number_other_places: places decided in the flow network or only estimated, depending on the calculation
+        """
+        self.add_row(self.make_log_result_row(leading_values, result, number_other_places))
+
+    def add_place_statistics(self, leading_values: list, place_to_decision_statistic: dict[str, PlaceStatistics], place_names: list[str]):
+        """
+        Appends one row per place: name, number of decisions per method and token counts.
+        """
+        statistics: list[PlaceStatistics] = [place_to_decision_statistic[place_name] for place_name in place_names]
+        self.add_columns(leading_values, [list(place_names),
+                                          [statistic.forward_heuristic for statistic in statistics],
+                                          [statistic.backward_heuristic for statistic in statistics],
+                                          [statistic.maximal_flow for statistic in statistics],
+                                          [statistic.missing_token_max for statistic in statistics],
+                                          [statistic.missing_token_min for statistic in statistics],
+                                          [statistic.consumed_token for statistic in statistics],
+                                          [statistic.remaining_token_max for statistic in statistics],
+                                          [statistic.remaining_token_min for statistic in statistics],
+                                          [statistic.produced_token for statistic in statistics]])
+
+    def add_run_results(self, leading_values: list, run_to_conformance_result: dict[Run, RunConformanceResult], run_to_frequency: dict[Run, int],
+                        run_name_to_invalid_label: dict = None):
+        """
+        Appends one row per run: name, frequency, conformance (maximum, minimum), invalid label and token counts.
+        :param run_name_to_invalid_label: first invalid label of the runs with one; the others get None
+        """
+        runs: list[Run] = list(run_to_conformance_result)
+        results: list[RunConformanceResult] = [run_to_conformance_result[run] for run in runs]
+        if run_name_to_invalid_label is None:
+            run_name_to_invalid_label = dict()
+        self.add_columns(leading_values, [[run.name_foreign_source for run in runs],
+                                          [run_to_frequency[run] for run in runs],
+                                          [result.conformance_level_max for result in results],
+                                          [result.conformance_level_min for result in results],
+                                          [run_name_to_invalid_label.get(run.name_foreign_source) for run in runs],
+                                          [result.missing_token_max for result in results],
+                                          [result.missing_token_min for result in results],
+                                          [result.consumed_token for result in results],
+                                          [result.remaining_token_max for result in results],
+                                          [result.remaining_token_min for result in results],
+                                          [result.produced_token for result in results]])
+
+    def make_data_frame_of_buffered_rows(self) -> DataFrame:
+        return pd.DataFrame(dict(zip(self.column_names, self.columns)), columns=self.column_names)
+
+    def write_chunk_if_full(self):
+        if self.file_path is not None and self.get_number_buffered_rows() >= self.chunk_size:
+            self.write_chunk()
+
+    def write_chunk(self):
+        self.make_data_frame_of_buffered_rows().to_csv(self.file_path, mode="a", header=self.number_written_rows == 0, index=False)
+        self.number_written_rows += self.get_number_buffered_rows()
+        self.columns = [[] for _ in self.column_names]
+
+    def close(self):
+        """
+        Writes the remaining rows; the file has the header even without rows.
+        """
+        if self.file_path is not None and (self.get_number_buffered_rows() > 0 or self.number_written_rows == 0):
+            self.write_chunk()
+
+    def build_data_frame(self) -> DataFrame:
+        """
+        :return: all rows; only possible without file, since the written rows are not kept
+        """
+        if self.file_path is not None:
+            raise Exception("The rows of a sink with file are written in chunks, read the file instead.")
+        return self.make_data_frame_of_buffered_rows()
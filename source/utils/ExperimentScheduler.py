@@ -0,0 +1,162 @@
+import json
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Callable, Iterator
+
+
+class ExperimentTask:
+    """
+    One measurement of an experiment sweep: a single calculation method in a single iteration for a net and a log.
+    Attributes:
+    ----------
+    net_log_pair: the file names of net and log as in the experiment definitions, e.g. {"log": "a.xes", "net": "b.pnml"}
+    method_index: index of the calculation method in the experiment definitions
+    iteration: number of the iteration, starting at 0
+    """
+
+    def __init__(self, net_log_pair: dict[str, str], method_index: int, iteration: int):
+        self.net_log_pair = net_log_pair
+        self.method_index = method_index
+        self.iteration = iteration
+
+    def get_pair_key(self) -> str:
+        return "{}|{}".format(self.net_log_pair["net"], self.net_log_pair["log"])
+
+    def get_key(self) -> str:
+        return "{}|{}|{}".format(self.get_pair_key(), self.method_index, self.iteration)
+
+
+def make_experiment_tasks(net_log_pairs: list[dict[str, str]], number_methods: int, number_iterations: int) -> list[ExperimentTask]:
+    """
+    :return: the tasks pair by pair, so the workers mostly stay with the pair they have already imported
+    """
+    return [ExperimentTask(net_log_pair, method_index, iteration) for net_log_pair in net_log_pairs
+            for iteration in range(number_iterations) for method_index in range(number_methods)]
+
+
+class ExperimentCheckpoint:
+    """
+    Append only file of the completed tasks of a sweep, so an interrupted sweep resumes with the missing tasks. Every
+    line is a json object: the first one holds the parameters of the sweep, then one line per completed task with its
+    result row and one line per pair whose results were written.
+    Attributes:
+    ----------
+    file_path: path of the checkpoint file
+    task_key_to_row: result rows of the completed tasks
+    written_pair_keys: pairs whose results were written
+    """
+
+    def __init__(self, file_path: str, settings: dict, do_resume: bool = True):
+        """
+        :param settings: parameters of the sweep that change the results; a checkpoint with other parameters is not
+                         resumed but raises an exception
+        :param do_resume: if False, an existing checkpoint is discarded
+        """
+        self.file_path = file_path
+        self.task_key_to_row: dict[str, list] = dict()
+        self.written_pair_keys: set[str] = set()
+        if do_resume and os.path.exists(file_path):
+            with open(file_path) as file:
+                lines: list[str] = file.readlines()
+            if lines and json.loads(lines[0]).get("settings") != settings:
+                raise Exception("The checkpoint {} was made with other parameters, delete it to start a new sweep.".format(file_path))
+            for line in lines[1:]:
+                # the last line is incomplete if the sweep was killed while writing it
+                if not line.endswith("\n"):
+                    break
+                entry: dict = json.loads(line)
+                if "task" in entry:
+                    self.task_key_to_row[entry["task"]] = entry["row"]
+                else:
+                    self.written_pair_keys.add(entry["written_pair"])
+            if lines and not lines[-1].endswith("\n"):
+                # we cut the incomplete line, so the next entries start on a new line
+                with open(file_path, "w") as file:
+                    file.writelines(line for line in lines if line.endswith("\n"))
+        if not do_resume or not os.path.exists(file_path):
+            directory: str = os.path.dirname(file_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(file_path, "w") as file:
+                file.write(json.dumps({"settings": settings}) + "\n")
+
+    def append_entry(self, entry: dict):
+        with open(self.file_path, "a") as file:
+            file.write(json.dumps(entry) + "\n")
+            file.flush()
+            os.fsync(file.fileno())
+
+    def add_completed_task(self, task: ExperimentTask, row: list):
+        """
+        :param row: the result of the task, it has to be json serializable
+        """
+        self.append_entry({"task": task.get_key(), "row": row})
+        self.task_key_to_row[task.get_key()] = row
+
+    def add_written_pair(self, pair_key: str):
+        self.append_entry({"written_pair": pair_key})
+        self.written_pair_keys.add(pair_key)
+
+    def is_completed(self, task: ExperimentTask) -> bool:
+        return task.get_key() in self.task_key_to_row
+
+
+def pin_worker_to_core(worker_counter, initializer: Callable = None, initargs: tuple = ()):
+    """
+    Initializer of the worker processes: the n-th started worker only runs on the n-th core we may use, so a worker
+    is not moved between cores and two workers do not share a core while a time is measured (if there are at most as
+    many workers as cores). Where the affinity can not be set, the workers are not pinned.
+    :param worker_counter: shared multiprocessing.Value counting the started workers
+    """
+    if hasattr(os, "sched_setaffinity"):
+        with worker_counter.get_lock():
+            worker_index: int = worker_counter.value
+            worker_counter.value += 1
+        cores: list[int] = sorted(os.sched_getaffinity(0))
+        os.sched_setaffinity(0, {cores[worker_index % len(cores)]})
+    if initializer is not None:
+        initializer(*initargs)
+
+
+def get_number_available_cores() -> int:
+    return len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else os.cpu_count()
+
+
+def run_experiment_tasks(tasks: list[ExperimentTask], execute_task: Callable[[ExperimentTask], list], checkpoint: ExperimentCheckpoint,
+                         number_workers: int = 1, initializer: Callable = None, initargs: tuple = ()) -> Iterator[tuple[ExperimentTask, list]]:
+    """
+    Executes the tasks that are not completed in the checkpoint and records every result in the checkpoint as soon as
+    it is there. With more than one worker, the tasks run on a process pool with one worker per core (see
+    pin_worker_to_core); a worker executes one task at a time, so the measured times are not shared with other tasks.
+    :param execute_task: module level function, so the workers can unpickle it; it returns the result row of the task
+    :param initializer: called once in every worker (and once in this process without workers), e.g. to set the
+                        parameters of the experiment
+    :return: iterator over the completed tasks with their rows in the order of completion, without the tasks that
+             were already completed in the checkpoint
+    """
+    missing_tasks: list[ExperimentTask] = [task for task in tasks if not checkpoint.is_completed(task)]
+    if number_workers <= 1 or len(missing_tasks) <= 1:
+        if initializer is not None:
+            initializer(*initargs)
+        for task in missing_tasks:
+            row: list = execute_task(task)
+            checkpoint.add_completed_task(task, row)
+            yield task, row
+        return
+    if number_workers > get_number_available_cores():
+        raise Exception("More workers than cores would share cores and distort the measured times.")
+    worker_counter = multiprocessing.Value("i", 0)
+    with ProcessPoolExecutor(max_workers=number_workers, initializer=pin_worker_to_core,
+                             initargs=(worker_counter, initializer, initargs)) as executor:
+        future_to_task: dict = {executor.submit(execute_task, task): task for task in missing_tasks}
+        try:
+            for future in as_completed(future_to_task):
+                task: ExperimentTask = future_to_task[future]
+                row: list = future.result()
+                checkpoint.add_completed_task(task, row)
+                yield task, row
+        except BaseException:
+            # on an error or an interrupt we do not wait for the pending tasks, the checkpoint has the completed ones
+            executor.shutdown(wait=False, cancel_futures=True)
+            raise
@@ -1,15 +1,19 @@
-from typing import Dict, Tuple, List
+from typing import Dict, Tuple, List, Iterator
 
-import pandas as pd
-import pm4py
 from networkx import DiGraph
-from pandas import DataFrame
-from pm4py.objects.conversion.log import converter as log_converter
 
+from MasterThesisProject.source.algorithms.CompactPartialOrderForRun import compact_partial_order_of_run
 from MasterThesisProject.source.structures.PartiallyOrderedEventLog import PartiallyOrderedEventLog
 from MasterThesisProject.source.structures.Run import Event4Run, Run
 from MasterThesisProject.source.structures.TotalOrderForRun import TotalOrder4Run
 from MasterThesisProject.source.structures.WorkflowNet import TransitionWorkflowNet
+from MasterThesisProject.source.utils.StreamingXesReader import iterate_traces_of_xes_file, XesTrace
+
+# Only these attributes are read from the xes files, all others are skipped while streaming
+PO_EVENT_KEYS: set[str] = {"identity:id", "concept:name", "po_successors"}
+PO_TRACE_KEYS: set[str] = {"po_name", "multiplicity"}
+TO_EVENT_KEYS: set[str] = {"concept:name", "time:timestamp"}
+TO_TRACE_KEYS: set[str] = {"concept:name"}
 
 
 def get_actual_successors_for_buggy_field(file_path: str, id: int) \
@@ -37,42 +41,69 @@ def get_actual_successors_for_buggy_field(file_path: str, id: int) \
     return return_list
 
 
-def import_cco_xes_file_to_event_log(file_path: str, name_to_transition: dict[str, TransitionWorkflowNet], include_runs_with_invalid_transitions=True) \
+def import_cco_xes_file_to_event_log(file_path: str, name_to_transition: dict[str, TransitionWorkflowNet], include_runs_with_invalid_transitions=True,
+                                     compact_partial_orders=False) \
         -> Tuple[PartiallyOrderedEventLog, Dict[str, str]]:
     """
 
     :param include_runs_with_invalid_transitions: if true all runs with invalid labels will be present in the result log, the invalid
                                                 labels are then replaced by the standard invalid transition; if false they will not be included
+    :param compact_partial_orders: if true the partial orders are replaced by their transitive reduction after contracting
+                                   the events that touch no place (see compact_partial_order_of_run)
     :param file_path:
     :param name_to_transition:
     :return: the event log in the internal format and a dictionary of runs together with the first found invalid event label.
+             The runs are sorted by their case id (po_name); the events of all traces with the same case id form one run,
+             whose frequency is the multiplicity of the first of these traces.
     """
-    log_external_format = pm4py.read_xes(file_path)
-    df_log: pd.DataFrame = log_converter.apply(log_external_format, variant=log_converter.Variants.TO_DATA_FRAME)
-
     run_to_frequency: Dict[Run, int] = {}
     invalid_run_to_false_label: Dict[str, str] = {}
 
-    for case_id, df_part in df_log.groupby("case:po_name"):
+    # the file is streamed, but we only keep the attributes we need; traces with the same case id belong to one case
+    case_id_to_events, case_id_to_multiplicity = group_traces_by_case_id(
+        iterate_traces_of_xes_file(file_path, PO_EVENT_KEYS, PO_TRACE_KEYS), "po_name", "multiplicity")
+    for case_id in sorted(case_id_to_events):
         run, event_ids_with_po_successors_none, invalid_label = \
-            process_case(case_id, df_part, name_to_transition, include_runs_with_invalid_transitions, file_path)
+            process_case(case_id, case_id_to_events.pop(case_id), name_to_transition, include_runs_with_invalid_transitions, file_path)
         if event_ids_with_po_successors_none:
             errorous_ids_string: str = ",".join(str(x) for x in event_ids_with_po_successors_none)
             error_message: str = ("PO_successors none found in file " + file_path + " in run " + str(case_id) +
                                   "at event ids " + errorous_ids_string + ".\n")
             with open("WrongPOXesReadingLog.txt", "a") as log_file:
                 log_file.write(error_message)
+        if run and compact_partial_orders:
+            run = compact_partial_order_of_run(run)
         if run:
-            run_to_frequency[run] = int(df_part["case:multiplicity"].iloc[0])
+            run_to_frequency[run] = int(case_id_to_multiplicity[case_id])
         if invalid_label:
             invalid_run_to_false_label[case_id] = invalid_label
 
     return PartiallyOrderedEventLog(run_to_frequency), invalid_run_to_false_label
 
 
+def group_traces_by_case_id(traces: Iterator[XesTrace], case_id_key: str, first_value_key: str = None) -> Tuple[dict, dict]:
+    """
+    :param traces: see iterate_traces_of_xes_file
+    :param case_id_key: the trace attribute with the case id
+    :param first_value_key: optional trace attribute, whose value of the first trace of every case is returned
+    :return: the events of every case in the order of the file and the value of first_value_key for every case
+    """
+    case_id_to_events: dict = dict()
+    case_id_to_first_value: dict = dict()
+    for trace in traces:
+        case_id = trace.attributes[case_id_key]
+        if case_id in case_id_to_events:
+            case_id_to_events[case_id].extend(trace.events)
+        else:
+            case_id_to_events[case_id] = trace.events
+            if first_value_key is not None:
+                case_id_to_first_value[case_id] = trace.attributes[first_value_key]
+    return case_id_to_events, case_id_to_first_value
+
+
 def process_case(
         case_id: str,
-        df_part: pd.DataFrame,
+        events: List[dict],
         name_to_transition: Dict[str, TransitionWorkflowNet],
         include_invalid: bool,
         file_path: str
@@ -81,7 +112,7 @@ def process_case(
     Processes a single case and constructs a run.
 
     :param case_id: Case ID.
-    :param df_part: DataFrame containing the events for this case.
+    :param events: the attributes of the events of this case as read from the xes file.
     :param name_to_transition: Mapping of transition names.
     :param include_invalid: Whether to include invalid transitions.
     :param file_path: only needed to take care of buggy situation
@@ -92,24 +123,24 @@ def process_case(
     invalid_label = None
 
     # Process events and detect invalid transitions
-    for _, row in df_part.iterrows():
+    for row in events:
         transition_name = row["concept:name"]
         if transition_name not in name_to_transition:
             invalid_label = transition_name
             if not include_invalid:
-                return None, invalid_label
+                return None, [], invalid_label
             transition_name = "INVALID"
 
-        event = Event4Run(f"Event ID {row['identity:id']} from PO {case_id}", name_to_transition[transition_name])
+        event = Event4Run(f"Event ID {row['identity:id']} from PO {case_id}", name_to_transition[transition_name], row["concept:name"])
         event_id_to_event[row["identity:id"]] = event
         event_list.append(event)
 
     # Build the event graph
-    run, event_ids_with_po_succesors_none = construct_run_from_event_list(df_part, event_id_to_event, case_id, name_to_transition, file_path)
+    run, event_ids_with_po_succesors_none = construct_run_from_event_list(events, event_id_to_event, case_id, name_to_transition, file_path)
     return run, event_ids_with_po_succesors_none, invalid_label
 
 
-def construct_run_from_event_list(df_part: DataFrame,
+def construct_run_from_event_list(events: List[dict],
                                   event_id_to_event: Dict[int, Event4Run],
                                   key_partial_order,
                                   name_to_transition,
@@ -122,11 +153,11 @@ def construct_run_from_event_list(df_part: DataFrame,
     event_ids_with_none_po_succesors = []
     for event in event_list:
         event_to_number_predecessors[event] = 0
-    for index, row in df_part.iterrows():
+    for row in events:
         current_event: Event4Run = event_id_to_event[row["identity:id"]]
-        # due to the ugly format of the po_successors attribute we have to do a bit of work
-        successors_from_data = row["po_successors"]
-        succesors_id_list: list = [] if successors_from_data is None else successors_from_data["children"]
+        # the po_successors attribute is a list of (index, successor id) pairs
+        successors_from_data = row.get("po_successors")
+        succesors_id_list: list = [] if successors_from_data is None else successors_from_data
         if successors_from_data is None:
             event_ids_with_none_po_succesors.append(row["identity:id"])
             succesors_id_list = get_actual_successors_for_buggy_field(file_path, row["identity:id"])
@@ -158,25 +189,28 @@ def import_xes_file_totally_ordered_log(file_path: str, name_to_transition: dict
     :return: The totally ordered event log, which is returned as partially ordered log to be compatible with the existing
              conformance analysis code. All runs in the result will get the unique total order.
              Additionally, we return a dictionary with all invalid trace names together with the first invalid transition label.
+             The traces are grouped by their concept:name and sorted by it, so the first trace of every variant in this order
+             represents the variant. The events of a trace are sorted by their timestamps; events without timestamp come
+             last in the order of the file.
     """
     if "START" not in name_to_transition or "END" not in name_to_transition:
         raise ValueError("Missing required transitions: 'START' and 'END' must be present in name_to_transition.")
-    log_external_format = pm4py.read_xes(file_path)
-    df: DataFrame = log_converter.apply(log_external_format, variant=log_converter.Variants.TO_DATA_FRAME)
     trace_to_frequency: dict[Run, int] = dict()
     # The traces are not yet grouped, so we have to do this; following dict helps us for this
     trace_class_to_represent: dict[tuple, Run] = dict()
     invalid_trace_to_false_label: dict[str, str] = dict()
-    for trace_id, df_part in df.groupby("case:concept:name"):
-        # Just to be sure we sort the part
-        df_part = df_part.sort_values(by="time:timestamp", kind="stable")
+    trace_id_to_events, _ = group_traces_by_case_id(iterate_traces_of_xes_file(file_path, TO_EVENT_KEYS, TO_TRACE_KEYS), "concept:name")
+    for trace_id in sorted(trace_id_to_events):
+        # Just to be sure we sort the events (sorted is stable)
+        events: list[dict] = sorted(trace_id_to_events.pop(trace_id),
+                                    key=lambda event: ("time:timestamp" not in event, event.get("time:timestamp", 0)))
         event_list: list[Event4Run] = list()
         # First, prepare the events; if any event has an invalid transition, we skip
         has_trace_invalid_event_label: bool = False
         start_transition: TransitionWorkflowNet = name_to_transition["START"]
         start_event: Event4Run = Event4Run(f"Start event of PO {trace_id}", start_transition)
         event_list.append(start_event)
-        for transition_name in df_part["concept:name"]:
+        for transition_name in (event["concept:name"] for event in events):
             # In the log the label of a transition in the name is used as name. Have to translate this to original
             transition_name_to_use = transition_name
             if transition_name not in name_to_transition:
@@ -187,7 +221,8 @@ def import_xes_file_totally_ordered_log(file_path: str, name_to_transition: dict
                 else:
                     transition_name_to_use = "INVALID"
             transition = name_to_transition[transition_name_to_use]
-            event: Event4Run = Event4Run(f"Event (Label: {transition.activity_description}) from Trace {str(trace_id)}", transition)
+            event: Event4Run = Event4Run(f"Event (Label: {transition.activity_description}) from Trace {str(trace_id)}", transition,
+                                         transition_name)
             event_list.append(event)
         if has_trace_invalid_event_label and not include_traces_with_invalid_transitions:
             continue
@@ -199,8 +234,10 @@ def import_xes_file_totally_ordered_log(file_path: str, name_to_transition: dict
         graph_for_po.add_edges_from(edges_linear_graph)
         run: Run = Run(graph_for_po)
         run.name_foreign_source = str(trace_id)
-        # To be able to identify equivalent events we have to sort them now in our hashmap
-        string_hash_value_for_run = tuple(event.label.activity_description for event in event_list)
+        # To be able to identify equivalent events we have to sort them now in our hashmap; we use the activities of the log,
+        # so traces with different invalid activities stay apart and can be analyzed for other nets (see make_run_view_for_net)
+        string_hash_value_for_run = tuple(event.label.activity_description if event.activity is None else event.activity
+                                          for event in event_list)
         if string_hash_value_for_run in trace_class_to_represent:
             trace_to_frequency[trace_class_to_represent[string_hash_value_for_run]] += 1
         else:
@@ -0,0 +1,120 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from typing import Tuple
+
+from MasterThesisProject.source.algorithms.FindTotalOrderForPartialOrder import find_total_order_for_run
+from MasterThesisProject.source.structures.CompactRepresentations import CompactWorkflowNet
+from MasterThesisProject.source.structures.FlatEventLog import FlatEventLog
+from MasterThesisProject.source.structures.PartiallyOrderedEventLog import PartiallyOrderedEventLog
+from MasterThesisProject.source.structures.Run import Run
+from MasterThesisProject.source.structures.WorkflowNet import WorkflowNet, TransitionWorkflowNet
+from MasterThesisProject.source.utils.ImportCCOxesFileToEventLog import import_cco_xes_file_to_event_log, import_xes_file_totally_ordered_log
+from MasterThesisProject.source.utils.ImporterPnmlFileToInternalWorkflowNet import import_pnml_file_to_workflow_net
+
+# Increase whenever the importers or the cached format change, so old cache entries are not used anymore
+CACHE_FORMAT_VERSION: int = 3
+
+
+def calculate_file_hash(file_path: str) -> str:
+    file_hash = hashlib.sha256()
+    with open(file_path, "rb") as file:
+        for chunk in iter(lambda: file.read(1 << 20), b""):
+            file_hash.update(chunk)
+    return file_hash.hexdigest()
+
+
+def calculate_cache_key(net_file_path: str, log_file_path: str, is_partially_ordered_log: bool,
+                        include_runs_with_invalid_transitions: bool, compact_partial_orders: bool = False) -> str:
+    """
+    The key only depends on the content of the files and on the importer flags, not on the paths.
+    """
+    key_parts: list[str] = [str(CACHE_FORMAT_VERSION), calculate_file_hash(net_file_path), calculate_file_hash(log_file_path),
+                            str(is_partially_ordered_log), str(include_runs_with_invalid_transitions), str(compact_partial_orders)]
+    return hashlib.sha256("|".join(key_parts).encode()).hexdigest()
+
+
+def write_cache_entry(directory: str, net: WorkflowNet, label_to_transition: dict[str, TransitionWorkflowNet],
+                      event_log: PartiallyOrderedEventLog, invalid_run_to_false_label: dict):
+    compact_net, transition_to_index = CompactWorkflowNet.make_class_instance_from_workflow_net(net, list(event_log.run_to_frequency))
+    flat_log: FlatEventLog = FlatEventLog.make_class_instance_from_event_log(event_log, transition_to_index)
+    # we write into a temporary directory first, so an interrupted run never leaves a broken cache entry
+    parent_directory: str = os.path.dirname(os.path.abspath(directory))
+    os.makedirs(parent_directory, exist_ok=True)
+    temporary_directory: str = tempfile.mkdtemp(dir=parent_directory)
+    flat_log.save(temporary_directory)
+    # the flat log only keeps the labels, so we keep the activities of the invalid events separately (by run and event index)
+    invalid_event_activities: list[tuple[int, int, str]] = []
+    invalid_transition: TransitionWorkflowNet = label_to_transition.get("INVALID")
+    for run_index, run in enumerate(event_log.run_to_frequency):
+        invalid_event_activities.extend((run_index, event_index, event.activity) for event_index, event in enumerate(run.partial_order)
+                                        if event.label is invalid_transition and event.activity is not None)
+    with open(os.path.join(temporary_directory, "net.json"), "w") as file:
+        json.dump({"compact_net": vars(compact_net),
+                   "label_to_transition_index": {label: transition_to_index[transition] for label, transition in label_to_transition.items()},
+                   # as list of pairs, since the keys are not always strings (e.g. the po_name)
+                   "invalid_run_to_false_label": list(invalid_run_to_false_label.items()),
+                   "invalid_event_activities": invalid_event_activities,
+                   "runs_with_contracted_events": [run_index for run_index, run in enumerate(event_log.run_to_frequency)
+                                                   if run.has_contracted_events]}, file)
+    try:
+        os.rename(temporary_directory, directory)
+    except OSError:
+        # another process was faster in writing the same entry
+        shutil.rmtree(temporary_directory, ignore_errors=True)
+
+
+def read_cache_entry(directory: str) \
+        -> Tuple[WorkflowNet, dict[str, TransitionWorkflowNet], PartiallyOrderedEventLog, dict]:
+    with open(os.path.join(directory, "net.json")) as file:
+        net_information: dict = json.load(file)
+    net, transitions = CompactWorkflowNet(**net_information["compact_net"]).make_workflow_net()
+    label_to_transition: dict[str, TransitionWorkflowNet] = {label: transitions[index] for label, index
+                                                             in net_information["label_to_transition_index"].items()}
+    event_log: PartiallyOrderedEventLog = FlatEventLog.load(directory).make_event_log(transitions)
+    invalid_run_to_false_label: dict = {run_name: label for run_name, label in net_information["invalid_run_to_false_label"]}
+    runs: list[Run] = list(event_log.run_to_frequency)
+    run_index_to_events: dict[int, list] = dict()
+    for run_index, event_index, activity in net_information["invalid_event_activities"]:
+        if run_index not in run_index_to_events:
+            run_index_to_events[run_index] = list(runs[run_index].partial_order)
+        run_index_to_events[run_index][event_index].activity = activity
+    for run_index in net_information["runs_with_contracted_events"]:
+        runs[run_index].has_contracted_events = True
+    return net, label_to_transition, event_log, invalid_run_to_false_label
+
+
+def import_net_and_log_with_cache(net_file_path: str, log_file_path: str, is_partially_ordered_log: bool,
+                                  include_runs_with_invalid_transitions=True, cache_directory: str = "data/cache/",
+                                  compact_partial_orders=False) \
+        -> Tuple[WorkflowNet, dict[str, TransitionWorkflowNet], PartiallyOrderedEventLog, dict]:
+    """
+    Same as importing the net with import_pnml_file_to_workflow_net and the log with import_cco_xes_file_to_event_log
+    (or import_xes_file_totally_ordered_log for totally ordered logs), but the imported net and log are saved in the
+    cache directory (see FlatEventLog) and on the next call with the same files and flags they are read from there.
+    The total orders of all runs are set and saved as well, so they are the same for all calls. The names of the events
+    are not saved, their activities only for the invalid events.
+    :param net_file_path:
+    :param log_file_path:
+    :param is_partially_ordered_log:
+    :param include_runs_with_invalid_transitions: flag of the log importer
+    :param cache_directory:
+    :param compact_partial_orders: flag of the importer for partially ordered logs
+    :return: the net, the mapping from the labels to the transitions, the log and the invalid runs with their first invalid label
+    """
+    entry_directory: str = os.path.join(cache_directory, calculate_cache_key(net_file_path, log_file_path, is_partially_ordered_log,
+                                                                             include_runs_with_invalid_transitions, compact_partial_orders))
+    if os.path.isdir(entry_directory):
+        return read_cache_entry(entry_directory)
+    net, label_to_transition = import_pnml_file_to_workflow_net(net_file_path)
+    event_log, invalid_run_to_false_label = import_cco_xes_file_to_event_log(log_file_path, label_to_transition,
+                                                                             include_runs_with_invalid_transitions, compact_partial_orders) \
+        if is_partially_ordered_log else import_xes_file_totally_ordered_log(log_file_path, label_to_transition,
+                                                                             include_runs_with_invalid_transitions)
+    for run in event_log.run_to_frequency:
+        if run.total_order is None:
+            run.total_order = find_total_order_for_run(run)
+    write_cache_entry(entry_directory, net, label_to_transition, event_log, invalid_run_to_false_label)
+    return net, label_to_transition, event_log, invalid_run_to_false_label
@@ -1,10 +1,155 @@
-from pm4py import PetriNet, Marking
-from pm4py.objects.petri_net.importer import importer as pnml_importer
+import xml.etree.ElementTree as ElementTree
 
 from MasterThesisProject.source.structures.WorkflowNet import TransitionWorkflowNet, WorkflowNet, PlaceWorkflowNet
+from MasterThesisProject.source.utils.StreamingXesReader import get_local_tag
+
+
+def add_transition_label(label_to_transition: dict[str, TransitionWorkflowNet], transition: TransitionWorkflowNet, label: str,
+                         name_tag: str):
+    """
+    The label is the human readable description of the transition. Invisible transitions (label None) are only allowed
+    as the artificial start and end transition, which we recognize by their name in the file.
+    :param name_tag: the name of the transition in the file (trans_name_tag of pm4py)
+    """
+    if label is None:
+        # The transition has to be the START or END Transition
+        if name_tag == "ArtificialStart":
+            label_to_transition["START"] = transition
+            label_to_transition["START"].activity_description = "START"
+        elif name_tag == "ArtificialEnd":
+            label_to_transition["END"] = transition
+            label_to_transition["END"].activity_description = "END"
+        else:
+            raise Exception("Transition without label was found that is not start or end!")
+    else:
+        label_to_transition[label] = transition
+
+
+def make_workflow_net_with_invalid_transition(name_to_transition: dict[str, TransitionWorkflowNet], label_to_transition: dict[str, TransitionWorkflowNet],
+                                              initial_place: PlaceWorkflowNet, final_place: PlaceWorkflowNet) -> WorkflowNet:
+    # We add an invalid transitions which can be used for logs with invalid transitions name
+    invalid_transition: TransitionWorkflowNet = TransitionWorkflowNet("INVALID TRANSITION")
+    label_to_transition["INVALID"] = invalid_transition
+    name_to_transition["INVALID TRANSITION"] = invalid_transition
+    # It remains to use the static constructor of our Workflow net format
+    return WorkflowNet.make_class_instance_from_transitions(set(name_to_transition.values()), initial_place, final_place)
+
+
+def get_marking_of_place(place_element: ElementTree.Element) -> int:
+    for child in place_element:
+        if get_local_tag(child) == "initialMarking":
+            for text_element in child:
+                if get_local_tag(text_element) == "text":
+                    return int(text_element.text)
+    return 0
+
+
+def get_name_of_transition(transition_element: ElementTree.Element) -> (str, bool):
+    """
+    :return: the name of the transition in the file (its id if there is none) and whether it is visible, that is, it is
+             not marked as invisible by ProM or in a stochastic net
+    """
+    name: str = transition_element.get("id")
+    is_visible: bool = True
+    for child in transition_element:
+        tag: str = get_local_tag(child)
+        if tag == "name":
+            for text_element in child:
+                if text_element.text and name == transition_element.get("id"):
+                    name = text_element.text
+        elif tag == "toolspecific":
+            tool: str = child.get("tool") or ""
+            if "ProM" in tool and "invisible" in (child.get("activity") or ""):
+                is_visible = False
+            elif "StochasticPetriNet" in tool:
+                for property_element in child:
+                    if property_element.get("key") == "invisible" and (property_element.text or "").lower() == "true":
+                        is_visible = False
+    return name, is_visible
+
+
+def find_final_place_name(final_markings_element: ElementTree.Element, place_names: list[str], arcs: list[tuple[str, str]]) -> str:
+    """
+    The final place is the first marked place of the final marking in the file. Without a final marking, we take the
+    first place without outgoing arcs, like pm4py guesses the final marking.
+    """
+    if final_markings_element is not None:
+        for marking_element in final_markings_element:
+            for place_element in marking_element:
+                for text_element in place_element:
+                    if get_local_tag(text_element) == "text" and int(text_element.text) > 0:
+                        return place_element.get("idref")
+    places_with_outgoing_arcs: set[str] = {source for source, _ in arcs}
+    for place_name in place_names:
+        if place_name not in places_with_outgoing_arcs:
+            return place_name
+    raise Exception("The net has no final place.")
 
 
 def import_pnml_file_to_workflow_net(file_path: str) -> (WorkflowNet, dict[str, TransitionWorkflowNet]):
+    """
+    Reads the net directly from the pnml file with the same semantics as the pm4py importer (see
+    import_pnml_file_to_workflow_net_with_pm4py): the names of places and transitions are their ids in the file, the
+    label of a visible transition is its name and the arc weights are ignored. Like pm4py, we only read the last page
+    of the last net in the file.
+    :return: the net and the label to transition map with the additional labels START, END and INVALID
+    """
+    net_element: ElementTree.Element = None
+    for net_element in ElementTree.parse(file_path).getroot():
+        pass
+    if net_element is None:
+        raise Exception("The file contains no net.")
+    page_element: ElementTree.Element = None
+    final_markings_element: ElementTree.Element = None
+    for child in net_element:
+        tag: str = get_local_tag(child)
+        if tag == "page":
+            page_element = child
+        elif tag == "finalmarkings":
+            final_markings_element = child
+    if page_element is None:
+        page_element = net_element
+    name_to_place: dict[str, PlaceWorkflowNet] = dict()
+    name_to_transition: dict[str, TransitionWorkflowNet] = dict()
+    label_to_transition: dict[str, TransitionWorkflowNet] = dict()
+    initial_place_name: str = None
+    arcs: list[tuple[str, str]] = []
+    for child in page_element:
+        tag: str = get_local_tag(child)
+        if tag == "place":
+            place_name: str = child.get("id")
+            name_to_place[place_name] = PlaceWorkflowNet(place_name)
+            if initial_place_name is None and get_marking_of_place(child) > 0:
+                initial_place_name = place_name
+        elif tag == "transition":
+            transition_name: str = child.get("id")
+            name_tag, is_visible = get_name_of_transition(child)
+            label: str = name_tag if is_visible else None
+            name_to_transition[transition_name] = TransitionWorkflowNet(transition_name, label)
+            add_transition_label(label_to_transition, name_to_transition[transition_name], label, name_tag)
+        elif tag == "arc":
+            arcs.append((child.get("source"), child.get("target")))
+    if initial_place_name is None:
+        raise Exception("The net has no initially marked place.")
+    # prepare info in transitions, so we can build WorkflowNet from that; arcs between unknown nodes are ignored
+    for source, target in arcs:
+        if source in name_to_transition and target in name_to_place:
+            name_to_transition[source].add_place_to_postset(name_to_place[target])
+        elif target in name_to_transition and source in name_to_place:
+            name_to_transition[target].add_place_to_preset(name_to_place[source])
+    final_place_name: str = find_final_place_name(final_markings_element, list(name_to_place), arcs)
+    result_net: WorkflowNet = make_workflow_net_with_invalid_transition(name_to_transition, label_to_transition, name_to_place[initial_place_name],
+                                                                        name_to_place[final_place_name])
+    return result_net, label_to_transition
+
+
+def import_pnml_file_to_workflow_net_with_pm4py(file_path: str) -> (WorkflowNet, dict[str, TransitionWorkflowNet]):
+    """
+    The former import over the pm4py Petri net, we keep it to compare the results and the speed of the direct import.
+    """
+    # pm4py takes seconds to import, so only the processes that use this import pay for it
+    from pm4py import PetriNet, Marking
+    from pm4py.objects.petri_net.importer import importer as pnml_importer
     net: PetriNet
     initial_marking: Marking
     final_marking: Marking
@@ -15,7 +160,6 @@ def import_pnml_file_to_workflow_net(file_path: str) -> (WorkflowNet, dict[str,
     # prepare my format for transitions and places
     name_to_place: dict[str, PlaceWorkflowNet] = dict()
     name_to_transition: dict[str, TransitionWorkflowNet] = dict()
-    # The label is the human readable description of the transition
     label_to_transition: dict[str, TransitionWorkflowNet] = dict()
     for place in net.places:
         name_to_place[place.name] = PlaceWorkflowNet(place.name)
@@ -23,18 +167,7 @@ def import_pnml_file_to_workflow_net(file_path: str) -> (WorkflowNet, dict[str,
         transition_name = transition.name
         label: str = transition.label
         name_to_transition[transition_name] = TransitionWorkflowNet(transition_name, label)
-        if label is None:
-            # The transition has to be the START or END Transition
-            if transition.properties["trans_name_tag"] == "ArtificialStart":
-                label_to_transition["START"] = name_to_transition[transition_name]
-                label_to_transition["START"].activity_description = "START"
-            elif transition.properties["trans_name_tag"] == "ArtificialEnd":
-                label_to_transition["END"] = name_to_transition[transition_name]
-                label_to_transition["END"].activity_description = "END"
-            else:
-                raise Exception("Transition without label was found that is not start or end!")
-        else:
-            label_to_transition[label] = name_to_transition[transition_name]
+        add_transition_label(label_to_transition, name_to_transition[transition_name], label, transition.properties["trans_name_tag"])
     # prepare info in transitions, so we can build WorkflowNet from that
     for arc in net.arcs:
         if isinstance(arc.source, PetriNet.Transition):
@@ -49,12 +182,6 @@ def import_pnml_file_to_workflow_net(file_path: str) -> (WorkflowNet, dict[str,
             transition.add_place_to_preset(name_to_place[name_place])
         else:
             raise Exception("The format of the arc does not fit to a Petri net.")
-    # We add an invalid transitions which can be used for logs with invalid transitions name
-    invalid_transition: TransitionWorkflowNet = TransitionWorkflowNet("INVALID TRANSITION")
-    label_to_transition["INVALID"] = invalid_transition
-    name_to_transition["INVALID TRANSITION"] = invalid_transition
-    # It remains to use the static constructor of our Workflow net format
-    result_net: WorkflowNet = WorkflowNet.make_class_instance_from_transitions(set(name_to_transition.values()), name_to_place[initial_place_name],
-                                                                               name_to_place[final_place_name])
-
+    result_net: WorkflowNet = make_workflow_net_with_invalid_transition(name_to_transition, label_to_transition, name_to_place[initial_place_name],
+                                                                        name_to_place[final_place_name])
     return result_net, label_to_transition
@@ -0,0 +1,64 @@
+import os
+
+import pandas as pd
+from pandas import DataFrame
+
+# pyarrow is an optional dependency, it is only needed for the parquet datasets
+try:
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+    import pyarrow.parquet as pq
+except ImportError as error:
+    raise ImportError("The parquet result datasets need the optional dependency pyarrow (pip install pyarrow).") from error
+
+# The general results are partitioned by all three, the place and run statistics only by net and log
+PARTITION_COLUMNS_GENERAL_RESULTS: list[str] = ["Net name", "Log name", "Calculation method"]
+PARTITION_COLUMNS_STATISTICS: list[str] = ["Net name", "Log Name"]
+
+
+def make_typed_table(results: DataFrame) -> pa.Table:
+    """
+    The columns of the result tables are built from lists of python objects, so we let pandas find the best nullable
+    type for every column (e.g. integer for the token counts, even if some are missing, and string for the names).
+    """
+    return pa.Table.from_pandas(results.convert_dtypes(), preserve_index=False)
+
+
+def write_results_to_dataset(results: DataFrame, directory: str, partition_columns: list[str]):
+    """
+    Adds the results to the partitioned parquet dataset in the directory (one subdirectory per value of the partition
+    columns, e.g. "Net name=repair_net"). Every call writes new files, so the results of earlier calls stay.
+    """
+    os.makedirs(directory, exist_ok=True)
+    pq.write_to_dataset(make_typed_table(results), root_path=directory, partition_cols=partition_columns)
+
+
+def scan_results_dataset(directory: str) -> ds.Dataset:
+    """
+    :return: the dataset without reading the files; the filters of the queries only read the matching partitions
+    """
+    return ds.dataset(directory, format="parquet", partitioning="hive")
+
+
+def read_results_for_pair(directory: str, net_name: str, log_name: str, log_column: str = "Log name", columns: list[str] = None) -> DataFrame:
+    """
+    Reads the results of a single net and log, e.g. for the analysis notebooks.
+    :param log_column: "Log name" for the general results and "Log Name" for the statistics
+    :param columns: only these columns are read; None means all
+    """
+    dataset: ds.Dataset = scan_results_dataset(directory)
+    return dataset.to_table(columns=columns, filter=(ds.field("Net name") == net_name) & (ds.field(log_column) == log_name)).to_pandas()
+
+
+def write_master_file_from_dataset(directory: str, file_path: str, column_names: list[str]):
+    """
+    Writes all results of the dataset into one csv file, batch by batch, so the dataset is never in memory as a whole.
+    :param column_names: the columns of the results as written (see ColumnarResultSink); the scan puts the partition
+                         columns at the end, so we restore this order
+    """
+    number_written_rows: int = 0
+    for batch in scan_results_dataset(directory).to_batches():
+        batch_results: DataFrame = batch.to_pandas()[column_names]
+        batch_results.index = pd.RangeIndex(number_written_rows, number_written_rows + len(batch_results))
+        batch_results.to_csv(file_path, mode="w" if number_written_rows == 0 else "a", header=number_written_rows == 0)
+        number_written_rows += len(batch_results)
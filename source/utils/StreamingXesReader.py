@@ -0,0 +1,99 @@
+import xml.etree.ElementTree as ElementTree
+from datetime import datetime
+from typing import Iterator
+
+
+class XesTrace:
+    """
+    A single trace of a xes file as read by iterate_traces_of_xes_file.
+    Attributes:
+    ----------
+    attributes: the attributes of the trace itself (without the prefix "case:" pm4py adds)
+    events: for every event in the order of the file a dictionary from the attribute key to the value; list attributes
+            (like po_successors) are given as list of (key, value) pairs
+    """
+
+    def __init__(self, attributes: dict, events: list[dict]):
+        self.attributes = attributes
+        self.events = events
+
+
+def parse_xes_timestamp(value: str) -> datetime:
+    return datetime.fromisoformat(value)
+
+
+XES_TYPE_TO_PARSER: dict = {
+    "string": str,
+    "id": str,
+    "int": int,
+    "float": float,
+    "boolean": lambda value: value.lower() == "true",
+    "date": parse_xes_timestamp
+}
+
+
+def get_local_tag(element: ElementTree.Element) -> str:
+    # the tags carry the namespace of the xes standard, e.g. {http://www.xes-standard.org/}trace
+    return element.tag.rpartition("}")[2]
+
+
+def parse_xes_attribute(element: ElementTree.Element):
+    """
+    :return: the typed value of the attribute, for lists the list of (key, value) pairs of the entries and None for
+             attribute types we do not support (e.g. containers)
+    """
+    tag: str = get_local_tag(element)
+    if tag == "list":
+        entries: list = []
+        for child in element:
+            # the entries are usually wrapped in a values element, but we also accept them directly
+            for entry in (child if get_local_tag(child) == "values" else [child]):
+                entries.append((entry.get("key"), parse_xes_attribute(entry)))
+        return entries
+    parser = XES_TYPE_TO_PARSER.get(tag)
+    if parser is None or element.get("value") is None:
+        return None
+    return parser(element.get("value"))
+
+
+def parse_xes_attributes(element: ElementTree.Element, keys: set[str] = None) -> dict:
+    """
+    :param keys: if given, only these attributes are parsed
+    :return: the attributes directly below the element (events of a trace are skipped)
+    """
+    attributes: dict = dict()
+    for child in element:
+        key: str = child.get("key")
+        if key is None or (keys is not None and key not in keys):
+            continue
+        attributes[key] = parse_xes_attribute(child)
+    return attributes
+
+
+def iterate_traces_of_xes_file(file_path: str, event_keys: set[str] = None, trace_keys: set[str] = None) -> Iterator[XesTrace]:
+    """
+    Reads the xes file trace by trace without building the whole document: every trace is given out as soon as it is
+    read completely and the elements are cleared afterward, so the memory needed does not depend on the size of the log.
+    :param file_path:
+    :param event_keys: if given, only these attributes of the events are kept
+    :param trace_keys: if given, only these attributes of the traces are kept
+    :return:
+    """
+    context = ElementTree.iterparse(file_path, events=("start", "end"))
+    root: ElementTree.Element = None
+    events: list[dict] = []
+    for parse_event, element in context:
+        if root is None:
+            root = element
+            continue
+        if parse_event != "end":
+            continue
+        tag: str = get_local_tag(element)
+        if tag == "event":
+            events.append(parse_xes_attributes(element, event_keys))
+            element.clear()
+        elif tag == "trace":
+            yield XesTrace(parse_xes_attributes(element, trace_keys), events)
+            events = []
+            # removes the finished trace (and everything before it) from the tree
+            root.clear()
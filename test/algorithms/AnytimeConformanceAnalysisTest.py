@@ -0,0 +1,63 @@
+import random
+import unittest
+
+from MasterThesisProject.source.algorithms.AnytimeConformanceAnalysis import calculate_token_replay_conformance_anytime
+from MasterThesisProject.source.algorithms.ConformanceMeasureAlgorithm import calculate_token_replay_conformance_norm_for_partial_order
+from MasterThesisProject.source.algorithms.FindTotalOrderForPartialOrder import find_total_order_for_run
+from MasterThesisProject.source.structures.PartiallyOrderedEventLog import PartiallyOrderedEventLog
+from MasterThesisProject.source.structures.PartiallyOrderedLogConformanceResult import PartiallyOrderedLogConformanceResult
+from MasterThesisProject.source.structures.Run import Run
+from MasterThesisProject.source.structures.WorkflowNet import WorkflowNet
+from MasterThesisProject.test.algorithms.ConformanceResultTestCase import ConformanceResultTestCase, make_random_workflow_net, \
+    make_random_partial_order_run
+
+
+class AnytimeConformanceAnalysisTestcases(ConformanceResultTestCase):
+
+    def setUp(self):
+        self.random_generator: random.Random = random.Random(11)
+
+    def make_random_net_and_log(self, number_places: int, number_runs: int) -> tuple[WorkflowNet, PartiallyOrderedEventLog]:
+        """
+        Random net and log with concurrency, so that many places can only be estimated by the heuristics.
+        """
+        net, transitions = make_random_workflow_net(number_places, 6, 0.3, self.random_generator)
+        run_to_frequency: dict[Run, int] = dict()
+        for _ in range(number_runs):
+            run: Run = make_random_partial_order_run(transitions, self.random_generator.randint(4, 14), 0.2, self.random_generator)
+            run.total_order = find_total_order_for_run(run)
+            run_to_frequency[run] = self.random_generator.randint(1, 5)
+        return net, PartiallyOrderedEventLog(run_to_frequency)
+
+    def test_epsilon_zero_is_precise(self):
+        for use_csr_flow_network in [False, True]:
+            net, event_log = self.make_random_net_and_log(8, 12)
+            expected: PartiallyOrderedLogConformanceResult = calculate_token_replay_conformance_norm_for_partial_order(
+                event_log, net, True, use_csr_flow_network=use_csr_flow_network)
+            observed: PartiallyOrderedLogConformanceResult = calculate_token_replay_conformance_anytime(
+                event_log, net, 0, use_csr_flow_network=use_csr_flow_network)
+            self.check_same_results(expected, observed)
+
+    def test_large_epsilon_keeps_the_heuristics(self):
+        net, event_log = self.make_random_net_and_log(8, 12)
+        expected: PartiallyOrderedLogConformanceResult = calculate_token_replay_conformance_norm_for_partial_order(event_log, net, False)
+        observed: PartiallyOrderedLogConformanceResult = calculate_token_replay_conformance_anytime(event_log, net, 1)
+        self.check_same_results(expected, observed)
+
+    def test_bounds_within_epsilon(self):
+        net, event_log = self.make_random_net_and_log(10, 20)
+        precise: PartiallyOrderedLogConformanceResult = calculate_token_replay_conformance_norm_for_partial_order(event_log, net, True)
+        heuristic: PartiallyOrderedLogConformanceResult = calculate_token_replay_conformance_norm_for_partial_order(event_log, net, False)
+        epsilon: float = (heuristic.upper_bound_conformance - heuristic.lower_bound_conformance) / 4
+        observed: PartiallyOrderedLogConformanceResult = calculate_token_replay_conformance_anytime(event_log, net, epsilon)
+        self.assertLessEqual(observed.upper_bound_conformance - observed.lower_bound_conformance, epsilon)
+        self.assertLessEqual(observed.lower_bound_conformance, precise.lower_bound_conformance)
+        self.assertGreaterEqual(observed.upper_bound_conformance, precise.upper_bound_conformance)
+        # the time budget stops before the flow network is used
+        stopped: PartiallyOrderedLogConformanceResult = calculate_token_replay_conformance_anytime(event_log, net, 0, time_budget=0)
+        self.assertEqual(heuristic.lower_bound_conformance, stopped.lower_bound_conformance)
+        self.assertEqual(heuristic.upper_bound_conformance, stopped.upper_bound_conformance)
+
+
+if __name__ == '__main__':
+    unittest.main()
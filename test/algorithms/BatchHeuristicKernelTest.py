@@ -0,0 +1,98 @@
+import random
+import unittest
+
+from networkx import DiGraph
+
+from MasterThesisProject.source.algorithms.BruteForceHeuristic import do_brute_force_heuristic_for_token_analysis
+from MasterThesisProject.source.algorithms.FindTotalOrderForPartialOrder import find_total_order_for_run
+from MasterThesisProject.source.algorithms.BatchHeuristicKernel import do_batch_heuristic_for_token_analysis, BatchHeuristicResult, \
+    make_batches_by_number_cells
+from MasterThesisProject.source.algorithms.ConformanceMeasureAlgorithm import calculate_token_replay_conformance_norm_for_partial_order
+from MasterThesisProject.source.structures.PartiallyOrderedEventLog import PartiallyOrderedEventLog
+from MasterThesisProject.source.structures.PartiallyOrderedLogConformanceResult import PartiallyOrderedLogConformanceResult
+from MasterThesisProject.source.structures.Run import Event4Run, Run
+from MasterThesisProject.source.structures.TotalOrderForRun import TotalOrder4Run
+from MasterThesisProject.source.structures.SinglePlaceTokenResult import SinglePlaceTokenResult
+from MasterThesisProject.test.algorithms.ConformanceResultTestCase import make_random_workflow_net, make_random_partial_order_run
+
+
+class BatchHeuristicKernelTestcases(unittest.TestCase):
+
+    def setUp(self):
+        """
+        We build a random net with some inner places, where every transition consumes from and produces on two random
+        inner places. The structure of the net does not need to make sense, as we only compare the heuristics.
+        :return:
+        """
+        self.random_generator: random.Random = random.Random(7)
+        self.net, self.transitions = make_random_workflow_net(8, 6, 0.3, self.random_generator)
+
+    def make_random_run(self, number_events: int) -> Run:
+        run: Run = make_random_partial_order_run(self.transitions, number_events, 0.2, self.random_generator)
+        run.total_order = find_total_order_for_run(run)
+        return run
+
+    def make_random_sequence(self, number_events: int) -> Run:
+        events: list[Event4Run] = [Event4Run("Event %d" % index, self.random_generator.choice(self.transitions))
+                                   for index in range(number_events)]
+        partial_order: DiGraph = DiGraph()
+        partial_order.add_nodes_from(events)
+        partial_order.add_edges_from(zip(events, events[1:]))
+        run: Run = Run(partial_order)
+        run.total_order = TotalOrder4Run.make_total_order_from_list(events)
+        return run
+
+    def check_batch_against_single_place_heuristic(self, runs: list[Run]):
+        batch_result: BatchHeuristicResult = do_batch_heuristic_for_token_analysis(runs, self.net, maximal_number_cells=2000)
+        place_to_index: dict = self.net.get_incidence_index().place_to_index
+        for run_index, run in enumerate(runs):
+            for place in self.net.inner_places:
+                place_index: int = place_to_index[place]
+                forward: SinglePlaceTokenResult = do_brute_force_heuristic_for_token_analysis(run, self.net, place, False)
+                backward: SinglePlaceTokenResult = do_brute_force_heuristic_for_token_analysis(run, self.net, place, True)
+                self.assertEqual(forward.produced_token, batch_result.produced_token[run_index, place_index])
+                self.assertEqual(forward.consumed_token, batch_result.consumed_token[run_index, place_index])
+                self.assertEqual(forward.missing_token_max, batch_result.forward_missing_token_max[run_index, place_index])
+                self.assertEqual(forward.remaining_token_max, batch_result.forward_remaining_token_max[run_index, place_index])
+                self.assertEqual(backward.missing_token_max, batch_result.backward_missing_token_max[run_index, place_index])
+                self.assertEqual(backward.remaining_token_max, batch_result.backward_remaining_token_max[run_index, place_index])
+
+    def test_partial_orders_identical_to_single_place_heuristic(self):
+        runs: list[Run] = [self.make_random_run(number_events) for number_events in [1, 3, 10, 25] for _ in range(5)]
+        self.check_batch_against_single_place_heuristic(runs)
+
+    def test_sequences_identical_to_single_place_heuristic(self):
+        runs: list[Run] = [self.make_random_sequence(number_events) for number_events in [0, 1, 3, 10, 25] for _ in range(5)]
+        self.check_batch_against_single_place_heuristic(runs)
+
+    def test_batches_bounded_by_number_cells(self):
+        run_lengths: list[int] = sorted(self.random_generator.randint(0, 60) for _ in range(200))
+        batches: list[tuple[int, int]] = make_batches_by_number_cells(run_lengths, 10, 2000)
+        self.assertEqual(list(range(len(run_lengths))), [index for start, end in batches for index in range(start, end)])
+        for start, end in batches:
+            self.assertTrue(end - start == 1 or (end - start) * (run_lengths[end - 1] + 1) * 10 <= 2000)
+        # a run longer than the bound is a batch of its own
+        self.assertEqual([(0, 1), (1, 2)], make_batches_by_number_cells([300, 400], 10, 2000))
+
+    def test_identical_conformance_results(self):
+        runs: list[Run] = [self.make_random_run(number_events) for number_events in [2, 5, 12] for _ in range(5)]
+        event_log: PartiallyOrderedEventLog = PartiallyOrderedEventLog({run: index + 1 for index, run in enumerate(runs)})
+        for do_calculate_precise_result in [True, False]:
+            expected: PartiallyOrderedLogConformanceResult = calculate_token_replay_conformance_norm_for_partial_order(
+                event_log, self.net, do_calculate_precise_result)
+            observed: PartiallyOrderedLogConformanceResult = calculate_token_replay_conformance_norm_for_partial_order(
+                event_log, self.net, do_calculate_precise_result, use_batch_heuristic_kernel=True)
+            self.assertEqual(expected.lower_bound_conformance, observed.lower_bound_conformance)
+            self.assertEqual(expected.upper_bound_conformance, observed.upper_bound_conformance)
+            self.assertEqual(expected.number_places_decided_forward_heuristic, observed.number_places_decided_forward_heuristic)
+            self.assertEqual(expected.number_places_decided_backward_heuristic, observed.number_places_decided_backward_heuristic)
+            self.assertEqual(expected.number_places_decided_flow_network, observed.number_places_decided_flow_network)
+            self.assertEqual(expected.number_places_only_estimated, observed.number_places_only_estimated)
+            for place_name, expected_statistic in expected.place_to_decision_statistic.items():
+                self.assertEqual(vars(expected_statistic), vars(observed.place_to_decision_statistic[place_name]))
+            for run in runs:
+                self.assertEqual(vars(expected.run_to_conformance_result[run]), vars(observed.run_to_conformance_result[run]))
+
+
+if __name__ == '__main__':
+    unittest.main()
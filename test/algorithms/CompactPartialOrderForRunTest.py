@@ -0,0 +1,77 @@
+import random
+import unittest
+
+import networkx as nx
+from networkx import DiGraph
+
+from MasterThesisProject.source.algorithms.CompactPartialOrderForRun import compact_partial_order_of_run, compact_partial_orders_of_event_log
+from MasterThesisProject.source.algorithms.ConformanceMeasureAlgorithm import calculate_token_replay_conformance_norm_for_partial_order
+from MasterThesisProject.source.algorithms.FindTotalOrderForPartialOrder import find_total_order_for_run
+from MasterThesisProject.source.structures.PartiallyOrderedEventLog import PartiallyOrderedEventLog
+from MasterThesisProject.source.structures.PartiallyOrderedLogConformanceResult import PartiallyOrderedLogConformanceResult
+from MasterThesisProject.source.structures.Run import Event4Run, Run
+from MasterThesisProject.source.structures.WorkflowNet import PlaceWorkflowNet, TransitionWorkflowNet
+from MasterThesisProject.test.algorithms.ConformanceResultTestCase import make_random_workflow_net, make_random_partial_order_run
+
+
+class CompactPartialOrderForRunTestcases(unittest.TestCase):
+
+    def setUp(self):
+        self.random_generator: random.Random = random.Random(6)
+        self.place = PlaceWorkflowNet("Place")
+        self.transition_nothing = TransitionWorkflowNet("Invalid transition", preset=set(), postset=set())
+        self.transition_producing = TransitionWorkflowNet("Producing", preset=set(), postset={self.place})
+        self.transition_consuming = TransitionWorkflowNet("Consuming", preset={self.place}, postset=set())
+
+    def test_small_example(self):
+        """
+        E1 -> E2 -> E3 -> E4 with the transitive edge E1 -> E4; E2 touches no place and is contracted, then E1 -> E3 -> E4
+        remains. E5 touches no place as well but has two predecessors and two successors, so it is kept.
+        """
+        events: list[Event4Run] = [Event4Run("Event %d" % index, transition) for index, transition in
+                                   enumerate([self.transition_producing, self.transition_nothing, self.transition_consuming,
+                                              self.transition_consuming, self.transition_nothing, self.transition_producing,
+                                              self.transition_consuming], start=1)]
+        event_1, event_2, event_3, event_4, event_5, event_6, event_7 = events
+        partial_order: DiGraph = DiGraph([(event_1, event_2), (event_2, event_3), (event_3, event_4), (event_1, event_4),
+                                          (event_1, event_5), (event_6, event_5), (event_5, event_4), (event_5, event_7)])
+        run: Run = Run(partial_order, "Example")
+        compact_run: Run = compact_partial_order_of_run(run)
+        self.assertEqual("Example", compact_run.name_foreign_source)
+        self.assertEqual({event_1, event_3, event_4, event_5, event_6, event_7}, set(compact_run.labels))
+        self.assertEqual({(event_1, event_3), (event_3, event_4), (event_1, event_5), (event_6, event_5), (event_5, event_4),
+                          (event_5, event_7)}, set(compact_run.partial_order.edges()))
+        self.assertIsNone(compact_run.total_order)
+        # the original run is not changed
+        self.assertEqual(8, run.partial_order.number_of_edges())
+
+    def test_same_precise_results(self):
+        """
+        Random runs with all transitive edges and events of a transition without places.
+        """
+        net, transitions = make_random_workflow_net(6, 5, 0.3, self.random_generator)
+        labels: list[TransitionWorkflowNet] = transitions + [self.transition_nothing]
+        run_to_frequency: dict[Run, int] = dict()
+        for number_events in [1, 4, 10, 25]:
+            run: Run = make_random_partial_order_run(labels, number_events, 0.2, self.random_generator)
+            run_to_frequency[Run(nx.transitive_closure_dag(run.partial_order))] = number_events
+        event_log: PartiallyOrderedEventLog = PartiallyOrderedEventLog(run_to_frequency)
+        compact_log: PartiallyOrderedEventLog = compact_partial_orders_of_event_log(event_log)
+        self.assertLess(sum(run.partial_order.number_of_edges() for run in compact_log.run_to_frequency),
+                        sum(run.partial_order.number_of_edges() for run in event_log.run_to_frequency))
+        for run in list(event_log.run_to_frequency) + list(compact_log.run_to_frequency):
+            run.total_order = find_total_order_for_run(run)
+        for never_use_heuristics in [False, True]:
+            result: PartiallyOrderedLogConformanceResult = calculate_token_replay_conformance_norm_for_partial_order(
+                event_log, net, True, never_use_heuristics)
+            compact_result: PartiallyOrderedLogConformanceResult = calculate_token_replay_conformance_norm_for_partial_order(
+                compact_log, net, True, never_use_heuristics)
+            self.assertEqual(result.lower_bound_conformance, compact_result.lower_bound_conformance)
+            self.assertEqual(result.upper_bound_conformance, compact_result.upper_bound_conformance)
+            for run, compact_run in zip(event_log.run_to_frequency, compact_log.run_to_frequency):
+                self.assertEqual(result.run_to_conformance_result[run].conformance_level_min,
+                                 compact_result.run_to_conformance_result[compact_run].conformance_level_min)
+
+
+if __name__ == '__main__':
+    unittest.main()
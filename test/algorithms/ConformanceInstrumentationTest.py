@@ -0,0 +1,58 @@
+import random
+import unittest
+
+from MasterThesisProject.source.algorithms.ConformanceMeasureAlgorithm import calculate_token_replay_conformance_norm_for_partial_order
+from MasterThesisProject.source.benchmarks.SyntheticGenerators import make_synthetic_workflow_net, make_synthetic_event_log
+from MasterThesisProject.source.structures.ConformanceInstrumentation import ConformanceInstrumentation, PHASE_INITIAL_AND_FINAL_PLACE, \
+    PHASE_FORWARD_HEURISTIC, PHASE_BACKWARD_HEURISTIC, PHASE_MAX_FLOW_CONSTRUCTION, PHASE_MAX_FLOW_SOLVING, PHASE_MULTI_PLACE_HEURISTIC
+from MasterThesisProject.source.structures.PartiallyOrderedLogConformanceResult import PartiallyOrderedLogConformanceResult
+
+
+class ConformanceInstrumentationTestcases(unittest.TestCase):
+
+    def setUp(self):
+        random_generator: random.Random = random.Random(11)
+        self.net, transitions = make_synthetic_workflow_net(12, 8, 2, random_generator)
+        self.event_log = make_synthetic_event_log(transitions, 15, 4, 4, 0.7, random_generator)
+
+    def test_same_result_and_recorded_phases(self):
+        for use_csr_flow_network in [False, True]:
+            expected: PartiallyOrderedLogConformanceResult = calculate_token_replay_conformance_norm_for_partial_order(
+                self.event_log, self.net, True, use_csr_flow_network=use_csr_flow_network)
+            instrumentation: ConformanceInstrumentation = ConformanceInstrumentation(number_slowest_pairs=3)
+            observed: PartiallyOrderedLogConformanceResult = calculate_token_replay_conformance_norm_for_partial_order(
+                self.event_log, self.net, True, use_csr_flow_network=use_csr_flow_network, instrumentation=instrumentation)
+            self.assertEqual(expected.lower_bound_conformance, observed.lower_bound_conformance)
+            self.assertEqual(expected.upper_bound_conformance, observed.upper_bound_conformance)
+            for place_name, expected_statistic in expected.place_to_decision_statistic.items():
+                self.assertEqual(vars(expected_statistic), vars(observed.place_to_decision_statistic[place_name]))
+            number_runs: int = len(self.event_log.run_to_frequency)
+            self.assertEqual(number_runs, instrumentation.phase_to_calls[PHASE_INITIAL_AND_FINAL_PLACE])
+            self.assertGreater(instrumentation.phase_to_calls[PHASE_FORWARD_HEURISTIC], 0)
+            self.assertGreater(instrumentation.phase_to_calls[PHASE_BACKWARD_HEURISTIC], 0)
+            self.assertGreater(instrumentation.phase_to_calls[PHASE_MAX_FLOW_CONSTRUCTION], 0)
+            self.assertEqual(instrumentation.phase_to_calls[PHASE_MAX_FLOW_CONSTRUCTION], instrumentation.phase_to_calls[PHASE_MAX_FLOW_SOLVING])
+            self.assertGreater(instrumentation.number_discharges, 0)
+            self.assertGreater(instrumentation.number_relabels + instrumentation.number_pushes, 0)
+            self.assertTrue(all(seconds >= 0 for seconds in instrumentation.phase_to_seconds.values()))
+            slowest_pairs: list[tuple] = instrumentation.get_slowest_pairs()
+            self.assertEqual(3, len(slowest_pairs))
+            self.assertEqual(sorted((seconds for seconds, _, _ in slowest_pairs), reverse=True), [seconds for seconds, _, _ in slowest_pairs])
+            self.assertIn(PHASE_MAX_FLOW_SOLVING, instrumentation.make_report())
+
+    def test_multi_place_heuristic_is_timed(self):
+        instrumentation: ConformanceInstrumentation = ConformanceInstrumentation()
+        calculate_token_replay_conformance_norm_for_partial_order(self.event_log, self.net, False, use_multi_place_heuristic=True,
+                                                                  instrumentation=instrumentation)
+        self.assertEqual(len(self.event_log.run_to_frequency), instrumentation.phase_to_calls[PHASE_MULTI_PLACE_HEURISTIC])
+        self.assertNotIn(PHASE_FORWARD_HEURISTIC, instrumentation.phase_to_calls)
+        self.assertNotIn(PHASE_MAX_FLOW_SOLVING, instrumentation.phase_to_calls)
+
+    def test_workers_are_not_supported(self):
+        with self.assertRaises(Exception):
+            calculate_token_replay_conformance_norm_for_partial_order(self.event_log, self.net, True, workers=2,
+                                                                      instrumentation=ConformanceInstrumentation())
+
+
+if __name__ == '__main__':
+    unittest.main()
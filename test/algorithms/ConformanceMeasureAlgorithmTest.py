@@ -153,6 +153,38 @@ class MyTestCase(unittest.TestCase):
         self.assertGreaterEqual(result_quick_algorithm.upper_bound_conformance, result.conformance_level)
         self.assertLessEqual(result_quick_algorithm.lower_bound_conformance, result.conformance_level)
         self.assertAlmostEqual(1.0, result_quick_algorithm.upper_bound_conformance, places=8)
+        # the CSR based flow network has to yield exactly the same result
+        result_csr: PartiallyOrderedLogConformanceResult = calculate_token_replay_conformance_norm_for_partial_order(
+            event_log, self.net_2, True, use_csr_flow_network=True)
+        self.assertEqual(result.conformance_level, result_csr.conformance_level)
+        self.assertEqual(result.number_places_decided_flow_network, result_csr.number_places_decided_flow_network)
+        # as well as the heuristics done for all places in one walk over the run
+        result_multi_place: PartiallyOrderedLogConformanceResult = calculate_token_replay_conformance_norm_for_partial_order(
+            event_log, self.net_2, False, use_multi_place_heuristic=True)
+        self.assertEqual(result_quick_algorithm.lower_bound_conformance, result_multi_place.lower_bound_conformance)
+        self.assertEqual(result_quick_algorithm.upper_bound_conformance, result_multi_place.upper_bound_conformance)
+
+    def test_untouched_places_are_counted(self):
+        """
+        The run only touches PP1 and PP3; the other places are not analyzed, but have to show up in the statistics.
+        :return:
+        """
+        event: Event4Run = Event4Run("Only event", self.net_2_transition_prep1)
+        run_order: DiGraph = DiGraph()
+        run_order.add_node(event)
+        run: Run = Run(run_order)
+        event_log: PartiallyOrderedEventLog = PartiallyOrderedEventLog({run: 2})
+        for never_use_heuristics in [False, True]:
+            result: PartiallyOrderedLogConformanceResult = calculate_token_replay_conformance_norm_for_partial_order(
+                event_log, self.net_2, True, never_use_heuristics)
+            self.assertEqual(0 if never_use_heuristics else 6, result.number_places_decided_forward_heuristic)
+            self.assertEqual(6 if never_use_heuristics else 0, result.number_places_decided_flow_network)
+            for place in self.net_2.inner_places:
+                statistic = result.place_to_decision_statistic[place.name]
+                self.assertEqual(0 if never_use_heuristics else 1, statistic.forward_heuristic)
+                self.assertEqual(1 if never_use_heuristics else 0, statistic.maximal_flow)
+                self.assertEqual(1 if place in {self.net_2_place_prep1, self.net_2_place_prep3} else 0, statistic.produced_token)
+                self.assertEqual(0, statistic.consumed_token)
 
 
 if __name__ == '__main__':
@@ -0,0 +1,62 @@
+import random
+import unittest
+
+from networkx import DiGraph
+
+from MasterThesisProject.source.structures.PartiallyOrderedLogConformanceResult import PartiallyOrderedLogConformanceResult
+from MasterThesisProject.source.structures.Run import Event4Run, Run
+from MasterThesisProject.source.structures.WorkflowNet import PlaceWorkflowNet, TransitionWorkflowNet, WorkflowNet
+
+
+def make_random_workflow_net(number_places: int, number_transitions: int, arc_probability: float,
+                             random_generator: random.Random) -> tuple[WorkflowNet, list[TransitionWorkflowNet]]:
+    """
+    Random net where every transition consumes from and produces on every inner place with the given probability, so
+    there are also transitions with an empty preset or postset. The structure of the net does not need to make sense.
+    :return: the net and its transitions; the activity of a transition is "Activity <index>"
+    """
+    start_place: PlaceWorkflowNet = PlaceWorkflowNet("Start")
+    end_place: PlaceWorkflowNet = PlaceWorkflowNet("End")
+    inner_places: list[PlaceWorkflowNet] = [PlaceWorkflowNet("P%d" % index) for index in range(number_places)]
+    transitions: list[TransitionWorkflowNet] = []
+    for index in range(number_transitions):
+        transition: TransitionWorkflowNet = TransitionWorkflowNet("T%d" % index, "Activity %d" % index)
+        transition.add_place_iteration_to_preset(place for place in inner_places if random_generator.random() < arc_probability)
+        transition.add_place_iteration_to_postset(place for place in inner_places if random_generator.random() < arc_probability)
+        transitions.append(transition)
+    transitions[0].add_place_to_preset(start_place)
+    transitions[-1].add_place_to_postset(end_place)
+    return WorkflowNet.make_class_instance_from_transitions(set(transitions), start_place, end_place), transitions
+
+
+def make_random_partial_order_run(labels: list[TransitionWorkflowNet], number_events: int, edge_probability: float,
+                                  random_generator: random.Random) -> Run:
+    """
+    Run with randomly chosen labels, where every event is ordered before every later event with the given probability.
+    :return: the run without total order
+    """
+    events: list[Event4Run] = [Event4Run("Event %d" % index, random_generator.choice(labels)) for index in range(number_events)]
+    partial_order: DiGraph = DiGraph()
+    partial_order.add_nodes_from(events)
+    partial_order.add_edges_from((events[first], events[second]) for first in range(number_events)
+                                 for second in range(first + 1, number_events) if random_generator.random() < edge_probability)
+    return Run(partial_order)
+
+
+class ConformanceResultTestCase(unittest.TestCase):
+    """
+    Base of the tests that compare the result of an optimized analysis with the one of the plain analysis.
+    """
+
+    def check_same_results(self, expected: PartiallyOrderedLogConformanceResult, observed: PartiallyOrderedLogConformanceResult,
+                           compare_runs: bool = True):
+        """
+        :param compare_runs: if False, only the bounds and the statistics of the places are compared
+        """
+        self.assertEqual(expected.lower_bound_conformance, observed.lower_bound_conformance)
+        self.assertEqual(expected.upper_bound_conformance, observed.upper_bound_conformance)
+        for place_name, expected_statistic in expected.place_to_decision_statistic.items():
+            self.assertEqual(vars(expected_statistic), vars(observed.place_to_decision_statistic[place_name]))
+        if compare_runs:
+            for run, expected_run_result in expected.run_to_conformance_result.items():
+                self.assertEqual(vars(expected_run_result), vars(observed.run_to_conformance_result[run]))
@@ -0,0 +1,89 @@
+import os
+import random
+import tempfile
+import unittest
+
+from networkx import DiGraph
+
+from MasterThesisProject.source.algorithms.ConformanceMeasureAlgorithm import calculate_token_replay_conformance_norm_for_partial_order
+from MasterThesisProject.source.algorithms.FindTotalOrderForPartialOrder import find_total_order_for_run
+from MasterThesisProject.source.algorithms.IncrementalConformanceAnalysis import IncrementalConformanceChecker
+from MasterThesisProject.source.structures.PartiallyOrderedEventLog import PartiallyOrderedEventLog
+from MasterThesisProject.source.structures.PartiallyOrderedLogConformanceResult import PartiallyOrderedLogConformanceResult
+from MasterThesisProject.source.structures.Run import Event4Run, Run
+from MasterThesisProject.source.structures.WorkflowNet import TransitionWorkflowNet
+from MasterThesisProject.test.algorithms.ConformanceResultTestCase import ConformanceResultTestCase, make_random_workflow_net, \
+    make_random_partial_order_run
+
+
+class IncrementalConformanceAnalysisTestcases(ConformanceResultTestCase):
+
+    def setUp(self):
+        self.random_generator: random.Random = random.Random(13)
+
+    def make_random_run(self, transitions: list[TransitionWorkflowNet]) -> Run:
+        return make_random_partial_order_run(transitions, self.random_generator.randint(2, 10), 0.25, self.random_generator)
+
+    def test_same_result_as_whole_log(self):
+        net, transitions = make_random_workflow_net(8, 5, 0.3, self.random_generator)
+        runs: list[Run] = [self.make_random_run(transitions) for _ in range(12)]
+        for run in runs:
+            run.total_order = find_total_order_for_run(run)
+        for do_calculate_precise_result in [True, False]:
+            checker: IncrementalConformanceChecker = IncrementalConformanceChecker(net, do_calculate_precise_result)
+            run_to_frequency: dict[Run, int] = dict()
+            for batch_start in range(0, len(runs), 4):
+                # the new runs and one more of the first variant
+                batch: dict[Run, int] = {run: 1 + index % 3 for index, run in enumerate(runs[batch_start:batch_start + 4])}
+                if batch_start > 0:
+                    batch[runs[0]] = 2
+                checker.add_runs(batch)
+                for run, frequency in batch.items():
+                    run_to_frequency[run] = run_to_frequency.get(run, 0) + frequency
+                expected: PartiallyOrderedLogConformanceResult = calculate_token_replay_conformance_norm_for_partial_order(
+                    PartiallyOrderedEventLog(dict(run_to_frequency)), net, do_calculate_precise_result)
+                self.check_same_results(expected, checker.get_result(), False)
+            for run in runs:
+                self.assertEqual(vars(expected.run_to_conformance_result[run]), vars(checker.get_run_result(run)))
+
+    def test_known_variant_is_not_analyzed_again(self):
+        net, transitions = make_random_workflow_net(6, 5, 0.3, self.random_generator)
+        run: Run = self.make_random_run(transitions)
+        checker: IncrementalConformanceChecker = IncrementalConformanceChecker(net, True)
+        checker.add_runs({run: 1})
+        result_before = checker.get_run_result(run)
+        # a copy of the run with new events is the same variant
+        event_to_copy: dict = {event: Event4Run(event.name, event.label) for event in run.partial_order}
+        copied_order: DiGraph = DiGraph()
+        copied_order.add_nodes_from(event_to_copy.values())
+        copied_order.add_edges_from((event_to_copy[source], event_to_copy[target]) for source, target in run.partial_order.edges())
+        copied_run: Run = Run(copied_order)
+        copied_run.total_order = find_total_order_for_run(copied_run)
+        checker.add_runs({copied_run: 4})
+        self.assertIs(result_before, checker.get_run_result(copied_run))
+        self.assertEqual([5], list(checker.variant_id_to_frequency.values()))
+        self.assertEqual(5 * result_before.consumed_token, checker.weighted_tokens_sums.consumed_token)
+
+    def test_snapshot_and_restore(self):
+        net, transitions = make_random_workflow_net(8, 5, 0.3, self.random_generator)
+        runs: list[Run] = [self.make_random_run(transitions) for _ in range(10)]
+        checker: IncrementalConformanceChecker = IncrementalConformanceChecker(net, True)
+        checker.add_runs({run: 2 for run in runs[:5]})
+        with tempfile.TemporaryDirectory() as directory:
+            snapshot_path: str = os.path.join(directory, "checker.json")
+            checker.save_snapshot(snapshot_path)
+            restored_checker: IncrementalConformanceChecker = IncrementalConformanceChecker(net, True)
+            restored_checker.restore_snapshot(snapshot_path)
+            with self.assertRaises(Exception):
+                IncrementalConformanceChecker(net, False).restore_snapshot(snapshot_path)
+        # both go on with the same runs, the restored one has to recognize the known variants
+        for current_checker in [checker, restored_checker]:
+            current_checker.add_runs({run: 1 for run in runs[3:]})
+        self.check_same_results(checker.get_result(), restored_checker.get_result(), False)
+        self.assertEqual(checker.variant_id_to_frequency, restored_checker.variant_id_to_frequency)
+        for run in runs:
+            self.assertEqual(vars(checker.get_run_result(run)), vars(restored_checker.get_run_result(run)))
+
+
+if __name__ == '__main__':
+    unittest.main()
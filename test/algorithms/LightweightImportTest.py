@@ -0,0 +1,26 @@
+import subprocess
+import sys
+import unittest
+
+# modules of the core and of the importers that must not load the heavy dependencies of the reporting layer
+lightweight_modules: list[str] = ["MasterThesisProject.source.algorithms.ConformanceMeasureAlgorithm",
+                                  "MasterThesisProject.source.algorithms.AnytimeConformanceAnalysis",
+                                  "MasterThesisProject.source.algorithms.IncrementalConformanceAnalysis",
+                                  "MasterThesisProject.source.algorithms.MultiNetConformanceAnalysis",
+                                  "MasterThesisProject.source.utils.ImportCCOxesFileToEventLog",
+                                  "MasterThesisProject.source.utils.ImporterPnmlFileToInternalWorkflowNet"]
+heavy_modules: list[str] = ["matplotlib", "pm4py", "pandas"]
+
+
+class LightweightImportTestcases(unittest.TestCase):
+
+    def test_core_does_not_import_heavy_modules(self):
+        for module_name in lightweight_modules:
+            # a fresh interpreter, since the other tests may have loaded the heavy modules already
+            code: str = "import sys, {}; print(' '.join(name for name in {} if name in sys.modules))".format(module_name, heavy_modules)
+            output: str = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True).stdout
+            self.assertEqual("", output.strip(), module_name)
+
+
+if __name__ == '__main__':
+    unittest.main()
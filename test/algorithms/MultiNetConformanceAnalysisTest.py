@@ -0,0 +1,117 @@
+import random
+import unittest
+
+from networkx import DiGraph, relabel_nodes
+
+from MasterThesisProject.source.algorithms.CompactPartialOrderForRun import compact_partial_order_of_run
+from MasterThesisProject.source.algorithms.ConformanceMeasureAlgorithm import calculate_token_replay_conformance_norm_for_partial_order
+from MasterThesisProject.source.algorithms.FindTotalOrderForPartialOrder import find_total_order_for_run
+from MasterThesisProject.source.algorithms.MultiNetConformanceAnalysis import calculate_token_replay_conformance_for_several_nets, \
+    make_label_key_to_transition, make_run_view_for_net
+from MasterThesisProject.source.structures.PartiallyOrderedEventLog import PartiallyOrderedEventLog
+from MasterThesisProject.source.structures.PartiallyOrderedLogConformanceResult import PartiallyOrderedLogConformanceResult
+from MasterThesisProject.source.structures.Run import Event4Run, Run
+from MasterThesisProject.source.structures.WorkflowNet import TransitionWorkflowNet, WorkflowNet
+from MasterThesisProject.test.algorithms.ConformanceResultTestCase import ConformanceResultTestCase, make_random_workflow_net, \
+    make_random_partial_order_run
+
+
+class MultiNetConformanceAnalysisTestcases(ConformanceResultTestCase):
+
+    def setUp(self):
+        self.random_generator: random.Random = random.Random(17)
+
+    def make_random_net(self, number_places: int, number_transitions: int) -> tuple[WorkflowNet, list[TransitionWorkflowNet]]:
+        """
+        The net knows the activities 0 to number_transitions - 1; every net has an invalid transition as the imported ones.
+        """
+        net, transitions = make_random_workflow_net(number_places, number_transitions, 0.3, self.random_generator)
+        transitions.append(TransitionWorkflowNet("INVALID TRANSITION"))
+        return WorkflowNet.make_class_instance_from_transitions(set(transitions), net.start_place, net.end_place), transitions
+
+    @staticmethod
+    def import_run_for_net(run: Run, transitions: list[TransitionWorkflowNet]) -> Run:
+        """
+        Labels the events as the importer does: activities the net does not know get the invalid transition.
+        """
+        activity_to_transition: dict[str, TransitionWorkflowNet] = {transition.activity_description: transition for transition in transitions}
+        event_to_copy: dict = {event: Event4Run(event.name, activity_to_transition.get(event.label.activity_description, transitions[-1]),
+                                                event.label.activity_description) for event in run.partial_order}
+        imported_run: Run = Run(relabel_nodes(run.partial_order, event_to_copy))
+        imported_run.total_order = find_total_order_for_run(imported_run)
+        return imported_run
+
+    def make_random_log(self, transitions_per_net: list[list[TransitionWorkflowNet]], number_runs: int) -> list[PartiallyOrderedEventLog]:
+        """
+        :return: the same log imported for every net, i.e., with other events labelled by the transitions of the net
+        """
+        # the activities of all nets and one activity no net knows
+        activities: list[TransitionWorkflowNet] = [TransitionWorkflowNet("Activity %d" % index, "Activity %d" % index)
+                                                   for index in range(max(len(transitions) for transitions in transitions_per_net))]
+        activities.append(TransitionWorkflowNet("Unknown", "Unknown activity"))
+        run_to_frequency_per_net: list[dict[Run, int]] = [dict() for _ in transitions_per_net]
+        for _ in range(number_runs):
+            run: Run = make_random_partial_order_run(activities, self.random_generator.randint(2, 12), 0.25, self.random_generator)
+            frequency: int = self.random_generator.randint(1, 4)
+            for transitions, run_to_frequency in zip(transitions_per_net, run_to_frequency_per_net):
+                run_to_frequency[self.import_run_for_net(run, transitions)] = frequency
+        return [PartiallyOrderedEventLog(run_to_frequency) for run_to_frequency in run_to_frequency_per_net]
+
+    def test_same_results_as_single_nets(self):
+        # the nets know different activities, so the invalid events of the first log are valid for the other nets
+        nets_and_transitions: list = [self.make_random_net(number_places, number_transitions)
+                                      for number_places, number_transitions in [(5, 4), (8, 5), (10, 7)]]
+        nets: list[WorkflowNet] = [net for net, _ in nets_and_transitions]
+        event_logs: list[PartiallyOrderedEventLog] = self.make_random_log([transitions for _, transitions in nets_and_transitions], 15)
+        for do_calculate_precise_result in [True, False]:
+            for use_csr_flow_network in [False, True]:
+                observed_results: list[PartiallyOrderedLogConformanceResult] = calculate_token_replay_conformance_for_several_nets(
+                    event_logs[0], nets, do_calculate_precise_result, use_csr_flow_network=use_csr_flow_network)
+                for net, event_log, observed in zip(nets, event_logs, observed_results):
+                    expected: PartiallyOrderedLogConformanceResult = calculate_token_replay_conformance_norm_for_partial_order(
+                        event_log, net, do_calculate_precise_result)
+                    # the runs of the result are the ones of the first log
+                    self.check_same_results(expected, observed, False)
+                    for expected_run, observed_run in zip(event_log.run_to_frequency, event_logs[0].run_to_frequency):
+                        self.assertEqual(vars(expected.run_to_conformance_result[expected_run]),
+                                         vars(observed.run_to_conformance_result[observed_run]))
+
+    @staticmethod
+    def make_chain_run(labels: list[TransitionWorkflowNet]) -> Run:
+        events: list[Event4Run] = [Event4Run("Event %d" % index, label) for index, label in enumerate(labels)]
+        return Run(DiGraph(list(zip(events, events[1:]))))
+
+    def test_run_view(self):
+        first_net, first_transitions = self.make_random_net(5, 4)
+        second_net, second_transitions = self.make_random_net(5, 6)
+        unknown_activity: TransitionWorkflowNet = TransitionWorkflowNet("Unknown", "Unknown activity")
+        run: Run = self.import_run_for_net(self.make_chain_run(second_transitions[:-1] + [unknown_activity]), first_transitions)
+        run_view: Run = make_run_view_for_net(run, make_label_key_to_transition(second_net))
+        self.assertIs(run.partial_order, run_view.partial_order)
+        self.assertIs(run.total_order, run_view.total_order)
+        for event in run.partial_order:
+            self.assertIn(event.label, first_net.transitions)
+            self.assertIn(run_view.labels[event], second_net.transitions)
+        # the activities the first net does not know are invalid there, but not in the second net; unknown ones stay invalid
+        self.assertEqual(["T0", "T1", "T2", "T3", "INVALID TRANSITION", "INVALID TRANSITION", "INVALID TRANSITION"],
+                         [run.labels[event].name for event in run.total_order.order])
+        self.assertEqual(["T0", "T1", "T2", "T3", "T4", "T5", "INVALID TRANSITION"],
+                         [run_view.labels[event].name for event in run.total_order.order])
+
+    def test_run_view_of_unresolvable_runs(self):
+        net, transitions = self.make_random_net(5, 4)
+        label_key_to_transition: dict[str, TransitionWorkflowNet] = make_label_key_to_transition(net)
+        # the activity of an invalid event that was not read from a log is unknown
+        run: Run = self.make_chain_run([transitions[0], transitions[-1], transitions[1]])
+        run.total_order = find_total_order_for_run(run)
+        self.assertRaises(Exception, make_run_view_for_net, run, label_key_to_transition)
+        # the contracted invalid event may touch places of the other net
+        compact_run: Run = compact_partial_order_of_run(self.import_run_for_net(
+            self.make_chain_run([transitions[0], TransitionWorkflowNet("Unknown", "Unknown activity"), transitions[1]]), transitions))
+        self.assertTrue(compact_run.has_contracted_events)
+        compact_run.total_order = find_total_order_for_run(compact_run)
+        self.assertRaises(Exception, make_run_view_for_net, compact_run, label_key_to_transition)
+
+
+if __name__ == '__main__':
+    unittest.main()
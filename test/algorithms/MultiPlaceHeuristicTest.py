@@ -0,0 +1,72 @@
+import random
+import unittest
+
+from MasterThesisProject.source.algorithms.ConformanceMeasureAlgorithm import calculate_token_replay_conformance_norm_for_partial_order
+from MasterThesisProject.source.algorithms.BruteForceHeuristic import do_brute_force_heuristic_for_token_analysis
+from MasterThesisProject.source.algorithms.FindTotalOrderForPartialOrder import find_total_order_for_run
+from MasterThesisProject.source.algorithms.MultiPlaceHeuristic import do_multi_place_heuristic_for_token_analysis, MultiPlaceHeuristicResult
+from MasterThesisProject.source.structures.PartiallyOrderedEventLog import PartiallyOrderedEventLog
+from MasterThesisProject.source.structures.PartiallyOrderedLogConformanceResult import PartiallyOrderedLogConformanceResult
+from MasterThesisProject.source.structures.Run import Run
+from MasterThesisProject.source.structures.SinglePlaceTokenResult import SinglePlaceTokenResult
+from MasterThesisProject.test.algorithms.ConformanceResultTestCase import make_random_workflow_net, make_random_partial_order_run
+
+
+class MultiPlaceHeuristicTestcases(unittest.TestCase):
+
+    def setUp(self):
+        """
+        We build a random net with some inner places, where every transition consumes from and produces on two random
+        inner places. The structure of the net does not need to make sense, as we only compare the heuristics.
+        :return:
+        """
+        self.random_generator: random.Random = random.Random(7)
+        self.net, self.transitions = make_random_workflow_net(8, 6, 0.3, self.random_generator)
+
+    def make_random_run(self, number_events: int) -> Run:
+        run: Run = make_random_partial_order_run(self.transitions, number_events, 0.2, self.random_generator)
+        run.total_order = find_total_order_for_run(run)
+        return run
+
+    def check_token_result_against_expected(self, expected: SinglePlaceTokenResult, observed: SinglePlaceTokenResult):
+        self.assertEqual(expected.produced_token, observed.produced_token)
+        self.assertEqual(expected.consumed_token, observed.consumed_token)
+        self.assertEqual(expected.missing_token_max, observed.missing_token_max)
+        self.assertEqual(expected.remaining_token_max, observed.remaining_token_max)
+        self.assertEqual(expected.is_precise, observed.is_precise)
+
+    def test_identical_to_single_place_heuristic(self):
+        place_to_index: dict = self.net.get_incidence_index().place_to_index
+        for number_events in [1, 3, 10, 25]:
+            for _ in range(10):
+                run: Run = self.make_random_run(number_events)
+                multi_place_result: MultiPlaceHeuristicResult = do_multi_place_heuristic_for_token_analysis(run, self.net)
+                for place in self.net.inner_places:
+                    for is_backward_heuristic in [False, True]:
+                        expected: SinglePlaceTokenResult = do_brute_force_heuristic_for_token_analysis(run, self.net, place,
+                                                                                                       is_backward_heuristic)
+                        observed: SinglePlaceTokenResult = multi_place_result.get_single_place_result(place_to_index[place],
+                                                                                                      is_backward_heuristic)
+                        self.check_token_result_against_expected(expected, observed)
+
+    def test_identical_log_results(self):
+        """
+        Places decided by the forward heuristic are accumulated directly from the lists of the multi place heuristic.
+        """
+        event_log: PartiallyOrderedEventLog = PartiallyOrderedEventLog({self.make_random_run(number_events): number_events
+                                                                        for number_events in [1, 3, 10, 25, 25]})
+        for do_calculate_precise_result in [True, False]:
+            expected: PartiallyOrderedLogConformanceResult = calculate_token_replay_conformance_norm_for_partial_order(
+                event_log, self.net, do_calculate_precise_result)
+            observed: PartiallyOrderedLogConformanceResult = calculate_token_replay_conformance_norm_for_partial_order(
+                event_log, self.net, do_calculate_precise_result, use_multi_place_heuristic=True)
+            self.assertEqual(expected.lower_bound_conformance, observed.lower_bound_conformance)
+            self.assertEqual(expected.upper_bound_conformance, observed.upper_bound_conformance)
+            for place_name, expected_statistic in expected.place_to_decision_statistic.items():
+                self.assertEqual(vars(expected_statistic), vars(observed.place_to_decision_statistic[place_name]))
+            for run, expected_run_result in expected.run_to_conformance_result.items():
+                self.assertEqual(vars(expected_run_result), vars(observed.run_to_conformance_result[run]))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,82 @@
+import random
+import unittest
+
+from MasterThesisProject.source.algorithms.ConformanceMeasureAlgorithm import calculate_token_replay_conformance_norm_for_partial_order
+from MasterThesisProject.source.algorithms.FindTotalOrderForPartialOrder import find_total_order_for_run
+from MasterThesisProject.source.structures.CompactRepresentations import CompactWorkflowNet, CompactRun
+from MasterThesisProject.source.structures.PartiallyOrderedEventLog import PartiallyOrderedEventLog
+from MasterThesisProject.source.structures.PartiallyOrderedLogConformanceResult import PartiallyOrderedLogConformanceResult
+from MasterThesisProject.source.structures.Run import Event4Run, Run
+from MasterThesisProject.source.structures.TokenResultCache import TokenResultCache
+from MasterThesisProject.source.structures.WorkflowNet import PlaceWorkflowNet, TransitionWorkflowNet
+from MasterThesisProject.test.algorithms.ConformanceResultTestCase import make_random_workflow_net, make_random_partial_order_run
+
+
+class ParallelConformanceMeasureTestcases(unittest.TestCase):
+
+    def setUp(self):
+        """
+        Random net with an additional transition that does not belong to the net.
+        :return:
+        """
+        self.random_generator: random.Random = random.Random(11)
+        self.net, self.transitions = make_random_workflow_net(8, 6, 0.3, self.random_generator)
+        first_place: PlaceWorkflowNet = min(self.net.inner_places, key=lambda place: place.name)
+        self.foreign_transition: TransitionWorkflowNet = TransitionWorkflowNet("Not in net", preset={first_place}, postset=set())
+
+    def make_random_run(self, number_events: int, labels: list[TransitionWorkflowNet]) -> Run:
+        run: Run = make_random_partial_order_run(labels, number_events, 0.2, self.random_generator)
+        run.name_foreign_source = "Run with %d events" % number_events
+        return run
+
+    def test_compact_run_keeps_structure(self):
+        run: Run = self.make_random_run(12, self.transitions + [self.foreign_transition])
+        run.total_order = find_total_order_for_run(run)
+        compact_net, transition_to_index = CompactWorkflowNet.make_class_instance_from_workflow_net(self.net, [run])
+        net, transitions = compact_net.make_workflow_net()
+        rebuilt_run: Run = CompactRun.make_class_instance_from_run(run, transition_to_index).make_run(transitions)
+        self.assertEqual({place.name for place in self.net.places}, {place.name for place in net.places})
+        self.assertEqual(len(self.net.transitions), len(net.transitions))
+        self.assertEqual(run.name_foreign_source, rebuilt_run.name_foreign_source)
+        events: list[Event4Run] = list(run.partial_order)
+        rebuilt_events: list[Event4Run] = list(rebuilt_run.partial_order)
+        self.assertEqual([event.label.name for event in events], [event.label.name for event in rebuilt_events])
+        self.assertEqual([(events.index(source), events.index(target)) for source, target in run.partial_order.edges()],
+                         [(rebuilt_events.index(source), rebuilt_events.index(target)) for source, target in rebuilt_run.partial_order.edges()])
+        self.assertEqual([events.index(event) for event in run.total_order.order],
+                         [rebuilt_events.index(event) for event in rebuilt_run.total_order.order])
+
+    def test_identical_to_serial_results(self):
+        runs: list[Run] = [self.make_random_run(number_events, self.transitions) for number_events in [1, 4, 9, 15] for _ in range(4)]
+        runs.append(self.make_random_run(6, self.transitions + [self.foreign_transition]))
+        event_log: PartiallyOrderedEventLog = PartiallyOrderedEventLog({run: index + 1 for index, run in enumerate(runs)})
+        for do_calculate_precise_result, use_batch_heuristic_kernel in [(True, False), (False, False), (True, True)]:
+            expected: PartiallyOrderedLogConformanceResult = calculate_token_replay_conformance_norm_for_partial_order(
+                event_log, self.net, do_calculate_precise_result, use_batch_heuristic_kernel=use_batch_heuristic_kernel)
+            observed: PartiallyOrderedLogConformanceResult = calculate_token_replay_conformance_norm_for_partial_order(
+                event_log, self.net, do_calculate_precise_result, use_batch_heuristic_kernel=use_batch_heuristic_kernel, workers=3)
+            expected_values: dict = dict(vars(expected))
+            observed_values: dict = dict(vars(observed))
+            for key in ["run_to_conformance_result", "place_to_decision_statistic"]:
+                expected_values.pop(key)
+                observed_values.pop(key)
+            self.assertEqual(expected_values, observed_values)
+            self.assertEqual(list(expected.place_to_decision_statistic.keys()), list(observed.place_to_decision_statistic.keys()))
+            for place_name, expected_statistic in expected.place_to_decision_statistic.items():
+                self.assertEqual(vars(expected_statistic), vars(observed.place_to_decision_statistic[place_name]))
+            self.assertEqual(runs, list(observed.run_to_conformance_result.keys()))
+            for run in runs:
+                self.assertEqual(vars(expected.run_to_conformance_result[run]), vars(observed.run_to_conformance_result[run]))
+
+    def test_token_result_cache_is_not_supported(self):
+        event_log: PartiallyOrderedEventLog = PartiallyOrderedEventLog({self.make_random_run(5, self.transitions): 1})
+        with self.assertRaises(Exception):
+            calculate_token_replay_conformance_norm_for_partial_order(event_log, self.net, True, workers=2,
+                                                                      token_result_cache=TokenResultCache())
+        with self.assertRaises(Exception):
+            calculate_token_replay_conformance_norm_for_partial_order(event_log, self.net, True, use_batch_heuristic_kernel=True,
+                                                                      token_result_cache=TokenResultCache())
+
+
+if __name__ == '__main__':
+    unittest.main()
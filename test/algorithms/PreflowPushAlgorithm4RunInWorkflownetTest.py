@@ -1,12 +1,19 @@
+import random
 import unittest
 
+import networkx as nx
 from networkx import DiGraph
 
 from MasterThesisProject.source.algorithms.FindTotalOrderForPartialOrder import find_total_order_for_run
-from MasterThesisProject.source.algorithms.PreflowPushAlgorithm4RunInWorkflownet import find_optimal_tokenflow_for_place
+from MasterThesisProject.source.algorithms.PreflowPushAlgorithm4RunInWorkflownet import find_optimal_tokenflow_for_place, \
+    build_maximal_flow_problem, calculate_maximal_flow, MaxFlowNetwork, FlowNetworkSkeleton4Run
+from MasterThesisProject.source.algorithms.PreflowPushAlgorithmCsrArrays import find_optimal_tokenflow_for_place_csr
+from MasterThesisProject.source.algorithms.BruteForceHeuristic import do_brute_force_heuristic_for_token_analysis
+from MasterThesisProject.source.benchmarks.BenchmarkMaxFlowEngines import make_adversarial_run_for_place, make_random_run_for_place
+from MasterThesisProject.source.structures.HeuristicTokenFlow4Place import HeuristicTokenFlow4Place
 from MasterThesisProject.source.structures.Run import Event4Run, Run
 from MasterThesisProject.source.structures.SinglePlaceTokenResult import SinglePlaceTokenResult
-from MasterThesisProject.source.structures.WorkflowNet import PlaceWorkflowNet, TransitionWorkflowNet
+from MasterThesisProject.source.structures.WorkflowNet import PlaceWorkflowNet, TransitionWorkflowNet, WorkflowNet
 
 
 class PreflowPushAlgorithmTestcases(unittest.TestCase):
@@ -148,6 +155,104 @@ class PreflowPushAlgorithmTestcases(unittest.TestCase):
         self.assertEqual(result.remaining_token_max, 0)
         self.assertEqual(result.remaining_token_min, 0)
 
+    def test_adversarial_run(self):
+        """
+        All but one of the produced tokens enter a long chain and have to be pushed back. With the gap heuristic the
+        whole chain is lifted at once instead of relabeling every node of the chain up to the size of the network.
+        :return:
+        """
+        for width, chain_length in [(5, 20), (40, 400)]:
+            run: Run = make_adversarial_run_for_place(self.place, width, chain_length)
+            flow_network: MaxFlowNetwork = build_maximal_flow_problem(self.place, run, width + 1, width)
+            self.assertEqual(1, calculate_maximal_flow(flow_network))
+            self.assertGreaterEqual(flow_network.number_gap_relabels, 1)
+            self.assertLessEqual(flow_network.number_relabels, 2 * width)
+            # every token is pushed once along the chain and the others are not pushed back at all
+            self.assertLessEqual(flow_network.number_pushes, (width + 1) * (chain_length + 3))
+            result: SinglePlaceTokenResult = find_optimal_tokenflow_for_place(self.place, run, None)
+            self.assertEqual(width, result.missing_token_min)
+            self.assertEqual(width - 1, result.remaining_token_min)
+
+    def test_maximal_flow_against_networkx(self):
+        """
+        Random runs are large enough that also the global relabeling is used.
+        :return:
+        """
+        random_generator: random.Random = random.Random(3)
+        number_global_relabels: int = 0
+        for number_events in [1, 5, 20, 200]:
+            for _ in range(5):
+                run: Run = make_random_run_for_place(self.place, number_events, random_generator)
+                consumed_token: int = sum(1 for transition in run.labels.values() if self.place in transition.preset)
+                produced_token: int = sum(1 for transition in run.labels.values() if self.place in transition.postset)
+                flow_network: MaxFlowNetwork = build_maximal_flow_problem(self.place, run, consumed_token, produced_token)
+                expected: int = nx.maximum_flow_value(flow_network.network, flow_network.source, flow_network.sink)
+                self.assertEqual(expected, calculate_maximal_flow(flow_network))
+                self.assertLessEqual(flow_network.number_relabels, flow_network.network.number_of_nodes() ** 2)
+                number_global_relabels += flow_network.number_global_relabels
+        self.assertGreater(number_global_relabels, 0)
+
+    def test_warm_start_from_forward_heuristic(self):
+        """
+        The token flow of the forward heuristic is a feasible flow; starting from it gives the same maximal flow with
+        less pushes.
+        :return:
+        """
+        start_place: PlaceWorkflowNet = PlaceWorkflowNet("Start")
+        end_place: PlaceWorkflowNet = PlaceWorkflowNet("End")
+        random_generator: random.Random = random.Random(1)
+        number_pushes_cold_start: int = 0
+        number_pushes_warm_start: int = 0
+        for number_events in [1, 5, 30, 100]:
+            for _ in range(10):
+                run: Run = make_random_run_for_place(self.place, number_events, random_generator)
+                transitions: set[TransitionWorkflowNet] = set(run.labels.values())
+                transitions.update([TransitionWorkflowNet("Start", preset={start_place}, postset=set()),
+                                    TransitionWorkflowNet("End", preset=set(), postset={end_place})])
+                net: WorkflowNet = WorkflowNet.make_class_instance_from_transitions(transitions, start_place, end_place)
+                token_flow: HeuristicTokenFlow4Place = HeuristicTokenFlow4Place()
+                heuristic: SinglePlaceTokenResult = do_brute_force_heuristic_for_token_analysis(run, net, self.place, False, token_flow)
+                self.assertEqual(heuristic.consumed_token - heuristic.missing_token_max, token_flow.get_flow_value())
+                # without a skeleton, the two networks are independent
+                cold_start: MaxFlowNetwork = build_maximal_flow_problem(self.place, run, heuristic.consumed_token, heuristic.produced_token)
+                warm_start: MaxFlowNetwork = build_maximal_flow_problem(self.place, run, heuristic.consumed_token, heuristic.produced_token)
+                self.assertEqual(calculate_maximal_flow(cold_start), calculate_maximal_flow(warm_start, token_flow))
+                number_pushes_cold_start += cold_start.number_pushes
+                number_pushes_warm_start += warm_start.number_pushes
+        self.assertLess(number_pushes_warm_start, number_pushes_cold_start)
+
+    def test_skeleton_reused_for_all_places(self):
+        """
+        The networks of different places of the same run share one skeleton; the arcs of the previous place must not
+        influence the result.
+        :return:
+        """
+        random_generator: random.Random = random.Random(4)
+        places: list[PlaceWorkflowNet] = [PlaceWorkflowNet("Place %d" % index) for index in range(4)]
+        transitions: list[TransitionWorkflowNet] = []
+        for index in range(6):
+            transition: TransitionWorkflowNet = TransitionWorkflowNet("Transition %d" % index)
+            transition.add_place_iteration_to_preset(place for place in places if random_generator.random() < 0.4)
+            transition.add_place_iteration_to_postset(place for place in places if random_generator.random() < 0.4)
+            transitions.append(transition)
+        for number_events in [1, 10, 40]:
+            events: list[Event4Run] = [Event4Run("Event %d" % index, random_generator.choice(transitions)) for index in range(number_events)]
+            partial_order: DiGraph = DiGraph()
+            partial_order.add_nodes_from(events)
+            partial_order.add_edges_from((events[first], events[second]) for first in range(number_events)
+                                         for second in range(first + 1, number_events) if random_generator.random() < 0.1)
+            run: Run = Run(partial_order)
+            run.total_order = find_total_order_for_run(run)
+            skeleton: FlowNetworkSkeleton4Run = FlowNetworkSkeleton4Run(run)
+            # every place twice, so every place follows another one
+            for place in places + places[::-1]:
+                result: SinglePlaceTokenResult = find_optimal_tokenflow_for_place(place, run, None, flow_network_skeleton=skeleton)
+                self.assertEqual(str(find_optimal_tokenflow_for_place(place, run, None)), str(result))
+                self.assertEqual(str(find_optimal_tokenflow_for_place_csr(place, run, None)), str(result))
+            other_run: Run = Run(partial_order.copy())
+            with self.assertRaises(Exception):
+                build_maximal_flow_problem(places[0], other_run, 1, 1, skeleton)
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,126 @@
+import random
+import unittest
+
+from networkx import DiGraph
+
+from MasterThesisProject.source.algorithms.BruteForceHeuristic import do_brute_force_heuristic_for_token_analysis
+from MasterThesisProject.source.algorithms.FindTotalOrderForPartialOrder import find_total_order_for_run
+from MasterThesisProject.source.algorithms.PreflowPushAlgorithm4RunInWorkflownet import find_optimal_tokenflow_for_place
+from MasterThesisProject.source.algorithms.PreflowPushAlgorithmCsrArrays import find_optimal_tokenflow_for_place_csr, \
+    build_csr_flow_network_for_place, CsrMaxFlowNetwork
+from MasterThesisProject.source.benchmarks.BenchmarkMaxFlowEngines import make_random_run_for_place, make_adversarial_run_for_place
+from MasterThesisProject.source.structures.HeuristicTokenFlow4Place import HeuristicTokenFlow4Place
+from MasterThesisProject.source.structures.Run import Event4Run, Run
+from MasterThesisProject.source.structures.SinglePlaceTokenResult import SinglePlaceTokenResult
+from MasterThesisProject.source.structures.WorkflowNet import PlaceWorkflowNet, TransitionWorkflowNet, WorkflowNet
+
+
+class PreflowPushAlgorithmCsrArraysTestcases(unittest.TestCase):
+
+    def setUp(self):
+        """
+        Same setup as for the networkx based implementation: one place and one transition for each combination of
+        'doesProduce'/'doesConsume'.
+        :return:
+        """
+        self.place = PlaceWorkflowNet("UniversalTestPlace", set(), set())
+        self.transition_nothing = TransitionWorkflowNet("Test transition, not consuming or producing", preset=set(), postset=set())
+        self.transition_only_consuming = TransitionWorkflowNet("Test transition, only consuming", preset={self.place}, postset=set())
+        self.transition_only_producing = TransitionWorkflowNet("Test transition, only producing", preset=set(), postset={self.place})
+
+    def check_token_result_against_expected(self, expected: SinglePlaceTokenResult, observed: SinglePlaceTokenResult):
+        self.assertEqual(expected.produced_token, observed.produced_token)
+        self.assertEqual(expected.consumed_token, observed.consumed_token)
+        self.assertEqual(expected.missing_token_min, observed.missing_token_min)
+        self.assertEqual(expected.missing_token_max, observed.missing_token_max)
+        self.assertEqual(expected.remaining_token_min, observed.remaining_token_min)
+        self.assertEqual(expected.remaining_token_max, observed.remaining_token_max)
+        self.assertEqual(expected.is_precise, observed.is_precise)
+
+    def test_first_example(self):
+        """
+        The structure of the run is the same as in the first example for the networkx based implementation.
+        E3 is producing, E4, E6, E7 are consuming.
+        :return:
+        """
+        event_1: Event4Run = Event4Run("Event 1", self.transition_nothing)
+        event_2: Event4Run = Event4Run("Event 2", self.transition_nothing)
+        event_3: Event4Run = Event4Run("Event 3", self.transition_only_producing)
+        event_4: Event4Run = Event4Run("Event 4", self.transition_only_consuming)
+        event_5: Event4Run = Event4Run("Event 5", self.transition_nothing)
+        event_6: Event4Run = Event4Run("Event 6", self.transition_only_consuming)
+        event_7: Event4Run = Event4Run("Event 7", self.transition_only_consuming)
+        partial_order: DiGraph = DiGraph()
+        partial_order.add_edges_from([(event_1, event_3), (event_3, event_5), (event_2, event_4), (event_4, event_5),
+                                      (event_5, event_6), (event_5, event_7)])
+        run: Run = Run(partial_order)
+        run.total_order = find_total_order_for_run(run)
+        result: SinglePlaceTokenResult = find_optimal_tokenflow_for_place_csr(self.place, run, None)
+        self.check_token_result_against_expected(SinglePlaceTokenResult(1, 3, 2, 2, 0, 0), result)
+
+    def test_impossible_consumption(self):
+        """
+        The only consuming event happens before both producing events, so no token can be consumed.
+        :return:
+        """
+        event_1: Event4Run = Event4Run("Event 1", self.transition_only_consuming)
+        event_2: Event4Run = Event4Run("Event 2", self.transition_only_producing)
+        event_3: Event4Run = Event4Run("Event 3", self.transition_only_producing)
+        partial_order: DiGraph = DiGraph()
+        partial_order.add_edges_from([(event_1, event_2), (event_1, event_3)])
+        run: Run = Run(partial_order)
+        run.total_order = find_total_order_for_run(run)
+        result: SinglePlaceTokenResult = find_optimal_tokenflow_for_place_csr(self.place, run, None)
+        self.check_token_result_against_expected(SinglePlaceTokenResult(2, 1, 1, 1, 2, 2), result)
+
+    def test_identical_results_on_random_runs(self):
+        """
+        Both engines have to agree on random runs of different sizes.
+        :return:
+        """
+        random_generator: random.Random = random.Random(1)
+        for number_events in [1, 2, 5, 10, 30, 200]:
+            for _ in range(20):
+                run: Run = make_random_run_for_place(self.place, number_events, random_generator)
+                expected: SinglePlaceTokenResult = find_optimal_tokenflow_for_place(self.place, run, None)
+                observed: SinglePlaceTokenResult = find_optimal_tokenflow_for_place_csr(self.place, run, None)
+                self.check_token_result_against_expected(expected, observed)
+
+    def test_adversarial_run(self):
+        """
+        See the test of the networkx based implementation: the gap heuristic lifts the whole chain at once.
+        :return:
+        """
+        for width, chain_length in [(5, 20), (40, 400)]:
+            run: Run = make_adversarial_run_for_place(self.place, width, chain_length)
+            flow_network: CsrMaxFlowNetwork = build_csr_flow_network_for_place(self.place, run, width + 1)
+            self.assertEqual(1, flow_network.calculate_maximal_flow())
+            self.assertGreaterEqual(flow_network.number_gap_relabels, 1)
+            self.assertLessEqual(flow_network.number_relabels, 2 * width)
+            self.assertLessEqual(flow_network.number_pushes, (width + 1) * (chain_length + 3))
+            self.check_token_result_against_expected(find_optimal_tokenflow_for_place(self.place, run, None),
+                                                     find_optimal_tokenflow_for_place_csr(self.place, run, None))
+
+    def test_warm_start_from_forward_heuristic(self):
+        """
+        Starting from the token flow of the forward heuristic gives the same results as the networkx based implementation.
+        :return:
+        """
+        start_place: PlaceWorkflowNet = PlaceWorkflowNet("Start")
+        end_place: PlaceWorkflowNet = PlaceWorkflowNet("End")
+        random_generator: random.Random = random.Random(2)
+        for number_events in [1, 5, 30, 100]:
+            for _ in range(10):
+                run: Run = make_random_run_for_place(self.place, number_events, random_generator)
+                transitions: set[TransitionWorkflowNet] = set(run.labels.values())
+                transitions.update([TransitionWorkflowNet("Start", preset={start_place}, postset=set()),
+                                    TransitionWorkflowNet("End", preset=set(), postset={end_place})])
+                net: WorkflowNet = WorkflowNet.make_class_instance_from_transitions(transitions, start_place, end_place)
+                token_flow: HeuristicTokenFlow4Place = HeuristicTokenFlow4Place()
+                heuristic: SinglePlaceTokenResult = do_brute_force_heuristic_for_token_analysis(run, net, self.place, False, token_flow)
+                self.check_token_result_against_expected(find_optimal_tokenflow_for_place(self.place, run, heuristic),
+                                                         find_optimal_tokenflow_for_place_csr(self.place, run, heuristic, token_flow))
+
+
+if __name__ == '__main__':
+    unittest.main()
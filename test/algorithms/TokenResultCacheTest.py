@@ -0,0 +1,107 @@
+import random
+import unittest
+
+from networkx import DiGraph
+
+from MasterThesisProject.source.algorithms.ConformanceMeasureAlgorithm import calculate_token_replay_conformance_norm_for_partial_order
+from MasterThesisProject.source.algorithms.FindTotalOrderForPartialOrder import find_total_order_for_run
+from MasterThesisProject.source.structures.PartiallyOrderedEventLog import PartiallyOrderedEventLog
+from MasterThesisProject.source.structures.PartiallyOrderedLogConformanceResult import PartiallyOrderedLogConformanceResult
+from MasterThesisProject.source.structures.Run import Event4Run, Run
+from MasterThesisProject.source.structures.TokenResultCache import TokenResultCache
+from MasterThesisProject.source.structures.WorkflowNet import PlaceWorkflowNet, TransitionWorkflowNet, WorkflowNet
+from MasterThesisProject.test.algorithms.ConformanceResultTestCase import ConformanceResultTestCase, make_random_workflow_net, \
+    make_random_partial_order_run
+
+
+class TokenResultCacheTestcases(ConformanceResultTestCase):
+
+    def setUp(self):
+        self.random_generator: random.Random = random.Random(5)
+
+    def make_random_log(self, transitions: list[TransitionWorkflowNet], seed: int) -> PartiallyOrderedEventLog:
+        """
+        Every run is contained twice, so the second one is the same variant.
+        """
+        structure_generator: random.Random = random.Random(seed)
+        run_to_frequency: dict[Run, int] = dict()
+        for number_events in [2, 5, 9, 14]:
+            structure_seed: float = structure_generator.random()
+            for frequency in [1, 3]:
+                run: Run = make_random_partial_order_run(transitions, number_events, 0.25, random.Random(structure_seed))
+                run.total_order = find_total_order_for_run(run)
+                run_to_frequency[run] = frequency
+        return PartiallyOrderedEventLog(run_to_frequency)
+
+    def test_least_recently_used_eviction(self):
+        cache: TokenResultCache = TokenResultCache(maximal_size=2)
+        cache.put(("first",), 1)
+        cache.put(("second",), 2)
+        self.assertEqual(1, cache.get(("first",)))
+        cache.put(("third",), 3)
+        self.assertIsNone(cache.get(("second",)))
+        self.assertEqual(1, cache.get(("first",)))
+        self.assertEqual(3, cache.get(("third",)))
+        self.assertEqual(3, cache.hits)
+        self.assertEqual(1, cache.misses)
+
+    def test_identical_results_in_one_net(self):
+        net, transitions = make_random_workflow_net(8, 5, 0.3, self.random_generator)
+        event_log: PartiallyOrderedEventLog = self.make_random_log(transitions, 1)
+        for do_calculate_precise_result in [True, False]:
+            cache: TokenResultCache = TokenResultCache()
+            expected: PartiallyOrderedLogConformanceResult = calculate_token_replay_conformance_norm_for_partial_order(
+                event_log, net, do_calculate_precise_result)
+            observed: PartiallyOrderedLogConformanceResult = calculate_token_replay_conformance_norm_for_partial_order(
+                event_log, net, do_calculate_precise_result, token_result_cache=cache)
+            self.check_same_results(expected, observed)
+            # every run is there twice, the second one finds all places it touches in the cache
+            self.assertGreaterEqual(cache.hits, sum(len(net.get_incidence_index().get_touched_inner_place_indices(run.labels.values()))
+                                                    for run, frequency in event_log.run_to_frequency.items() if frequency == 3))
+
+    def test_identical_results_for_several_nets(self):
+        cache: TokenResultCache = TokenResultCache(maximal_size=50)
+        for _ in range(4):
+            net, transitions = make_random_workflow_net(6, 5, 0.3, self.random_generator)
+            # the same log imported for another net
+            event_log: PartiallyOrderedEventLog = self.make_random_log(transitions, 2)
+            expected: PartiallyOrderedLogConformanceResult = calculate_token_replay_conformance_norm_for_partial_order(event_log, net, True)
+            observed: PartiallyOrderedLogConformanceResult = calculate_token_replay_conformance_norm_for_partial_order(
+                event_log, net, True, use_multi_place_heuristic=True, token_result_cache=cache)
+            self.check_same_results(expected, observed)
+        self.assertLessEqual(len(cache.key_to_value), 50)
+        self.assertEqual(4, len(cache.run_variant_registry.run_key_to_variant_id))
+
+    def test_transitions_with_same_activity(self):
+        start_place: PlaceWorkflowNet = PlaceWorkflowNet("Start")
+        end_place: PlaceWorkflowNet = PlaceWorkflowNet("End")
+        place: PlaceWorkflowNet = PlaceWorkflowNet("P")
+        first_transition: TransitionWorkflowNet = TransitionWorkflowNet("T1", "A")
+        first_transition.add_place_to_preset(start_place)
+        first_transition.add_place_to_postset(place)
+        second_transition: TransitionWorkflowNet = TransitionWorkflowNet("T2", "A")
+        second_transition.add_place_to_preset(place)
+        end_transition: TransitionWorkflowNet = TransitionWorkflowNet("T3", "B")
+        end_transition.add_place_to_postset(end_place)
+        net: WorkflowNet = WorkflowNet.make_class_instance_from_transitions({first_transition, second_transition, end_transition}, start_place,
+                                                                            end_place)
+        run_to_frequency: dict[Run, int] = dict()
+        for labels in [[first_transition, second_transition, end_transition], [second_transition, first_transition, end_transition]]:
+            events: list[Event4Run] = [Event4Run("Event %d" % index, label) for index, label in enumerate(labels)]
+            partial_order: DiGraph = DiGraph()
+            partial_order.add_nodes_from(events)
+            partial_order.add_edges_from([(events[0], events[1]), (events[1], events[2])])
+            run: Run = Run(partial_order)
+            run.total_order = find_total_order_for_run(run)
+            run_to_frequency[run] = 1
+        event_log: PartiallyOrderedEventLog = PartiallyOrderedEventLog(run_to_frequency)
+        expected: PartiallyOrderedLogConformanceResult = calculate_token_replay_conformance_norm_for_partial_order(event_log, net, True)
+        observed: PartiallyOrderedLogConformanceResult = calculate_token_replay_conformance_norm_for_partial_order(
+            event_log, net, True, token_result_cache=TokenResultCache())
+        self.check_same_results(expected, observed)
+        second_run_result = observed.run_to_conformance_result[list(run_to_frequency)[1]]
+        self.assertEqual((1, 1), (second_run_result.missing_token_max, second_run_result.remaining_token_max))
+
+
+if __name__ == '__main__':
+    unittest.main()
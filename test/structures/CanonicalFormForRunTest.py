@@ -0,0 +1,98 @@
+import random
+import unittest
+
+from networkx import DiGraph
+
+from MasterThesisProject.source.algorithms.ConformanceMeasureAlgorithm import calculate_token_replay_conformance_norm_for_partial_order
+from MasterThesisProject.source.structures.CanonicalFormForRun import get_canonical_form_for_run, are_runs_isomorphic
+from MasterThesisProject.source.structures.PartiallyOrderedEventLog import PartiallyOrderedEventLog
+from MasterThesisProject.source.structures.PartiallyOrderedLogConformanceResult import PartiallyOrderedLogConformanceResult
+from MasterThesisProject.source.structures.Run import Event4Run, Run
+from MasterThesisProject.source.structures.WorkflowNet import PlaceWorkflowNet, TransitionWorkflowNet, WorkflowNet
+from MasterThesisProject.test.algorithms.ConformanceResultTestCase import make_random_workflow_net
+
+
+class CanonicalFormForRunTestcases(unittest.TestCase):
+
+    def setUp(self):
+        self.random_generator: random.Random = random.Random(3)
+        self.net, self.transitions = make_random_workflow_net(6, 4, 0.4, self.random_generator)
+
+    def make_random_run_structure(self, number_events: int) -> tuple[list[TransitionWorkflowNet], list[tuple[int, int]]]:
+        labels: list[TransitionWorkflowNet] = [self.random_generator.choice(self.transitions) for _ in range(number_events)]
+        edges: list[tuple[int, int]] = [(first, second) for first in range(number_events) for second in range(first + 1, number_events)
+                                        if self.random_generator.random() < 0.3]
+        return labels, edges
+
+    def make_run(self, labels: list[TransitionWorkflowNet], edges: list[tuple[int, int]], shuffle: bool) -> Run:
+        """
+        :param shuffle: if true the events are named and added in another order, which gives an isomorphic run
+        """
+        positions: list[int] = list(range(len(labels)))
+        if shuffle:
+            self.random_generator.shuffle(positions)
+        events: dict[int, Event4Run] = {position: Event4Run("Event %d" % position, labels[position]) for position in positions}
+        partial_order: DiGraph = DiGraph()
+        partial_order.add_nodes_from(events[position] for position in positions)
+        shuffled_edges: list[tuple[int, int]] = list(edges)
+        if shuffle:
+            self.random_generator.shuffle(shuffled_edges)
+        partial_order.add_edges_from((events[first], events[second]) for first, second in shuffled_edges)
+        return Run(partial_order)
+
+    def test_isomorphic_runs(self):
+        for number_events in [1, 4, 8, 15]:
+            labels, edges = self.make_random_run_structure(number_events)
+            run: Run = self.make_run(labels, edges, False)
+            shuffled_run: Run = self.make_run(labels, edges, True)
+            self.assertEqual(get_canonical_form_for_run(run).hash_value, get_canonical_form_for_run(shuffled_run).hash_value)
+            self.assertTrue(are_runs_isomorphic(run, shuffled_run))
+
+    def test_different_runs(self):
+        first_run: Run = self.make_run([self.transitions[0], self.transitions[1], self.transitions[1]], [(0, 1), (1, 2)], False)
+        # same labels, but the two events with the same label are concurrent
+        second_run: Run = self.make_run([self.transitions[0], self.transitions[1], self.transitions[1]], [(0, 1), (0, 2)], False)
+        # same structure, but other labels
+        third_run: Run = self.make_run([self.transitions[0], self.transitions[1], self.transitions[2]], [(0, 1), (1, 2)], False)
+        self.assertFalse(are_runs_isomorphic(first_run, second_run))
+        self.assertFalse(are_runs_isomorphic(first_run, third_run))
+        self.assertNotEqual(get_canonical_form_for_run(first_run).hash_value, get_canonical_form_for_run(second_run).hash_value)
+
+    def test_merge_isomorphic_runs(self):
+        run_to_frequency: dict[Run, int] = dict()
+        expected_number_classes: int = 0
+        for number_events in [3, 6, 10]:
+            labels, edges = self.make_random_run_structure(number_events)
+            expected_number_classes += 1
+            for frequency in [1, 2, 5]:
+                run_to_frequency[self.make_run(labels, edges, True)] = frequency
+        event_log: PartiallyOrderedEventLog = PartiallyOrderedEventLog(run_to_frequency)
+        merged_log: PartiallyOrderedEventLog = event_log.merge_isomorphic_runs()
+        self.assertEqual(expected_number_classes, len(merged_log.run_to_frequency))
+        self.assertEqual([8] * expected_number_classes, list(merged_log.run_to_frequency.values()))
+        self.assertEqual(list(run_to_frequency), [run for runs in merged_log.run_to_merged_runs.values() for run in runs])
+        result: PartiallyOrderedLogConformanceResult = calculate_token_replay_conformance_norm_for_partial_order(event_log, self.net, True)
+        merged_result: PartiallyOrderedLogConformanceResult = calculate_token_replay_conformance_norm_for_partial_order(merged_log, self.net,
+                                                                                                                        True)
+        self.assertAlmostEqual(result.conformance_level, merged_result.conformance_level, places=12)
+
+    def test_transitions_with_same_activity(self):
+        start_place: PlaceWorkflowNet = PlaceWorkflowNet("Start")
+        end_place: PlaceWorkflowNet = PlaceWorkflowNet("End")
+        place: PlaceWorkflowNet = PlaceWorkflowNet("P")
+        first_transition: TransitionWorkflowNet = TransitionWorkflowNet("T1", "A")
+        first_transition.add_place_to_preset(start_place)
+        first_transition.add_place_to_postset(place)
+        second_transition: TransitionWorkflowNet = TransitionWorkflowNet("T2", "A")
+        second_transition.add_place_to_preset(place)
+        end_transition: TransitionWorkflowNet = TransitionWorkflowNet("T3", "B")
+        end_transition.add_place_to_postset(end_place)
+        first_run: Run = self.make_run([first_transition, second_transition, end_transition], [(0, 1), (1, 2)], False)
+        second_run: Run = self.make_run([second_transition, first_transition, end_transition], [(0, 1), (1, 2)], False)
+        self.assertFalse(are_runs_isomorphic(first_run, second_run))
+        merged_log: PartiallyOrderedEventLog = PartiallyOrderedEventLog({first_run: 1, second_run: 1}).merge_isomorphic_runs()
+        self.assertEqual(2, len(merged_log.run_to_frequency))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,54 @@
+import random
+import unittest
+from concurrent.futures import ProcessPoolExecutor
+
+from MasterThesisProject.source.benchmarks.SyntheticGenerators import make_synthetic_workflow_net, make_synthetic_event_log
+from MasterThesisProject.source.structures.CompactRepresentations import CompactWorkflowNet
+from MasterThesisProject.source.structures.FlatEventLog import FlatEventLog, SharedFlatEventLog, SharedFlatEventLogDescriptor
+
+
+def count_events_of_shared_log(descriptor: SharedFlatEventLogDescriptor) -> list[int]:
+    # runs in another process
+    shared_log: SharedFlatEventLog = SharedFlatEventLog.attach(descriptor)
+    number_events: list[int] = [len(shared_log.flat_log.get_compact_run(run_index).event_transition_indices)
+                                for run_index in range(shared_log.flat_log.get_number_runs())]
+    shared_log.release()
+    return number_events
+
+
+class SharedFlatEventLogTestcases(unittest.TestCase):
+
+    def setUp(self):
+        random_generator: random.Random = random.Random(5)
+        self.net, transitions = make_synthetic_workflow_net(10, 8, 2, random_generator)
+        event_log = make_synthetic_event_log(transitions, 12, 3, 4, 0.5, random_generator)
+        _, transition_to_index = CompactWorkflowNet.make_class_instance_from_workflow_net(self.net, list(event_log.run_to_frequency))
+        self.flat_log: FlatEventLog = FlatEventLog.make_class_instance_from_event_log(event_log, transition_to_index)
+
+    def test_same_runs_in_shared_memory(self):
+        shared_log: SharedFlatEventLog = SharedFlatEventLog.make_class_instance_from_flat_log(self.flat_log)
+        attached_log: SharedFlatEventLog = SharedFlatEventLog.attach(shared_log.descriptor)
+        for array_name in FlatEventLog.ARRAY_NAMES:
+            self.assertEqual(getattr(self.flat_log, array_name).tolist(), getattr(attached_log.flat_log, array_name).tolist())
+        for run_index in range(self.flat_log.get_number_runs()):
+            self.assertEqual(vars(self.flat_log.get_compact_run(run_index)), vars(attached_log.flat_log.get_compact_run(run_index)))
+        # the attached arrays are views of the block and not copies
+        shared_log.flat_log.frequencies[0] = 42
+        self.assertEqual(42, attached_log.flat_log.frequencies[0])
+        attached_log.release()
+        shared_log.release()
+        with self.assertRaises(FileNotFoundError):
+            SharedFlatEventLog.attach(shared_log.descriptor)
+
+    def test_attach_in_worker(self):
+        shared_log: SharedFlatEventLog = SharedFlatEventLog.make_class_instance_from_flat_log(self.flat_log)
+        try:
+            with ProcessPoolExecutor(max_workers=1) as executor:
+                number_events: list[int] = executor.submit(count_events_of_shared_log, shared_log.descriptor).result()
+        finally:
+            shared_log.release()
+        self.assertEqual(self.flat_log.event_offsets[1:].tolist(), [sum(number_events[:index + 1]) for index in range(len(number_events))])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,89 @@
+import os
+import tempfile
+import unittest
+
+import pandas as pd
+from pandas import DataFrame
+
+from MasterThesisProject.source.algorithms.ConformanceMeasureAlgorithm import calculate_token_replay_conformance_norm_for_partial_order
+from MasterThesisProject.source.structures.PartiallyOrderedLogConformanceResult import PartiallyOrderedLogConformanceResult
+from MasterThesisProject.source.utils.ColumnarResultSink import ColumnarResultSink
+from MasterThesisProject.source.utils.ImportCCOxesFileToEventLog import import_cco_xes_file_to_event_log
+from MasterThesisProject.source.utils.ImporterPnmlFileToInternalWorkflowNet import import_pnml_file_to_workflow_net
+
+column_names_run_statistics: list[str] = ["Net name", "Run represent (PO/TO name)", "Run frequency", "Conformance level (maximum)",
+                                          "Conformance level (minimum)", "Invalid event label", "Missing Tokens (maximum)",
+                                          "Missing Tokens (minimum)", "Consumed Tokens", "Remaining Tokens (maximum)",
+                                          "Remaining Tokens (minimum)", "Produced Tokens"]
+
+
+class ColumnarResultSinkTest(unittest.TestCase):
+
+    def setUp(self):
+        # the log does not fit to the net, so every run has an invalid label
+        net, label_to_transition = import_pnml_file_to_workflow_net("reviewing_5.pnml")
+        self.event_log, self.invalid_run_to_false_label = import_cco_xes_file_to_event_log("Repair_alpha_logwise_oneRperPoVar.xes",
+                                                                                            label_to_transition)
+        self.net = net
+        self.result: PartiallyOrderedLogConformanceResult = calculate_token_replay_conformance_norm_for_partial_order(self.event_log, net, False)
+
+    def make_expected_run_statistics(self) -> DataFrame:
+        """
+        The run statistics as the experiments made them before, row by row.
+        """
+        expected: DataFrame = DataFrame(columns=column_names_run_statistics)
+        for run, run_result in self.result.run_to_conformance_result.items():
+            expected.loc[len(expected)] = ["reviewing_5", run.name_foreign_source, self.event_log.run_to_frequency[run],
+                                           run_result.conformance_level_max, run_result.conformance_level_min,
+                                           self.invalid_run_to_false_label.get(run.name_foreign_source), run_result.missing_token_max,
+                                           run_result.missing_token_min, run_result.consumed_token, run_result.remaining_token_max,
+                                           run_result.remaining_token_min, run_result.produced_token]
+        return expected
+
+    def test_same_frame_as_row_appends(self):
+        sink: ColumnarResultSink = ColumnarResultSink(column_names_run_statistics)
+        sink.add_run_results(["reviewing_5"], self.result.run_to_conformance_result, self.event_log.run_to_frequency,
+                             self.invalid_run_to_false_label)
+        expected: DataFrame = self.make_expected_run_statistics()
+        observed: DataFrame = sink.build_data_frame()
+        self.assertEqual(list(expected.columns), list(observed.columns))
+        self.assertEqual(expected.values.tolist(), observed.values.tolist())
+        place_names: list[str] = sorted(place.name for place in self.net.inner_places)
+        place_sink: ColumnarResultSink = ColumnarResultSink(["Log", "Place Name", "Forward heuristic", "Backward heuristic", "Maximal Flow",
+                                                             "Missing Tokens (maximum)", "Missing Tokens (minimum)", "Consumed Tokens",
+                                                             "Remaining Tokens (maximum)", "Remaining Tokens (minimum)", "Produced Tokens"])
+        place_sink.add_place_statistics(["Repair"], self.result.place_to_decision_statistic, place_names)
+        place_frame: DataFrame = place_sink.build_data_frame()
+        self.assertEqual(place_names, place_frame["Place Name"].tolist())
+        self.assertEqual([self.result.place_to_decision_statistic[place_name].consumed_token for place_name in place_names],
+                         place_frame["Consumed Tokens"].tolist())
+        with self.assertRaises(Exception):
+            place_sink.add_row(["Repair"])
+
+    def test_log_result_row(self):
+        row: list = ColumnarResultSink.make_log_result_row(["reviewing_5"], self.result, self.result.number_places_only_estimated)
+        self.assertEqual(["reviewing_5", self.result.upper_bound_conformance, self.result.lower_bound_conformance], row[:3])
+        self.assertEqual(self.result.produced_tokens, row[-1])
+        sink: ColumnarResultSink = ColumnarResultSink(["Net name"] + ["Column %d" % index for index in range(len(row) - 1)])
+        sink.add_log_result(["reviewing_5"], self.result, self.result.number_places_only_estimated)
+        self.assertEqual([row], sink.build_data_frame().values.tolist())
+
+    def test_chunks_written_to_file(self):
+        with tempfile.TemporaryDirectory() as directory:
+            file_path: str = os.path.join(directory, "run_statistics.csv")
+            sink: ColumnarResultSink = ColumnarResultSink(column_names_run_statistics, file_path, chunk_size=7)
+            sink.add_run_results(["reviewing_5"], self.result.run_to_conformance_result, self.event_log.run_to_frequency,
+                                 self.invalid_run_to_false_label)
+            self.assertLess(sink.get_number_buffered_rows(), 7)
+            sink.close()
+            self.assertEqual(len(self.result.run_to_conformance_result), sink.number_written_rows)
+            observed: DataFrame = pd.read_csv(file_path)
+            expected: DataFrame = self.make_expected_run_statistics()
+            expected.to_csv(os.path.join(directory, "expected.csv"), index=False)
+            self.assertTrue(pd.read_csv(os.path.join(directory, "expected.csv")).equals(observed))
+            with self.assertRaises(Exception):
+                sink.build_data_frame()
+
+
+if __name__ == '__main__':
+    unittest.main()
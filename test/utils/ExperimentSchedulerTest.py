@@ -0,0 +1,60 @@
+import os
+import tempfile
+import unittest
+
+from MasterThesisProject.source.utils.ExperimentScheduler import ExperimentTask, ExperimentCheckpoint, make_experiment_tasks, \
+    run_experiment_tasks, get_number_available_cores
+
+net_log_pairs: list[dict[str, str]] = [{"log": "first.xes", "net": "first.pnml"}, {"log": "second.xes", "net": "second.pnml"}]
+settings: dict = {"number_tests_per_pair": 2}
+
+
+def execute_task(task: ExperimentTask) -> list:
+    # module level, so the workers can unpickle it
+    return [task.net_log_pair["net"], task.method_index, task.iteration, os.getpid()]
+
+
+class ExperimentSchedulerTestcases(unittest.TestCase):
+
+    def test_tasks(self):
+        tasks: list[ExperimentTask] = make_experiment_tasks(net_log_pairs, 3, 2)
+        self.assertEqual(12, len(tasks))
+        self.assertEqual(12, len({task.get_key() for task in tasks}))
+        self.assertEqual(["first.pnml|first.xes"] * 6 + ["second.pnml|second.xes"] * 6, [task.get_pair_key() for task in tasks])
+
+    def test_resume_from_checkpoint(self):
+        tasks: list[ExperimentTask] = make_experiment_tasks(net_log_pairs, 3, 2)
+        with tempfile.TemporaryDirectory() as directory:
+            file_path: str = os.path.join(directory, "checkpoint.jsonl")
+            checkpoint: ExperimentCheckpoint = ExperimentCheckpoint(file_path, settings)
+            # the sweep is interrupted after five tasks
+            for number_done, (task, row) in enumerate(run_experiment_tasks(tasks, execute_task, checkpoint), 1):
+                self.assertEqual(task.method_index, row[1])
+                if number_done == 5:
+                    break
+            checkpoint.add_written_pair("first.pnml|first.xes")
+            # the last entry was only partly written when the process was killed
+            with open(file_path, "a") as file:
+                file.write('{"task": "second.pnml|sec')
+            resumed_checkpoint: ExperimentCheckpoint = ExperimentCheckpoint(file_path, settings)
+            self.assertEqual(5, len(resumed_checkpoint.task_key_to_row))
+            self.assertEqual({"first.pnml|first.xes"}, resumed_checkpoint.written_pair_keys)
+            resumed_tasks: list[ExperimentTask] = [task for task, _ in run_experiment_tasks(tasks, execute_task, resumed_checkpoint)]
+            self.assertEqual([task.get_key() for task in tasks[5:]], [task.get_key() for task in resumed_tasks])
+            self.assertEqual(12, len(ExperimentCheckpoint(file_path, settings).task_key_to_row))
+            with self.assertRaises(Exception):
+                ExperimentCheckpoint(file_path, {"number_tests_per_pair": 3})
+            self.assertEqual(0, len(ExperimentCheckpoint(file_path, {"number_tests_per_pair": 3}, do_resume=False).task_key_to_row))
+
+    @unittest.skipUnless(get_number_available_cores() > 1, "the workers need two cores")
+    def test_workers(self):
+        tasks: list[ExperimentTask] = make_experiment_tasks(net_log_pairs, 3, 2)
+        with tempfile.TemporaryDirectory() as directory:
+            checkpoint: ExperimentCheckpoint = ExperimentCheckpoint(os.path.join(directory, "checkpoint.jsonl"), settings)
+            task_key_to_row: dict[str, list] = {task.get_key(): row for task, row in run_experiment_tasks(tasks, execute_task, checkpoint, 2)}
+        self.assertEqual({task.get_key() for task in tasks}, set(task_key_to_row))
+        self.assertNotIn(os.getpid(), {row[3] for row in task_key_to_row.values()})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,76 @@
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from MasterThesisProject.source.algorithms.ConformanceMeasureAlgorithm import calculate_token_replay_conformance_norm_for_partial_order
+from MasterThesisProject.source.structures.FlatEventLog import FlatEventLog
+from MasterThesisProject.source.structures.PartiallyOrderedEventLog import PartiallyOrderedEventLog
+from MasterThesisProject.source.structures.PartiallyOrderedLogConformanceResult import PartiallyOrderedLogConformanceResult
+from MasterThesisProject.source.structures.Run import Run
+from MasterThesisProject.source.utils.ImportCache import import_net_and_log_with_cache
+
+
+class ImportCacheTest(unittest.TestCase):
+
+    def summarize_run(self, run: Run) -> tuple:
+        """
+        Everything of a run except for the names of the events and the activities of the valid events, which are not cached.
+        """
+        events: list = list(run.partial_order)
+        return (run.name_foreign_source, [event.label.name for event in events], run.has_contracted_events,
+                [event.activity for event in events if event.label.name == "INVALID TRANSITION"],
+                [(events.index(source), events.index(target)) for source, target in run.partial_order.edges()],
+                [events.index(event) for event in run.total_order.order])
+
+    def check_cached_import(self, net_file_path: str, log_file_path: str, is_partially_ordered_log: bool,
+                            include_runs_with_invalid_transitions: bool, compact_partial_orders: bool = False):
+        with tempfile.TemporaryDirectory() as cache_directory:
+            net, label_to_transition, log, invalid_labels = import_net_and_log_with_cache(
+                net_file_path, log_file_path, is_partially_ordered_log, include_runs_with_invalid_transitions, cache_directory,
+                compact_partial_orders)
+            self.assertEqual(1, len(os.listdir(cache_directory)))
+            cached_net, cached_label_to_transition, cached_log, cached_invalid_labels = import_net_and_log_with_cache(
+                net_file_path, log_file_path, is_partially_ordered_log, include_runs_with_invalid_transitions, cache_directory,
+                compact_partial_orders)
+            self.assertEqual({place.name for place in net.places}, {place.name for place in cached_net.places})
+            self.assertEqual({(transition.name, transition.activity_description) for transition in net.transitions},
+                             {(transition.name, transition.activity_description) for transition in cached_net.transitions})
+            self.assertEqual({label: transition.name for label, transition in label_to_transition.items()},
+                             {label: transition.name for label, transition in cached_label_to_transition.items()})
+            self.assertEqual(invalid_labels, cached_invalid_labels)
+            self.assertEqual([(self.summarize_run(run), frequency) for run, frequency in log.run_to_frequency.items()],
+                             [(self.summarize_run(run), frequency) for run, frequency in cached_log.run_to_frequency.items()])
+            self.check_same_conformance(log, net, cached_log, cached_net)
+            # the arrays are only memory mapped
+            flat_log: FlatEventLog = FlatEventLog.load(os.path.join(cache_directory, os.listdir(cache_directory)[0]))
+            self.assertIsInstance(flat_log.event_transitions, np.memmap)
+            # other flags give another entry
+            import_net_and_log_with_cache(net_file_path, log_file_path, is_partially_ordered_log, not include_runs_with_invalid_transitions,
+                                          cache_directory)
+            self.assertEqual(2, len(os.listdir(cache_directory)))
+
+    def check_same_conformance(self, log: PartiallyOrderedEventLog, net, cached_log: PartiallyOrderedEventLog, cached_net):
+        result: PartiallyOrderedLogConformanceResult = calculate_token_replay_conformance_norm_for_partial_order(log, net, True)
+        cached_result: PartiallyOrderedLogConformanceResult = calculate_token_replay_conformance_norm_for_partial_order(cached_log,
+                                                                                                                        cached_net, True)
+        self.assertEqual(result.conformance_level, cached_result.conformance_level)
+        self.assertEqual(result.number_places_decided_flow_network, cached_result.number_places_decided_flow_network)
+
+    def test_partially_ordered_log(self):
+        self.check_cached_import("8.pnml", "Repair_alpha_logwise_oneRperPoVar.xes", True, True)
+
+    def test_compacted_partially_ordered_log(self):
+        # the net does not know the activities of the log, so the invalid events are contracted
+        self.check_cached_import("roadtraffic_5.pnml", "Repair_alpha_logwise_oneRperPoVar.xes", True, True, True)
+
+    def test_totally_ordered_log(self):
+        self.check_cached_import("reviewing_5.pnml", "reviewing_complete_only.xes", False, False)
+
+    def test_totally_ordered_log_with_invalid_events(self):
+        self.check_cached_import("reviewing_5.pnml", "reviewing_complete_only.xes", False, True)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,9 +1,25 @@
+import os
+import tempfile
 import unittest
 
+from MasterThesisProject.source.structures.WorkflowNet import WorkflowNet, TransitionWorkflowNet
 from MasterThesisProject.source.utils.ImportCCOxesFileToEventLog import import_cco_xes_file_to_event_log, import_xes_file_totally_ordered_log
-from MasterThesisProject.source.utils.ImporterPnmlFileToInternalWorkflowNet import import_pnml_file_to_workflow_net
+from MasterThesisProject.source.utils.ImporterPnmlFileToInternalWorkflowNet import import_pnml_file_to_workflow_net, \
+    import_pnml_file_to_workflow_net_with_pm4py
 from pm4py.objects.petri_net.importer import importer as pnml_importer
 
+# start and end transition are invisible and there is no final marking, so the final place is the place without outgoing arcs
+small_pnml: str = """<?xml version="1.0" encoding="UTF-8"?>
+<pnml><net id="net1" type="http://www.pnml.org/version-2009/grammar/pnmlcoremodel"><page id="n0">
+<place id="source"><name><text>source</text></name><initialMarking><text>1</text></initialMarking></place>
+<place id="p1"/><place id="sink"/>
+<transition id="t1"><name><text>ArtificialStart</text></name><toolspecific tool="ProM" version="6.4" activity="$invisible$"/></transition>
+<transition id="t2"><name><text>Register</text></name></transition>
+<transition id="t3"><name><text>ArtificialEnd</text></name><toolspecific tool="ProM" version="6.4" activity="$invisible$"/></transition>
+<arc id="a1" source="source" target="t1"/><arc id="a2" source="t1" target="p1"/><arc id="a3" source="p1" target="t2"/>
+<arc id="a4" source="t2" target="p1"/><arc id="a5" source="p1" target="t3"/><arc id="a6" source="t3" target="sink"/>
+</page></net></pnml>"""
+
 
 class ImportTester(unittest.TestCase):
     def test_basic_imports(self):
@@ -27,6 +43,28 @@ class ImportTester(unittest.TestCase):
     def test_import_roadtraffic(self):
         net, name_to_transition = import_pnml_file_to_workflow_net("roadtraffic_5.pnml")
 
+    def describe_net(self, net: WorkflowNet, label_to_transition: dict[str, TransitionWorkflowNet]) -> tuple:
+        return (net.start_place.name, net.end_place.name, {place.name for place in net.places},
+                {(transition.name, transition.activity_description, frozenset(place.name for place in transition.preset),
+                  frozenset(place.name for place in transition.postset)) for transition in net.transitions},
+                {label: transition.name for label, transition in label_to_transition.items()})
+
+    def test_same_net_as_pm4py_import(self):
+        for file_name in ["8.pnml", "reviewing_5.pnml", "roadtraffic_5.pnml"]:
+            self.assertEqual(self.describe_net(*import_pnml_file_to_workflow_net_with_pm4py(file_name)),
+                             self.describe_net(*import_pnml_file_to_workflow_net(file_name)), file_name)
+
+    def test_invisible_start_and_end_without_final_marking(self):
+        with tempfile.TemporaryDirectory() as directory:
+            file_path: str = os.path.join(directory, "small.pnml")
+            with open(file_path, "w") as file:
+                file.write(small_pnml)
+            net, label_to_transition = import_pnml_file_to_workflow_net(file_path)
+            self.assertEqual(self.describe_net(*import_pnml_file_to_workflow_net_with_pm4py(file_path)), self.describe_net(net, label_to_transition))
+        self.assertEqual(("source", "sink"), (net.start_place.name, net.end_place.name))
+        self.assertEqual({"START": "t1", "Register": "t2", "END": "t3", "INVALID": "INVALID TRANSITION"},
+                         {label: transition.name for label, transition in label_to_transition.items()})
+        self.assertEqual("START", label_to_transition["START"].activity_description)
 
 
 
@@ -0,0 +1,51 @@
+import importlib.util
+import os
+import tempfile
+import unittest
+
+import pandas as pd
+from pandas import DataFrame
+
+from MasterThesisProject.source.utils.ColumnarResultSink import ColumnarResultSink
+
+# pyarrow is optional, it is only needed for the parquet datasets
+is_pyarrow_installed: bool = importlib.util.find_spec("pyarrow") is not None
+if is_pyarrow_installed:
+    from MasterThesisProject.source.utils.ParquetResultDataset import write_results_to_dataset, read_results_for_pair, \
+        write_master_file_from_dataset, scan_results_dataset, PARTITION_COLUMNS_GENERAL_RESULTS
+
+column_names: list[str] = ["Net name", "Log name", "Calculation method", "Run time", "Conformance level (maximum)", "Missing tokens (max)"]
+
+
+@unittest.skipUnless(is_pyarrow_installed, "pyarrow is not installed")
+class ParquetResultDatasetTest(unittest.TestCase):
+
+    def make_results(self, net_name: str) -> DataFrame:
+        sink: ColumnarResultSink = ColumnarResultSink(column_names)
+        for log_name in ["first_log", "second_log"]:
+            for method_index, method in enumerate(["Only heuristic", "Only flow network"]):
+                sink.add_row([net_name, log_name, method, 0.5 * method_index, 0.75, 3 + method_index])
+        return sink.build_data_frame()
+
+    def test_partitioned_dataset(self):
+        with tempfile.TemporaryDirectory() as directory:
+            dataset_directory: str = os.path.join(directory, "general")
+            for net_name in ["first_net", "second_net"]:
+                write_results_to_dataset(self.make_results(net_name), dataset_directory, PARTITION_COLUMNS_GENERAL_RESULTS)
+            self.assertEqual({"Net name=first_net", "Net name=second_net"}, set(os.listdir(dataset_directory)))
+            self.assertEqual(8, scan_results_dataset(dataset_directory).count_rows())
+            pair_results: DataFrame = read_results_for_pair(dataset_directory, "second_net", "first_log")
+            self.assertEqual(2, len(pair_results))
+            self.assertEqual({"second_net"}, set(pair_results["Net name"]))
+            self.assertEqual([3, 4], sorted(pair_results["Missing tokens (max)"].tolist()))
+            self.assertTrue(pd.api.types.is_integer_dtype(pair_results["Missing tokens (max)"]))
+            master_file_path: str = os.path.join(directory, "Masterfile_General")
+            write_master_file_from_dataset(dataset_directory, master_file_path, column_names)
+            master_file: DataFrame = pd.read_csv(master_file_path, index_col=0)
+            self.assertEqual(list(range(8)), master_file.index.tolist())
+            # the partition columns are at their place in the sink, not at the end
+            self.assertEqual(column_names, master_file.columns.tolist())
+
+
+if __name__ == '__main__':
+    unittest.main()
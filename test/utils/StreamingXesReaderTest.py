@@ -0,0 +1,125 @@
+import os
+import tempfile
+import unittest
+from datetime import datetime, timezone
+
+from MasterThesisProject.source.utils.ImportCCOxesFileToEventLog import import_cco_xes_file_to_event_log, \
+    import_xes_file_totally_ordered_log
+from MasterThesisProject.source.utils.ImporterPnmlFileToInternalWorkflowNet import import_pnml_file_to_workflow_net
+from MasterThesisProject.source.utils.StreamingXesReader import iterate_traces_of_xes_file, XesTrace
+
+
+class StreamingXesReaderTest(unittest.TestCase):
+    def test_read_po_file(self):
+        traces: list[XesTrace] = list(iterate_traces_of_xes_file("Repair_alpha_logwise_oneRperPoVar.xes"))
+        self.assertEqual(9, len(traces))
+        first_trace: XesTrace = traces[0]
+        self.assertEqual("1", first_trace.attributes["concept:name"])
+        self.assertEqual(524.0, first_trace.attributes["multiplicity"])
+        self.assertEqual(1.0, first_trace.attributes["po_name"])
+        first_event: dict = first_trace.events[0]
+        self.assertEqual(0, first_event["identity:id"])
+        self.assertEqual("Register", first_event["concept:name"])
+        self.assertEqual(datetime(1970, 1, 2, 12, 23, tzinfo=timezone.utc), first_event["time:timestamp"])
+        self.assertEqual([("0", "1")], first_event["po_successors"])
+        self.assertEqual([("0", "2"), ("1", "4")], first_trace.events[1]["po_successors"])
+
+    def test_only_requested_keys(self):
+        trace: XesTrace = next(iterate_traces_of_xes_file("Repair_alpha_logwise_oneRperPoVar.xes", {"concept:name"}, {"po_name"}))
+        self.assertEqual({"po_name": 1.0}, trace.attributes)
+        self.assertEqual({"concept:name": "Register"}, trace.events[0])
+
+    def test_import_po_file(self):
+        net, name_to_transition = import_pnml_file_to_workflow_net("8.pnml")
+        log, invalid_labels = import_cco_xes_file_to_event_log("Repair_alpha_logwise_oneRperPoVar.xes", name_to_transition)
+        self.assertEqual(9, len(log.run_to_frequency))
+        self.assertEqual({}, invalid_labels)
+        run = next(run for run in log.run_to_frequency if run.name_foreign_source == "1.0")
+        self.assertEqual(524, log.run_to_frequency[run])
+        names_to_event: dict = {event.name: event for event in run.partial_order}
+        register = names_to_event["Event ID 0 from PO 1.0"]
+        analyze = names_to_event["Event ID 1 from PO 1.0"]
+        self.assertEqual([analyze], list(run.partial_order.successors(register)))
+        self.assertEqual({"Event ID 2 from PO 1.0", "Event ID 4 from PO 1.0"},
+                         {event.name for event in run.partial_order.successors(analyze)})
+
+    def test_missing_po_successors_use_hotfix(self):
+        """
+        An event without po_successors attribute is treated as the buggy field, which has to be handled explicitly.
+        """
+        net, name_to_transition = import_pnml_file_to_workflow_net("8.pnml")
+        content: str = ('<?xml version="1.0" encoding="utf-8" ?>\n<log xmlns="http://www.xes-standard.org/">\n<trace>\n'
+                        '<float key="multiplicity" value="1.0" /><float key="po_name" value="1.0" />\n'
+                        '<event><int key="identity:id" value="0" /><string key="concept:name" value="Register" /></event>\n'
+                        '</trace>\n</log>\n')
+        with tempfile.TemporaryDirectory() as directory:
+            file_path: str = os.path.join(directory, "buggy.xes")
+            with open(file_path, "w") as file:
+                file.write(content)
+            with self.assertRaises(Exception):
+                import_cco_xes_file_to_event_log(file_path, name_to_transition)
+
+    @staticmethod
+    def make_xes_content(traces: list[tuple[str, list[str]]]) -> str:
+        """
+        :param traces: the attributes of every trace with the attributes of its events
+        """
+        content: str = '<?xml version="1.0" encoding="utf-8" ?>\n<log xmlns="http://www.xes-standard.org/">\n'
+        for trace_attributes, events in traces:
+            content += "<trace>\n" + trace_attributes + "\n" + "".join("<event>" + event + "</event>\n" for event in events) + "</trace>\n"
+        return content + "</log>\n"
+
+    def import_content(self, content: str, import_function, pnml_file_path: str):
+        net, name_to_transition = import_pnml_file_to_workflow_net(pnml_file_path)
+        with tempfile.TemporaryDirectory() as directory:
+            file_path: str = os.path.join(directory, "log.xes")
+            with open(file_path, "w") as file:
+                file.write(content)
+            return import_function(file_path, name_to_transition)
+
+    def test_po_traces_grouped_by_case_id(self):
+        """
+        Traces with the same po_name are one run, the runs are sorted by the po_name.
+        """
+        content: str = self.make_xes_content([
+            ('<float key="multiplicity" value="3.0" /><float key="po_name" value="2.0" />',
+             ['<int key="identity:id" value="0" /><string key="concept:name" value="Register" />'
+              '<list key="po_successors"><values><string key="0" value="1" /></values></list>']),
+            ('<float key="multiplicity" value="5.0" /><float key="po_name" value="1.0" />',
+             ['<int key="identity:id" value="10" /><string key="concept:name" value="Register" />'
+              '<list key="po_successors"><values></values></list>']),
+            ('<float key="multiplicity" value="7.0" /><float key="po_name" value="2.0" />',
+             ['<int key="identity:id" value="1" /><string key="concept:name" value="Analyze Defect" />'
+              '<list key="po_successors"><values></values></list>'])])
+        log, _ = self.import_content(content, import_cco_xes_file_to_event_log, "8.pnml")
+        self.assertEqual([("1.0", 5), ("2.0", 3)], [(run.name_foreign_source, frequency) for run, frequency in log.run_to_frequency.items()])
+        grouped_run = list(log.run_to_frequency)[1]
+        names_to_event: dict = {event.name: event for event in grouped_run.partial_order}
+        self.assertEqual(4, len(names_to_event))
+        self.assertEqual([names_to_event["Event ID 1 from PO 2.0"]],
+                         list(grouped_run.partial_order.successors(names_to_event["Event ID 0 from PO 2.0"])))
+
+    def test_to_traces_grouped_by_case_id_and_sorted(self):
+        """
+        Traces with the same concept:name are one trace, the traces are sorted by the concept:name and the events by
+        their timestamps, where events without timestamp come last.
+        """
+        content: str = self.make_xes_content([
+            ('<string key="concept:name" value="b" />',
+             ['<string key="concept:name" value="invite reviewers" /><date key="time:timestamp" value="1970-01-01T02:00:00+00:00" />',
+              '<string key="concept:name" value="decide" /><date key="time:timestamp" value="1970-01-01T01:00:00+00:00" />']),
+            ('<string key="concept:name" value="a" />',
+             ['<string key="concept:name" value="decide" /><date key="time:timestamp" value="1970-01-01T01:00:00+00:00" />',
+              '<string key="concept:name" value="accept" />',
+              '<string key="concept:name" value="invite reviewers" /><date key="time:timestamp" value="1970-01-01T00:00:00+00:00" />']),
+            ('<string key="concept:name" value="b" />',
+             ['<string key="concept:name" value="reject" /><date key="time:timestamp" value="1970-01-01T03:00:00+00:00" />'])])
+        log, _ = self.import_content(content, import_xes_file_totally_ordered_log, "reviewing_5.pnml")
+        self.assertEqual([("a", ["START", "invite reviewers", "decide", "accept", "END"]),
+                          ("b", ["START", "decide", "invite reviewers", "reject", "END"])],
+                         [(run.name_foreign_source, [event.label.activity_description for event in run.total_order.order])
+                          for run in log.run_to_frequency])
+
+
+if __name__ == '__main__':
+    unittest.main()